@@ -1,4 +1,31 @@
-from .auto_ppt import AutoPPT
-from .slide_generator import HTMLGenerator, PPTXGenerator
+"""
+AutoPPT 套件
 
-__all__ = ["AutoPPT", "HTMLGenerator", "PPTXGenerator"]
+公開的類在第一次訪問時才導入，因此只使用渲染功能（例如 AutoPPT.render）
+時不會加載 Gemini、Playwright 等重量級依賴。
+"""
+import importlib
+
+_LAZY_EXPORTS = {
+    "AutoPPT": "AutoPPT.auto_ppt",
+    "BatchJob": "AutoPPT.batch",
+    "BatchJobResult": "AutoPPT.batch",
+    "BatchRunner": "AutoPPT.batch",
+    "HTMLGenerator": "AutoPPT.slide_generator",
+    "PPTXGenerator": "AutoPPT.slide_generator",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'AutoPPT' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
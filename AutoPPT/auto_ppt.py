@@ -9,21 +9,36 @@ AI 驅動的 HTML → PPTX 生成器（重構版）
 3. 新增 slide 類型只需添加新的 SlideType 子類
 """
 
+import asyncio
+import contextvars
+import io
 import json
+import multiprocessing
 import os
 import random
+import threading
+import time
 import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import IO, Dict, Iterator, List, Optional, Union
 
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 
-from AutoPPT.scrapy import SyncScrapyPlaywright
+from AutoPPT.checkpoint import PipelineCheckpoint, fingerprint_request
+from AutoPPT.html_renderer import HTML_ASSET_DIRNAME
+from AutoPPT.incremental import save_fingerprints
+from AutoPPT.render import list_image_files, write_pptx_file
+from AutoPPT.scrapy import AsyncScrapyPlaywright, SyncScrapyPlaywright
 from AutoPPT.slide_generator import HTMLGenerator, PPTXGenerator
 from AutoPPT.template_engine import PPTXTemplate
-from AutoPPT.utils.logger import get_logger
+from AutoPPT.utils.fileio import atomic_open, atomic_write_text, is_stream, write_text_to
+from AutoPPT.utils.image_info import flush_image_info, try_get_image_info
+from AutoPPT.utils.image_optimizer import ImageOptimizer
+from AutoPPT.utils.logger import Span, get_logger
 
 # 获取日志器
 logger = get_logger()
@@ -35,6 +50,45 @@ def get_random_filename_prefix() -> str:
     return f"{random.randint(100000, 999999)}"
 
 
+OUTPUT_KINDS = ("html", "json", "pptx")
+
+_pptx_executor: Optional[ProcessPoolExecutor] = None
+_pptx_executor_lock = threading.Lock()
+
+
+def get_pptx_executor() -> ProcessPoolExecutor:
+    """
+    共享的 PPTX 渲染進程池（所有 AutoPPT 實例共用）
+
+    使用 spawn 啟動，避免 fork 時把事件循環、網絡連接等狀態複製到子進程；
+    工作進程只導入渲染相關模塊，啟動很快，之後常駐重用。
+    """
+    global _pptx_executor
+    with _pptx_executor_lock:
+        if _pptx_executor is None:
+            _pptx_executor = ProcessPoolExecutor(
+                max_workers=max(1, min(4, os.cpu_count() or 1)),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pptx_executor
+
+
+def _reset_pptx_executor():
+    """進程池損壞時丟棄，下次使用時重新創建"""
+    global _pptx_executor
+    with _pptx_executor_lock:
+        if _pptx_executor is not None:
+            _pptx_executor.shutdown(wait=False, cancel_futures=True)
+            _pptx_executor = None
+
+
+def _output_size(filename) -> int:
+    """輸出文件大小（寫入流時為 0）"""
+    if is_stream(filename) or not filename or not os.path.exists(filename):
+        return 0
+    return os.path.getsize(filename)
+
+
 class AutoPPT:
     """AI 驅動的自動簡報生成器"""
 
@@ -46,6 +100,15 @@ class AutoPPT:
         scrapy: SyncScrapyPlaywright = None,
         template_json_path: str = None,
         template_pptx_path: str = None,
+        async_scrapy: AsyncScrapyPlaywright = None,
+        max_concurrency: int = 4,
+        client: genai.Client = None,
+        template: PPTXTemplate = None,
+        upload_cache: Optional[Dict] = None,
+        optimize_images: bool = True,
+        image_optimizer: ImageOptimizer = None,
+        render_workers: int = 1,
+        html_image_mode: str = "linked",
     ):
         """
         初始化 AutoPPT
@@ -57,12 +120,27 @@ class AutoPPT:
             scrapy: 爬蟲實例
             template_json_path: 模板 JSON 配置文件路徑（可選）
             template_pptx_path: 模板 PPTX 文件路徑（可選，用於保留原始設計）
+            async_scrapy: 非同步爬蟲實例（agenerate 使用）
+            max_concurrency: 非同步流程中同時爬取 / 上傳的最大數量
+            client: 共享的 Gemini Client（可選，提供時忽略 api_key）
+            template: 已解析的共享模板（可選，提供時忽略模板路徑）
+            upload_cache: 共享的上傳緩存（可選），相同文件只上傳一次
+            optimize_images: 嵌入 PPTX 前是否按放置尺寸縮小圖片
+            image_optimizer: 自定義圖片預處理器（可選，默認 150 DPI、質量 85）
+            render_workers: 渲染 PPTX slides 的進程數（1 為單進程，None 為 CPU 數）
+            html_image_mode: HTML 預覽的圖片模式（linked：延遲加載的縮略圖；inline：小圖內嵌）
         """
-        self.client = genai.Client(api_key=api_key)
+        self.client = client or genai.Client(api_key=api_key)
         self.use_images = use_images
         self.image_metadata = {}
         self.image_files = []
         self.text_content_files = []
+        self.output_files: Dict[str, str] = {}
+        self.output_timings: Dict[str, Dict] = {}
+        # 最近一次 generate / agenerate 的區段樹（各階段耗時、RSS 變化、字節數）
+        self.job_span: Optional[Span] = None
+        self.upload_cache = upload_cache if upload_cache is not None else {}
+        self.output_dir = output_dir
         self.save_output_dir = os.path.join(output_dir, "output")
         self.save_content_dir = os.path.join(output_dir, "content")
         self.save_image_dir = os.path.join(output_dir, "images")
@@ -73,10 +151,19 @@ class AutoPPT:
         if not os.path.exists(self.save_image_dir):
             os.makedirs(self.save_image_dir)
         self.random_filename_prefix = get_random_filename_prefix()
+        self.checkpoint = PipelineCheckpoint(output_dir)
+        self.resume = False
         self.scrapy = scrapy or SyncScrapyPlaywright()
+        self.async_scrapy = async_scrapy or AsyncScrapyPlaywright()
+        self.max_concurrency = max(1, max_concurrency)
+        self.image_optimizer = (
+            (image_optimizer or ImageOptimizer()) if optimize_images else None
+        )
+        self.render_workers = render_workers
+        self.html_image_mode = html_image_mode
 
         # 加載模板
-        self.template = PPTXTemplate(
+        self.template = template or PPTXTemplate(
             json_path=template_json_path, pptx_path=template_pptx_path
         )
 
@@ -88,33 +175,114 @@ class AutoPPT:
         else:
             logger.info(f"   📋 使用默認模板")
 
+    @staticmethod
+    def _upload_cache_key(file: str) -> tuple:
+        """上傳緩存鍵（路徑 + 修改時間 + 大小）"""
+        stat = os.stat(file)
+        return (os.path.abspath(file), stat.st_mtime_ns, stat.st_size)
+
+    def _upload(self, file: str):
+        """上傳文件（命中緩存或檢查點時直接返回已上傳的句柄）"""
+        key = self._upload_cache_key(file)
+        if key not in self.upload_cache:
+            uploaded_file = self.checkpoint.get_upload(file)
+            if uploaded_file is None:
+                with logger.performance.span("file", label=file, bytes_out=key[2]):
+                    uploaded_file = self.client.files.upload(file=file)
+                self.checkpoint.record_upload(file, uploaded_file)
+            self.upload_cache[key] = uploaded_file
+        return self.upload_cache[key]
+
+    async def _aupload(self, file: str):
+        """上傳文件（非同步版本，共享同一份緩存）"""
+        key = self._upload_cache_key(file)
+        if key not in self.upload_cache:
+            uploaded_file = self.checkpoint.get_upload(file)
+            if uploaded_file is not None:
+                self.upload_cache[key] = uploaded_file
+            else:
+                # 先放入進行中的任務，並行的相同上傳會等待同一個結果
+                self.upload_cache[key] = asyncio.ensure_future(
+                    self._aupload_and_record(file)
+                )
+        cached = self.upload_cache[key]
+        if isinstance(cached, asyncio.Future):
+            try:
+                self.upload_cache[key] = await cached
+            except Exception:
+                self.upload_cache.pop(key, None)
+                raise
+        return self.upload_cache[key]
+
+    async def _aupload_and_record(self, file: str):
+        with logger.performance.span("file", label=file, bytes_out=os.path.getsize(file)):
+            uploaded_file = await self.client.aio.files.upload(file=file)
+        self.checkpoint.record_upload(file, uploaded_file)
+        return uploaded_file
+
+    def _list_image_files(self) -> List[tuple]:
+        """列出待上傳的圖片（index 與文件名）"""
+        return list_image_files(self.save_image_dir)
+
+    def _register_image(self, index: int, file: str, image_file) -> None:
+        """記錄已上傳的圖片"""
+        logger.info(f"   ✓ 上傳圖片 {index + 1}: {file}")
+
+        image_id = f"img_{index+1:02d}"
+        path = f"{self.save_image_dir}/{file}"
+        self.image_files.append(image_file)
+        self.image_metadata[image_id] = {
+            "filename": file,
+            "path": path,
+            "gemini_file": image_file,
+            "index": index + 1,
+            # 尺寸、格式、大小、哈希（排版時直接使用）
+            **try_get_image_info(path),
+        }
+
     def load_images(self):
         """載入圖片資源"""
         if not self.use_images or not os.path.exists(self.save_image_dir):
             return
 
         logger.info("📸 載入圖片資源...")
-        for index, file in enumerate(sorted(os.listdir(self.save_image_dir))):
-            if file.endswith(('.jpg', '.jpeg', '.png')):
-                image_file = self.client.files.upload(
-                    file=f"{self.save_image_dir}/{file}"
-                )
-                logger.info(f"   ✓ 上傳圖片 {index + 1}: {file}")
+        image_list = self._list_image_files()
+        with logger.performance.span("upload_images", files=len(image_list)):
+            for index, file in image_list:
+                image_file = self._upload(f"{self.save_image_dir}/{file}")
+                self._register_image(index, file, image_file)
+        flush_image_info()
+        self.checkpoint.record_images(self.image_metadata)
+
+    async def aload_images(self):
+        """載入圖片資源（非同步並行上傳）"""
+        if not self.use_images or not os.path.exists(self.save_image_dir):
+            return
 
-                image_id = f"img_{index+1:02d}"
-                self.image_files.append(image_file)
-                self.image_metadata[image_id] = {
-                    "filename": file,
-                    "path": f"{self.save_image_dir}/{file}",
-                    "gemini_file": image_file,
-                    "index": index + 1,
-                }
+        logger.info("📸 載入圖片資源...")
+        image_list = self._list_image_files()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def upload(file: str):
+            async with semaphore:
+                return await self._aupload(f"{self.save_image_dir}/{file}")
+
+        with logger.performance.span("upload_images", files=len(image_list)):
+            uploaded = await asyncio.gather(*(upload(file) for _, file in image_list))
+        # 依原始順序登記，確保 image_id 與同步版本一致
+        for (index, file), image_file in zip(image_list, uploaded):
+            self._register_image(index, file, image_file)
+        flush_image_info()
+        self.checkpoint.record_images(self.image_metadata)
 
     def generate_prompt(self, prompt: str) -> str:
         """生成 AI Prompt（使用模板引擎）"""
-        return self.template.generate_ai_prompt(
-            image_metadata=self.image_metadata, user_prompt=prompt
-        )
+        with logger.performance.span("prompt", images=len(self.image_metadata)) as span:
+            ai_prompt = self.template.generate_ai_prompt(
+                image_metadata=self.image_metadata, user_prompt=prompt
+            )
+            span.add(bytes_out=len(ai_prompt.encode("utf-8")))
+        return ai_prompt
 
     def generate_presentation(
         self, contents: List[str], model: str = "gemini-2.5-flash"
@@ -134,20 +302,61 @@ class AutoPPT:
         logger.info("🤖 AI 分析內容並生成簡報結構...")
 
         # 調用 AI
-        response = self.client.models.generate_content(
-            model=model,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-            ),
-            contents=contents,
-        )
+        with logger.performance.span("model", label=model, contents=len(contents)) as span:
+            response = self.client.models.generate_content(
+                model=model,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                ),
+                contents=contents,
+            )
+
+            return self._parse_presentation_response(response, span)
+
+    async def agenerate_presentation(
+        self, contents: List, model: str = "gemini-2.5-flash"
+    ) -> Dict:
+        """
+        使用 AI 生成簡報結構（非同步版本）
+
+        Args:
+            contents: 內容列表
+            model: AI 模型名稱
+
+        Returns:
+            簡報數據（dict）
+        """
+        logger.info(f"🤖 模板：{self.template.slide_types.keys()}")
+        logger.info("🤖 AI 分析內容並生成簡報結構...")
+
+        with logger.performance.span("model", label=model, contents=len(contents)) as span:
+            response = await self.client.aio.models.generate_content(
+                model=model,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                ),
+                contents=contents,
+            )
 
+            return self._parse_presentation_response(response, span)
+
+    def _parse_presentation_response(self, response, span: Span = None) -> Dict:
+        """解析 AI 回應為簡報數據（提供 span 時記錄回應大小、token 數與 slides 數量）"""
         logger.info("   ✓ AI 分析完成")
         logger.info(f"   📊 Token 使用：{response.usage_metadata}")
 
         # 解析結果
         ai_data = json.loads(response.text)
 
+        if span is not None:
+            usage = response.usage_metadata
+            span.add(
+                bytes_in=len(response.text.encode("utf-8")),
+                prompt_tokens=getattr(usage, "prompt_token_count", None) or 0,
+                output_tokens=getattr(usage, "candidates_token_count", None) or 0,
+                slides=len(ai_data.get("slides", [])),
+            )
+
         logger.info(f"   📋 簡報資訊：")
         logger.info(f"   標題：{ai_data.get('title', '')}")
         logger.info(f"   主題：{ai_data.get('topic', '')}")
@@ -158,98 +367,401 @@ class AutoPPT:
     def upload_files(self, files: List[str]) -> List[str]:
         """上傳檔案"""
         uploaded_files = []
+        with logger.performance.span("upload_files", files=len(files)):
+            for file in files:
+                if os.path.exists(file):
+                    uploaded_file = self._upload(file)
+                else:
+                    logger.info(f"   ❌ 檔案不存在：{file}")
+                    continue
+                uploaded_files.append(uploaded_file)
+                logger.info(f"   ✓ 已上傳檔案：{file}")
+        return uploaded_files
+
+    async def aupload_files(self, files: List[str]) -> List:
+        """上傳檔案（非同步並行上傳，保持原始順序）"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def upload(file: str):
+            async with semaphore:
+                uploaded_file = await self._aupload(file)
+                logger.info(f"   ✓ 已上傳檔案：{file}")
+                return uploaded_file
+
+        existing_files = []
         for file in files:
-            if os.path.exists(file):
-                uploaded_file = self.client.files.upload(file=file)
+            if file and os.path.exists(file):
+                existing_files.append(file)
             else:
                 logger.info(f"   ❌ 檔案不存在：{file}")
-                continue
-            uploaded_files.append(uploaded_file)
-            logger.info(f"   ✓ 已上傳檔案：{file}")
-        return uploaded_files
+
+        with logger.performance.span("upload_files", files=len(existing_files)):
+            return list(await asyncio.gather(*(upload(f) for f in existing_files)))
 
     def scrape_urls(self, urls: List[str]) -> None:
         """爬取 URL"""
         if not urls:
             return
         logger.info(f"🌐 開始爬取 {len(urls)} 個 URL...")
+        with logger.performance.span("scrape", urls=len(urls)):
+            for url in self._pending_urls(urls):
+                uid = uuid.uuid4()
+                content_file = os.path.join(self.save_content_dir, f"{uid}.txt")
+                with logger.performance.span("url", label=url):
+                    self.scrapy.start(
+                        target_url=url,
+                        extracted_content_file=content_file,
+                        images_downloaded_dir=self.save_image_dir,
+                    )
+                self.text_content_files.append(content_file)
+                self.checkpoint.record_scraped_url(url, content_file)
+                logger.info(f"   ✓ 已爬取 URL：{url} 並保存到 {content_file}")
+
+    def _pending_urls(self, urls: List[str]) -> List[str]:
+        """resume 模式下沿用已爬取的 URL，返回仍需爬取的 URL"""
+        if not self.resume:
+            return list(urls)
+
+        pending = []
         for url in urls:
-            uid = uuid.uuid4()
-            content_file = os.path.join(self.save_content_dir, f"{uid}.txt")
-            self.scrapy.start(
-                target_url=url,
-                extracted_content_file=content_file,
-                images_downloaded_dir=self.save_image_dir,
-            )
-            self.text_content_files.append(content_file)
+            content_file = self.checkpoint.get_scraped_file(url)
+            if content_file:
+                self.text_content_files.append(content_file)
+                logger.info(f"   ♻️  沿用已爬取 URL：{url}")
+            else:
+                pending.append(url)
+        return pending
+
+    async def ascrape_urls(self, urls: List[str]) -> None:
+        """爬取 URL（非同步並行爬取）"""
+        if not urls:
+            return
+        logger.info(f"🌐 開始爬取 {len(urls)} 個 URL...")
+        urls = self._pending_urls(urls)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        content_files = [
+            os.path.join(self.save_content_dir, f"{uuid.uuid4()}.txt") for _ in urls
+        ]
+
+        async def scrape(url: str, content_file: str):
+            async with semaphore:
+                with logger.performance.span("url", label=url):
+                    await self.async_scrapy.start(
+                        target_url=url,
+                        extracted_content_file=content_file,
+                        images_downloaded_dir=self.save_image_dir,
+                    )
+            self.checkpoint.record_scraped_url(url, content_file)
             logger.info(f"   ✓ 已爬取 URL：{url} 並保存到 {content_file}")
 
-    def save_html(self, data: Dict, filename: str = None) -> str:
-        """保存 HTML 文件"""
+        with logger.performance.span("scrape", urls=len(urls)):
+            await asyncio.gather(
+                *(scrape(url, f) for url, f in zip(urls, content_files))
+            )
+        self.text_content_files.extend(content_files)
+
+    def _default_filename(self, kind: str, data: Dict) -> str:
+        """生成默認輸出文件名"""
+        suffix = {
+            "html": "_presentation.html",
+            "json": "_data.json",
+            "pptx": ".pptx",
+        }[kind]
+        return os.path.join(
+            self.save_output_dir,
+            f"{self.random_filename_prefix}_{data['topic']}{suffix}",
+        )
+
+    def _record_output(self, kind: str, filename: str):
+        """記錄已保存的輸出文件"""
+        self.output_files[kind] = filename
+        self.checkpoint.record_output(kind, filename)
+
+    def _render_image_metadata(self) -> Dict:
+        """渲染用的圖片元數據（去掉 Gemini 文件句柄，可傳給工作進程）"""
+        return {
+            image_id: {k: v for k, v in meta.items() if k != "gemini_file"}
+            for image_id, meta in self.image_metadata.items()
+        }
+
+    def render_html(self, data: Dict, stream: IO = None):
+        """
+        渲染 HTML 到內存或可寫的流（不經過磁盤）
+
+        Args:
+            data: 簡報數據
+            stream: 可寫的文本流或二進制流（可選，二進制流按 UTF-8 編碼）
+
+        Returns:
+            沒有提供 stream 時返回 UTF-8 字節，否則返回 stream
+        """
         logger.info("🎨 生成 HTML 演示文稿...")
+        # 內存或流中的 HTML 沒有所在目錄，靜態資源內嵌；寫入流時逐張 slide 寫入
+        html_gen = self._html_generator()
+        if stream is None:
+            return html_gen.generate_from_data(data).encode("utf-8")
+        return html_gen.write_to(data, stream, record=False)
+
+    def iter_html(self, data: Dict) -> Iterator[str]:
+        """
+        逐段生成 HTML（文檔開頭、每張 slide、文檔結尾），可直接作為 HTTP 流式響應的內容
+
+        第一張 slide 渲染完成即可發送，不必等整份簡報；靜態資源內嵌。
+        """
+        return self._html_generator().iter_html(data, record=False)
+
+    def _html_generator(self, asset_dir: str = None) -> HTMLGenerator:
+        return HTMLGenerator(
+            self.image_metadata,
+            self.template,
+            asset_dir=asset_dir,
+            image_mode=self.html_image_mode,
+        )
 
-        html_gen = HTMLGenerator(self.image_metadata)
-        html_content = html_gen.generate_from_data(data)
+    def save_html(self, data: Dict, filename: Union[str, IO] = None) -> Union[str, IO]:
+        """保存 HTML 文件（filename 也可以是可寫的流，見 render_html）"""
+        if is_stream(filename):
+            return self.render_html(data, filename)
+
+        logger.info("🎨 生成 HTML 演示文稿...")
 
         # 生成文件名
         if not filename:
-            filename = os.path.join(
-                self.save_output_dir,
-                f"{self.random_filename_prefix}_{data['topic']}_presentation.html",
-            )
+            filename = self._default_filename("html", data)
+
+        # 覆蓋已有文件時只重新渲染數據有變化的 slides（見 incremental）；
+        # CSS / JS 寫入同目錄的 assets/，多份預覽共用並由瀏覽器緩存
+        html_gen = self._html_generator(
+            os.path.join(os.path.dirname(os.path.abspath(filename)), HTML_ASSET_DIRNAME)
+        )
 
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        # 逐張 slide 寫入，不在內存中拼接整份文檔
+        with atomic_open(filename, "w", encoding="utf-8") as f:
+            html_gen.write_to(data, f, previous=filename)
+        save_fingerprints(filename, "html", html_gen.slide_manifest)
 
+        self._record_output("html", filename)
         logger.info(f"   ✓ HTML 已保存：{filename}")
         logger.info(f"   🌐 請在瀏覽器中打開：")
         logger.info(f"   file://{os.path.abspath(filename)}")
 
         return filename
 
-    def save_json(self, data: Dict, filename: str = None) -> str:
-        """保存 JSON 數據文件"""
+    def render_json(self, data: Dict, stream: IO = None):
+        """
+        序列化 JSON 數據到內存或可寫的流（不經過磁盤）
+
+        Returns:
+            沒有提供 stream 時返回 UTF-8 字節，否則返回 stream
+        """
+        json_content = json.dumps(data, ensure_ascii=False, indent=2)
+        if stream is None:
+            return json_content.encode("utf-8")
+        write_text_to(stream, json_content)
+        return stream
+
+    def save_json(self, data: Dict, filename: Union[str, IO] = None) -> Union[str, IO]:
+        """保存 JSON 數據文件（filename 也可以是可寫的流，見 render_json）"""
+        if is_stream(filename):
+            return self.render_json(data, filename)
+
         if not filename:
-            filename = os.path.join(
-                self.save_output_dir,
-                f"{self.random_filename_prefix}_{data['topic']}_data.json",
-            )
+            filename = self._default_filename("json", data)
 
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        atomic_write_text(filename, json.dumps(data, ensure_ascii=False, indent=2))
 
+        self._record_output("json", filename)
         logger.info(f"   💾 數據已保存：{filename}")
         logger.info(f"   （可用於後續轉換為 PPTX）")
 
         return filename
 
-    def save_pptx(self, data: Dict, filename: str = None) -> str:
-        """保存 PPTX 文件（使用模板引擎）"""
+    def _pptx_generator(self) -> PPTXGenerator:
+        return PPTXGenerator(
+            self.image_metadata,
+            template=self.template,
+            image_optimizer=self.image_optimizer,
+            workers=self.render_workers,
+        )
+
+    def render_pptx(self, data: Dict, stream: IO[bytes] = None):
+        """
+        渲染 PPTX 到內存或可寫的二進制流（不經過磁盤）
+
+        Args:
+            data: 簡報數據
+            stream: 可寫的二進制流（可選，不需要支持 seek，例如 HTTP 響應或上傳流）
+
+        Returns:
+            沒有提供 stream 時返回 PPTX 字節，否則返回 stream
+        """
         logger.info("📊 生成 PPTX 演示文稿...")
+        target = io.BytesIO() if stream is None else stream
+        self._pptx_generator().write_from_data(data, target)
+        return target.getvalue() if stream is None else stream
 
-        pptx_gen = PPTXGenerator(self.image_metadata, template=self.template)
-        prs = pptx_gen.generate_from_data(data)
+    def save_pptx(self, data: Dict, filename: Union[str, IO[bytes]] = None) -> Union[str, IO]:
+        """保存 PPTX 文件（使用模板引擎；filename 也可以是可寫的二進制流，見 render_pptx）"""
+        if is_stream(filename):
+            return self.render_pptx(data, filename)
+
+        logger.info("📊 生成 PPTX 演示文稿...")
+        pptx_gen = self._pptx_generator()
 
-        
         # 生成文件名
         if not filename:
-            filename = os.path.join(
-                self.save_output_dir,
-                f"{self.random_filename_prefix}_{data['topic']}.pptx",
-            )
+            filename = self._default_filename("pptx", data)
+
+        # 流式寫入：slide 與圖片生成後立即寫入，不在內存中保留整個包；
+        # 覆蓋已有文件時只重新渲染數據有變化的 slides（見 incremental）
+        with atomic_open(filename, "wb") as f:
+            pptx_gen.write_from_data(data, f, previous=filename)
+        save_fingerprints(filename, "pptx", pptx_gen.slide_manifest)
+
+        self._record_output("pptx", filename)
+        logger.info(f"   ✓ PPTX 已保存：{filename}")
+
+        return filename
+
+    def _submit_pptx(self, data: Dict, filename: str):
+        """把 PPTX 渲染提交到共享進程池"""
+        return get_pptx_executor().submit(
+            write_pptx_file,
+            data,
+            filename,
+            self._render_image_metadata(),
+            self.template.json_path,
+            self.template.pptx_path,
+            self.image_optimizer,
+            self.render_workers,
+        )
 
-        prs.save(filename)
+    def save_pptx_in_process(self, data: Dict, filename: str = None) -> str:
+        """在工作進程中渲染並保存 PPTX（進程池不可用時退回當前進程；流在當前進程中寫入）"""
+        if is_stream(filename):
+            return self.render_pptx(data, filename)
+        logger.info("📊 生成 PPTX 演示文稿（工作進程）...")
+        filename = filename or self._default_filename("pptx", data)
+
+        try:
+            self._submit_pptx(data, filename).result()
+        except BrokenProcessPool as e:
+            logger.warning(f"⚠️  PPTX 工作進程不可用，改在當前進程渲染：{e}")
+            _reset_pptx_executor()
+            return self.save_pptx(data, filename)
 
+        self._record_output("pptx", filename)
         logger.info(f"   ✓ PPTX 已保存：{filename}")
+        return filename
+
+    def _timed_save(self, kind: str, data: Dict, in_process: bool) -> Dict:
+        start = time.perf_counter()
+        with logger.performance.span(kind, slides=len(data.get("slides", []))) as span:
+            if kind == "pptx" and in_process:
+                filename = self.save_pptx_in_process(data)
+            else:
+                filename = getattr(self, f"save_{kind}")(data)
+            span.add(bytes_out=_output_size(filename))
+        return {"path": filename, "seconds": time.perf_counter() - start}
+
+    def save_outputs(
+        self,
+        data: Dict,
+        kinds: Optional[List[str]] = None,
+        parallel: bool = True,
+    ) -> Dict[str, Dict]:
+        """
+        保存所有輸出文件
+
+        並行模式下 PPTX 在工作進程中渲染，HTML / JSON 在線程中寫入，
+        總耗時約等於最慢的 PPTX；所有文件都通過臨時文件原子寫入。
+
+        Args:
+            data: 簡報數據
+            kinds: 要保存的類型（默認 html / json / pptx）
+            parallel: 是否並行寫入
+
+        Returns:
+            {類型: {"path": 文件路徑, "seconds": 耗時}}
+        """
+        kinds = list(OUTPUT_KINDS if kinds is None else kinds)
+        with logger.performance.span("save", label=",".join(kinds)):
+            if not parallel or len(kinds) <= 1:
+                results = {kind: self._timed_save(kind, data, False) for kind in kinds}
+            else:
+                with ThreadPoolExecutor(max_workers=len(kinds)) as pool:
+                    # 每個線程在當前區段的副本中執行，各類型的區段嵌套在 save 之下
+                    futures = {
+                        kind: pool.submit(
+                            contextvars.copy_context().run,
+                            self._timed_save,
+                            kind,
+                            data,
+                            True,
+                        )
+                        for kind in kinds
+                    }
+                    results = {kind: future.result() for kind, future in futures.items()}
+
+        self.output_timings.update(results)
+        for kind, result in results.items():
+            logger.info(f"   ⏱️  {kind.upper()}：{result['seconds']:.2f}s")
+        return results
+
+    async def asave_html(self, data: Dict, filename: Union[str, IO] = None):
+        """保存 HTML 文件（在工作線程中執行）"""
+        return await asyncio.to_thread(self.save_html, data, filename)
+
+    async def asave_json(self, data: Dict, filename: Union[str, IO] = None):
+        """保存 JSON 數據文件（在工作線程中執行）"""
+        return await asyncio.to_thread(self.save_json, data, filename)
+
+    async def asave_pptx(self, data: Dict, filename: Union[str, IO[bytes]] = None):
+        """保存 PPTX 文件（在共享進程池中渲染，不阻塞事件循環；寫入流時在工作線程中渲染）"""
+        if is_stream(filename):
+            return await asyncio.to_thread(self.render_pptx, data, filename)
+
+        logger.info("📊 生成 PPTX 演示文稿（工作進程）...")
+        filename = filename or self._default_filename("pptx", data)
 
+        try:
+            await asyncio.wrap_future(self._submit_pptx(data, filename))
+        except BrokenProcessPool as e:
+            logger.warning(f"⚠️  PPTX 工作進程不可用，改在工作線程渲染：{e}")
+            _reset_pptx_executor()
+            return await asyncio.to_thread(self.save_pptx, data, filename)
+
+        self._record_output("pptx", filename)
+        logger.info(f"   ✓ PPTX 已保存：{filename}")
         return filename
 
+    async def asave_outputs(
+        self, data: Dict, kinds: Optional[List[str]] = None
+    ) -> Dict[str, Dict]:
+        """並行保存所有輸出文件（非同步版本，返回值同 save_outputs）"""
+        kinds = list(OUTPUT_KINDS if kinds is None else kinds)
+
+        async def timed(kind: str) -> Dict:
+            start = time.perf_counter()
+            with logger.performance.span(kind, slides=len(data.get("slides", []))) as span:
+                filename = await getattr(self, f"asave_{kind}")(data)
+                span.add(bytes_out=_output_size(filename))
+            return {"path": filename, "seconds": time.perf_counter() - start}
+
+        with logger.performance.span("save", label=",".join(kinds)):
+            timings = await asyncio.gather(*(timed(kind) for kind in kinds))
+        results = dict(zip(kinds, timings))
+        self.output_timings.update(results)
+        return results
+
     def generate(
         self,
         prompt: str,
         save_files: bool = True,
         url_links: Optional[List[str]] = None,
         other_files: List[str] = [],
+        resume: bool = False,
+        parallel_save: bool = True,
     ) -> Dict:
         """
         完整的簡報生成流程
@@ -259,49 +771,171 @@ class AutoPPT:
             save_files: 是否保存文件
             url_links: 網頁連結列表（可選）
             other_files: 其他檔案列表（默認空列表）
+            resume: 是否從 output_dir 中的檢查點恢復，跳過已完成的階段
+            parallel_save: 是否並行寫入 HTML / JSON / PPTX（見 save_outputs）
 
         Returns:
             簡報數據（dict）
         """
-        try:
-            # 爬蟲
-            self.scrape_urls(url_links)
-
-            # 載入圖片
-            self.load_images()
-
-            # 準備內容
-            contents = [
-                self.generate_prompt(prompt),
-                *self.image_files,
-                *self.upload_files(other_files + self.text_content_files),
-            ]
-
-            # 生成簡報結構
-            data = self.generate_presentation(contents)
-
-            # 保存文件
-            if save_files:
-                self.save_html(data)
-                self.save_json(data)
-                self.save_pptx(data)
-
-            logger.info("=" * 60)
-            logger.info("✅ 生成完成！")
-            logger.info("💡 提示：")
-            logger.info("   - 在瀏覽器中預覽 HTML")
-            logger.info("   - 使用 PowerPoint 打開 PPTX 文件")
-            logger.info("   - JSON 數據可用於後續處理")
-            logger.info("=" * 60)
-
-            return data
-
-        except json.JSONDecodeError as e:
-            logger.error(f"❌ JSON 解析錯誤：{e}")
-            raise
-        except Exception as e:
-            logger.error(f"❌ 發生錯誤：{e}")
-            import traceback
-
-            logger.error(f"異常詳情: {traceback.format_exc()}")
-            raise
+        # 各階段（爬蟲、上傳、AI 調用、渲染、保存）記錄在任務區段下，結束時輸出耗時匯總
+        with logger.performance.job("generate", label=self.output_dir) as job:
+            self.job_span = job
+            try:
+                self._start_checkpoint(prompt, url_links, other_files, resume)
+                data = self._restore_ai_data()
+
+                if data is None:
+                    # 爬蟲
+                    self.scrape_urls(url_links)
+
+                    # 載入圖片
+                    self.load_images()
+
+                    # 準備內容
+                    contents = [
+                        self.generate_prompt(prompt),
+                        *self.image_files,
+                        *self.upload_files(other_files + self.text_content_files),
+                    ]
+
+                    # 生成簡報結構
+                    data = self.generate_presentation(contents)
+                    self.checkpoint.record_ai_data(data)
+
+                # 保存文件
+                if save_files:
+                    self.save_outputs(data, self._pending_outputs(), parallel=parallel_save)
+
+                self._log_generate_done()
+
+                return data
+
+            except json.JSONDecodeError as e:
+                logger.error(f"❌ JSON 解析錯誤：{e}")
+                raise
+            except Exception as e:
+                logger.error(f"❌ 發生錯誤：{e}")
+                import traceback
+
+                logger.error(f"異常詳情: {traceback.format_exc()}")
+                raise
+
+    async def agenerate(
+        self,
+        prompt: str,
+        save_files: bool = True,
+        url_links: Optional[List[str]] = None,
+        other_files: Optional[List[str]] = None,
+        resume: bool = False,
+    ) -> Dict:
+        """
+        完整的簡報生成流程（非同步版本）
+
+        爬蟲、上傳與 AI 調用皆為非阻塞；PPTX / HTML / JSON 的渲染與寫入
+        在工作線程中執行，適合在同一個事件循環中並行處理多個簡報。
+
+        Args:
+            prompt: 提示詞
+            save_files: 是否保存文件
+            url_links: 網頁連結列表（可選）
+            other_files: 其他檔案列表（可選）
+            resume: 是否從 output_dir 中的檢查點恢復，跳過已完成的階段
+
+        Returns:
+            簡報數據（dict）
+        """
+        # 各階段（爬蟲、上傳、AI 調用、渲染、保存）記錄在任務區段下，結束時輸出耗時匯總
+        with logger.performance.job("generate", label=self.output_dir) as job:
+            self.job_span = job
+            try:
+                self._start_checkpoint(prompt, url_links, other_files, resume)
+                data = self._restore_ai_data()
+
+                if data is None:
+                    # 爬蟲
+                    await self.ascrape_urls(url_links)
+
+                    # 載入圖片
+                    await self.aload_images()
+
+                    # 準備內容
+                    uploaded_files = await self.aupload_files(
+                        list(other_files or []) + self.text_content_files
+                    )
+                    contents = [
+                        self.generate_prompt(prompt),
+                        *self.image_files,
+                        *uploaded_files,
+                    ]
+
+                    # 生成簡報結構
+                    data = await self.agenerate_presentation(contents)
+                    self.checkpoint.record_ai_data(data)
+
+                # 保存文件
+                if save_files:
+                    await self.asave_outputs(data, self._pending_outputs())
+
+                self._log_generate_done()
+
+                return data
+
+            except json.JSONDecodeError as e:
+                logger.error(f"❌ JSON 解析錯誤：{e}")
+                raise
+            except Exception as e:
+                logger.error(f"❌ 發生錯誤：{e}")
+                import traceback
+
+                logger.error(f"異常詳情: {traceback.format_exc()}")
+                raise
+
+    def _start_checkpoint(
+        self,
+        prompt: str,
+        url_links: Optional[List[str]],
+        other_files: Optional[List[str]],
+        resume: bool,
+    ):
+        """開始記錄檢查點（resume 時沿用上一次的文件名前綴）"""
+        self.resume = resume
+        self.random_filename_prefix = self.checkpoint.start(
+            fingerprint_request(prompt, url_links, other_files),
+            self.random_filename_prefix,
+            resume,
+        )
+
+    def _restore_ai_data(self) -> Optional[Dict]:
+        """resume 模式下恢復已生成的簡報數據與圖片元數據"""
+        if not self.resume:
+            return None
+
+        data = self.checkpoint.get_ai_data()
+        if data is None:
+            return None
+
+        self.image_metadata = dict(self.checkpoint.get_images() or {})
+        logger.info("   ♻️  沿用已生成的簡報數據，跳過爬蟲、上傳與 AI 調用")
+        return data
+
+    def _pending_outputs(self) -> List[str]:
+        """返回仍需保存的輸出類型（resume 時跳過已存在的文件）"""
+        pending = []
+        for kind in OUTPUT_KINDS:
+            filename = self.checkpoint.get_output(kind) if self.resume else None
+            if filename:
+                self.output_files[kind] = filename
+                logger.info(f"   ♻️  沿用已保存的 {kind.upper()}：{filename}")
+            else:
+                pending.append(kind)
+        return pending
+
+    def _log_generate_done(self):
+        """記錄生成完成提示"""
+        logger.info("=" * 60)
+        logger.info("✅ 生成完成！")
+        logger.info("💡 提示：")
+        logger.info("   - 在瀏覽器中預覽 HTML")
+        logger.info("   - 使用 PowerPoint 打開 PPTX 文件")
+        logger.info("   - JSON 數據可用於後續處理")
+        logger.info("=" * 60)
@@ -0,0 +1,212 @@
+"""
+批量簡報生成器
+
+多個簡報任務共用同一組資源：
+1. 共享 Gemini Client
+2. 共享已解析的模板（相同路徑只解析一次）
+3. 共享瀏覽器池（所有爬取共用少量 Chromium 進程）
+4. 共享上傳緩存（相同文件只上傳一次）
+
+任務在同一個事件循環中以 agenerate 並行執行，並發數由 workers 控制。
+"""
+
+import asyncio
+import json
+import os
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from google import genai
+
+from AutoPPT.auto_ppt import AutoPPT
+from AutoPPT.scrapy import AsyncBrowserPool, AsyncScrapyPlaywright
+from AutoPPT.template_engine import PPTXTemplate
+from AutoPPT.utils.logger import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class BatchJob:
+    """單個簡報任務"""
+    prompt: str
+    url_links: List[str] = field(default_factory=list)
+    other_files: List[str] = field(default_factory=list)
+    template_json_path: Optional[str] = None
+    template_pptx_path: Optional[str] = None
+    use_images: bool = False
+    job_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'BatchJob':
+        """從字典創建"""
+        return cls(
+            prompt=data['prompt'],
+            url_links=data.get('url_links', []),
+            other_files=data.get('other_files', []),
+            template_json_path=data.get('template_json_path'),
+            template_pptx_path=data.get('template_pptx_path'),
+            use_images=data.get('use_images', False),
+            job_id=data.get('job_id'),
+        )
+
+
+@dataclass
+class BatchJobResult:
+    """單個任務的執行結果"""
+    job_id: str
+    status: str  # success / failed
+    output_dir: str
+    elapsed: float
+    output_files: Dict[str, str] = field(default_factory=dict)
+    title: str = ""
+    slide_count: int = 0
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+    # 各階段耗時匯總（見 PerformanceLogger.job）
+    stages: List[Dict] = field(default_factory=list)
+
+
+class BatchRunner:
+    """批量簡報生成器"""
+
+    def __init__(
+        self,
+        api_key: str = None,
+        output_root: str = "temp_dir/batch",
+        workers: int = 4,
+        browsers: int = 1,
+        save_files: bool = True,
+        client: genai.Client = None,
+    ):
+        """
+        初始化批量生成器
+
+        Args:
+            api_key: Google Gemini API Key
+            output_root: 批量輸出根目錄（每個任務一個子目錄）
+            workers: 同時執行的任務數量
+            browsers: 共享瀏覽器池的瀏覽器數量
+            save_files: 是否保存 HTML / JSON / PPTX
+            client: 共享的 Gemini Client（可選）
+        """
+        self.client = client or genai.Client(api_key=api_key)
+        self.output_root = output_root
+        self.workers = max(1, workers)
+        self.browsers = max(1, browsers)
+        self.save_files = save_files
+        self.upload_cache: Dict = {}
+
+    def get_template(
+        self, json_path: str = None, pptx_path: str = None
+    ) -> PPTXTemplate:
+        """獲取共享模板（由 template_registry 緩存，相同模板只編譯一次）"""
+        return PPTXTemplate(json_path=json_path, pptx_path=pptx_path)
+
+    def run(self, jobs: List[BatchJob]) -> List[BatchJobResult]:
+        """同步執行批量任務"""
+        return asyncio.run(self.arun(jobs))
+
+    async def arun(self, jobs: List[BatchJob]) -> List[BatchJobResult]:
+        """
+        執行批量任務
+
+        Args:
+            jobs: 任務列表
+
+        Returns:
+            與 jobs 順序一致的結果列表（失敗的任務不會中斷其他任務）
+        """
+        logger.info(f"📦 開始批量生成：{len(jobs)} 個任務，並發數 {self.workers}")
+        os.makedirs(self.output_root, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async with AsyncBrowserPool(size=self.browsers) as browser_pool:
+            scrapy = AsyncScrapyPlaywright(browser_pool=browser_pool)
+            results = await asyncio.gather(
+                *(
+                    self._run_job(job, index, scrapy, semaphore)
+                    for index, job in enumerate(jobs, 1)
+                )
+            )
+
+        success_count = sum(1 for r in results if r.status == "success")
+        logger.info(f"📦 批量生成完成：成功 {success_count} / {len(results)}")
+        return list(results)
+
+    async def _run_job(
+        self,
+        job: BatchJob,
+        index: int,
+        scrapy: AsyncScrapyPlaywright,
+        semaphore: asyncio.Semaphore,
+    ) -> BatchJobResult:
+        """執行單個任務並記錄結果"""
+        job_id = job.job_id or f"job_{index:04d}"
+        output_dir = os.path.join(self.output_root, job_id)
+
+        async with semaphore:
+            start = time.perf_counter()
+            logger.info(f"▶ 任務 {job_id} 開始")
+            auto_ppt = None
+            try:
+                auto_ppt = AutoPPT(
+                    api_key=None,
+                    use_images=job.use_images,
+                    output_dir=output_dir,
+                    async_scrapy=scrapy,
+                    client=self.client,
+                    template=self.get_template(
+                        job.template_json_path, job.template_pptx_path
+                    ),
+                    upload_cache=self.upload_cache,
+                )
+                data = await auto_ppt.agenerate(
+                    prompt=job.prompt,
+                    save_files=self.save_files,
+                    url_links=job.url_links,
+                    other_files=job.other_files,
+                )
+                result = BatchJobResult(
+                    job_id=job_id,
+                    status="success",
+                    output_dir=output_dir,
+                    elapsed=time.perf_counter() - start,
+                    output_files=dict(auto_ppt.output_files),
+                    title=data.get('title', ''),
+                    slide_count=len(data.get('slides', [])),
+                )
+                logger.info(f"   ✓ 任務 {job_id} 完成（{result.elapsed:.2f}s）")
+            except Exception as e:
+                result = BatchJobResult(
+                    job_id=job_id,
+                    status="failed",
+                    output_dir=output_dir,
+                    elapsed=time.perf_counter() - start,
+                    error=str(e),
+                    traceback=traceback.format_exc(),
+                )
+                logger.error(f"   ❌ 任務 {job_id} 失敗：{e}")
+
+        if auto_ppt is not None and auto_ppt.job_span is not None:
+            result.stages = auto_ppt.job_span.summary()
+        return result
+
+    def write_report(self, results: List[BatchJobResult], filename: str = None) -> str:
+        """保存批量執行報告（JSON）"""
+        if not filename:
+            filename = os.path.join(self.output_root, "batch_report.json")
+
+        report = {
+            "total": len(results),
+            "success": sum(1 for r in results if r.status == "success"),
+            "failed": sum(1 for r in results if r.status == "failed"),
+            "jobs": [asdict(r) for r in results],
+        }
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        logger.info(f"   💾 批量報告已保存：{filename}")
+        return filename
@@ -0,0 +1,198 @@
+"""
+流程檢查點 - 記錄 AutoPPT 每個階段的完成狀態
+
+manifest.json 保存在任務的 output_dir 中，記錄：
+1. 已爬取的 URL 與對應的內容文件
+2. 圖片元數據
+3. 已上傳到 Gemini 的文件句柄
+4. AI 生成的 JSON 數據
+5. 已保存的輸出文件
+
+resume 模式下跳過已完成的階段，避免保存失敗或進程中斷後重複爬取、上傳和調用模型。
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from AutoPPT.utils.fileio import atomic_write_text
+from AutoPPT.utils.logger import get_logger
+
+logger = get_logger()
+
+# 上傳句柄剩餘有效期少於此值時視為過期，重新上傳
+UPLOAD_EXPIRY_MARGIN = timedelta(minutes=30)
+
+
+def fingerprint_request(
+    prompt: str, url_links: Optional[List[str]], other_files: Optional[List[str]]
+) -> str:
+    """計算任務輸入的指紋（輸入變更後不沿用舊的生成結果）"""
+    payload = json.dumps(
+        {
+            "prompt": prompt,
+            "url_links": list(url_links or []),
+            "other_files": [f for f in (other_files or []) if f],
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PipelineCheckpoint:
+    """流程檢查點（manifest.json）"""
+
+    FILENAME = "manifest.json"
+    VERSION = 1
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, self.FILENAME)
+        self._lock = threading.Lock()
+        self.data = self._empty()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"⚠️  檢查點文件損壞，忽略：{e}")
+                self.data = self._empty()
+
+    def _empty(self) -> Dict:
+        return {
+            "version": self.VERSION,
+            "request": None,
+            "filename_prefix": None,
+            "scraped_urls": {},
+            "uploads": {},
+            "images": None,
+            "ai_data": None,
+            "outputs": {},
+        }
+
+    def save(self):
+        """原子寫入 manifest.json"""
+        self.data["updated_at"] = datetime.now(timezone.utc).isoformat()
+        atomic_write_text(
+            self.path, json.dumps(self.data, ensure_ascii=False, indent=2, default=str)
+        )
+
+    def start(self, request_fingerprint: str, filename_prefix: str, resume: bool) -> str:
+        """
+        開始一次流程
+
+        Args:
+            request_fingerprint: 任務輸入指紋
+            filename_prefix: 本次運行的文件名前綴
+            resume: 是否沿用已完成的階段
+
+        Returns:
+            實際使用的文件名前綴（resume 時沿用上一次的前綴）
+        """
+        with self._lock:
+            if resume and self.data.get("request") == request_fingerprint:
+                logger.info(f"♻️  從檢查點恢復：{self.path}")
+                return self.data.get("filename_prefix") or filename_prefix
+
+            if resume and self.data.get("request"):
+                logger.info("♻️  任務輸入已變更，忽略生成結果，僅沿用爬取與上傳記錄")
+            elif not resume:
+                # 非 resume 模式：只保留與輸入無關的上傳記錄
+                uploads = self.data.get("uploads", {})
+                self.data = self._empty()
+                self.data["uploads"] = uploads
+
+            self.data["request"] = request_fingerprint
+            self.data["filename_prefix"] = filename_prefix
+            self.data["ai_data"] = None
+            self.data["outputs"] = {}
+            self.save()
+            return filename_prefix
+
+    # ---------- 爬蟲 ----------
+    def get_scraped_file(self, url: str) -> Optional[str]:
+        """獲取已爬取 URL 的內容文件（文件不存在時返回 None）"""
+        content_file = self.data["scraped_urls"].get(url)
+        if content_file and os.path.exists(content_file):
+            return content_file
+        return None
+
+    def record_scraped_url(self, url: str, content_file: str):
+        with self._lock:
+            self.data["scraped_urls"][url] = content_file
+            self.save()
+
+    # ---------- 上傳 ----------
+    @staticmethod
+    def upload_key(file: str) -> str:
+        stat = os.stat(file)
+        return f"{os.path.abspath(file)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+    def get_upload(self, file: str):
+        """獲取仍然有效的上傳句柄（types.File），沒有或快過期時返回 None"""
+        from google.genai import types
+
+        record = self.data["uploads"].get(self.upload_key(file))
+        if not record:
+            return None
+
+        expiration = record.get("expiration_time")
+        if expiration:
+            expires_at = datetime.fromisoformat(expiration)
+            if expires_at - UPLOAD_EXPIRY_MARGIN <= datetime.now(timezone.utc):
+                return None
+
+        return types.File(
+            name=record.get("name"),
+            uri=record.get("uri"),
+            mime_type=record.get("mime_type"),
+        )
+
+    def record_upload(self, file: str, uploaded_file):
+        expiration = getattr(uploaded_file, "expiration_time", None)
+        with self._lock:
+            self.data["uploads"][self.upload_key(file)] = {
+                "name": getattr(uploaded_file, "name", None),
+                "uri": getattr(uploaded_file, "uri", None),
+                "mime_type": getattr(uploaded_file, "mime_type", None),
+                "expiration_time": expiration.isoformat() if expiration else None,
+            }
+            self.save()
+
+    # ---------- 圖片 ----------
+    def get_images(self) -> Optional[Dict]:
+        return self.data.get("images")
+
+    def record_images(self, image_metadata: Dict):
+        """記錄圖片元數據（不含 Gemini 文件句柄，句柄記錄在 uploads）"""
+        with self._lock:
+            self.data["images"] = {
+                image_id: {k: v for k, v in meta.items() if k != "gemini_file"}
+                for image_id, meta in image_metadata.items()
+            }
+            self.save()
+
+    # ---------- AI 生成 ----------
+    def get_ai_data(self) -> Optional[Dict]:
+        return self.data.get("ai_data")
+
+    def record_ai_data(self, ai_data: Dict):
+        with self._lock:
+            self.data["ai_data"] = ai_data
+            self.save()
+
+    # ---------- 輸出 ----------
+    def get_output(self, kind: str) -> Optional[str]:
+        """獲取已保存的輸出文件（文件不存在時返回 None）"""
+        filename = self.data["outputs"].get(kind)
+        if filename and os.path.exists(filename):
+            return filename
+        return None
+
+    def record_output(self, kind: str, filename: str):
+        with self._lock:
+            self.data["outputs"][kind] = filename
+            self.save()
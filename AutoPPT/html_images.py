@@ -0,0 +1,248 @@
+"""
+HTML 預覽中的圖片 - 鏈接的縮略圖或內嵌的小圖
+
+舊的生成器把所有圖片按 base64 內嵌，30 張圖片的預覽有幾十 MB，瀏覽器要全部解碼才能顯示。
+兩種模式：
+
+- linked：每張圖片按固定寬度生成一組縮略圖（按內容哈希命名，只生成一次），
+  以 srcset 交給瀏覽器按顯示尺寸選擇，並延遲加載（loading="lazy"）
+- inline：適合顯示尺寸的縮略圖不超過閾值時內嵌為 data URI，否則與 linked 相同
+
+沒有資源目錄（渲染到內存或流）時不能寫縮略圖：linked 直接引用原圖，
+inline 在內存中生成縮略圖。
+"""
+
+import base64
+import io
+import math
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from AutoPPT.utils.fileio import atomic_write_bytes
+from AutoPPT.utils.image_info import get_image_info
+from AutoPPT.utils.logger import get_logger
+
+logger = get_logger()
+
+IMAGE_MODES = ("linked", "inline")
+
+# 縮略圖寬度（像素），最大的一張不超過原圖寬度
+THUMBNAIL_WIDTHS = (480, 960, 1920)
+
+# inline 模式內嵌的最大字節數
+INLINE_MAX_BYTES = 32 * 1024
+
+# 縮略圖所在的子目錄（位於 HTML 資源目錄下）
+IMAGE_DIRNAME = "images"
+
+# PIL 可以縮小的格式（其他格式直接複製原圖）
+_RESIZABLE_FORMATS = ("JPEG", "PNG", "WEBP", "BMP", "TIFF")
+
+_MIME_TYPES = {"jpg": "image/jpeg", "png": "image/png", "gif": "image/gif", "webp": "image/webp"}
+
+
+def _thumbnails(image_path: str, info: Dict, widths: List[int], quality: int) -> Dict[int, Tuple[bytes, str]]:
+    """
+    一次解碼生成多個寬度的縮略圖（JPEG 按最大寬度縮小解碼）
+
+    Returns:
+        {寬度: (字節, 擴展名)}；有透明通道的保留 PNG，其他轉為 JPEG
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(image_path) as img:
+        scale = max(widths) / img.width
+        img.draft("RGB", (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+        img = ImageOps.exif_transpose(img)
+        keep_png = img.mode in ("RGBA", "LA", "P") and info.get("format") != "JPEG"
+        img = img.convert("RGBA" if keep_png else "RGB")
+
+    thumbnails = {}
+    for width in sorted(widths, reverse=True):
+        height = max(1, round(img.height * width / img.width))
+        img = img.resize((width, height), Image.LANCZOS) if img.width != width else img
+        buffer = io.BytesIO()
+        if keep_png:
+            img.save(buffer, format="PNG", optimize=True)
+            thumbnails[width] = (buffer.getvalue(), "png")
+        else:
+            img.save(buffer, format="JPEG", quality=quality, optimize=True)
+            thumbnails[width] = (buffer.getvalue(), "jpg")
+    return thumbnails
+
+
+class HTMLImages:
+    """HTML 預覽的圖片地址（作為 HTMLRenderer.render_slide 的 image_attrs）"""
+
+    def __init__(
+        self,
+        mode: str = "linked",
+        asset_dir: str = None,
+        inline_max_bytes: int = INLINE_MAX_BYTES,
+        widths: Tuple[int, ...] = THUMBNAIL_WIDTHS,
+        quality: int = 80,
+    ):
+        """
+        Args:
+            mode: linked 或 inline
+            asset_dir: HTML 資源目錄（可選，縮略圖寫入其中的 images/，按相對地址引用）
+            inline_max_bytes: inline 模式內嵌的最大字節數
+            widths: 縮略圖寬度
+            quality: 縮略圖 JPEG 質量
+        """
+        if mode not in IMAGE_MODES:
+            raise ValueError(f"未知的圖片模式：{mode}（可選：{', '.join(IMAGE_MODES)}）")
+        self.mode = mode
+        self.asset_dir = asset_dir
+        self.inline_max_bytes = inline_max_bytes
+        self.widths = tuple(sorted(widths))
+        self.quality = quality
+        # sha1 → [(寬度, 高度, 文件路徑), ...]
+        self._variants: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._inline: Dict[Tuple[str, int], Optional[str]] = {}
+
+    @property
+    def fingerprint(self) -> Tuple:
+        """影響輸出 HTML 的設置（用於增量渲染的指紋）"""
+        asset_dirname = os.path.basename(os.path.normpath(self.asset_dir)) if self.asset_dir else None
+        return (self.mode, asset_dirname, self.inline_max_bytes, self.widths, self.quality)
+
+    def __call__(self, meta: Dict, box_width: float) -> Optional[Dict[str, str]]:
+        """
+        圖片的 <img> 屬性
+
+        Args:
+            meta: 圖片元數據
+            box_width: 顯示寬度（CSS 像素）
+
+        Returns:
+            屬性字典；圖片不存在時返回 None
+        """
+        path = meta.get('path')
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            info = get_image_info(path)
+        except Exception as e:
+            logger.warning(f"⚠️  無法讀取圖片：{path}（{e}）")
+            return None
+
+        # 高分屏按兩倍顯示寬度選擇
+        target = box_width * 2
+        if self.mode == "inline":
+            data_uri = self._inline_uri(path, info, target)
+            if data_uri:
+                return {"src": data_uri, **self._size(info)}
+
+        if not self.asset_dir:
+            return {"src": Path(path).resolve().as_uri(), **self._lazy(info)}
+
+        variants = self._linked_variants(path, info)
+        chosen = next((v for v in variants if v[0] >= target), variants[-1])
+        attrs = {"src": self._url(chosen[2])}
+        if len(variants) > 1:
+            attrs["srcset"] = ", ".join(f"{self._url(v[2])} {v[0]}w" for v in variants)
+            attrs["sizes"] = f"{round(box_width)}px"
+        return {**attrs, **self._lazy(info)}
+
+    def _url(self, variant_path: str) -> str:
+        """縮略圖相對於 HTML 文件的地址"""
+        dirname = os.path.basename(os.path.normpath(self.asset_dir))
+        return f"{dirname}/{IMAGE_DIRNAME}/{os.path.basename(variant_path)}"
+
+    @staticmethod
+    def _size(info: Dict) -> Dict[str, str]:
+        # 寬高讓瀏覽器在圖片加載前預留空間
+        return {"width": str(info["width"]), "height": str(info["height"])}
+
+    def _lazy(self, info: Dict) -> Dict[str, str]:
+        return {**self._size(info), "loading": "lazy", "decoding": "async"}
+
+    def _target_widths(self, info: Dict) -> List[int]:
+        widths = [w for w in self.widths if w < info["width"]]
+        widths.append(min(info["width"], self.widths[-1]))
+        return sorted(set(widths))
+
+    def _image_dir(self) -> str:
+        image_dir = os.path.join(self.asset_dir, IMAGE_DIRNAME)
+        os.makedirs(image_dir, exist_ok=True)
+        return image_dir
+
+    def _linked_variants(self, path: str, info: Dict) -> List[Tuple[int, int, str]]:
+        """生成（或找到已生成的）縮略圖"""
+        sha1 = info["sha1"]
+        if sha1 not in self._variants:
+            if info.get("format") in _RESIZABLE_FORMATS:
+                self._variants[sha1] = self._linked_resized(path, info, self._target_widths(info))
+            else:
+                # 動圖、矢量圖等不縮小，複製原圖
+                ext = os.path.splitext(path)[1].lower() or ".img"
+                target = os.path.join(self._image_dir(), f"{sha1[:16]}{ext}")
+                if not os.path.exists(target):
+                    shutil.copyfile(path, target)
+                self._variants[sha1] = [(info["width"], info["height"], target)]
+        return self._variants[sha1]
+
+    def _linked_resized(self, path: str, info: Dict, widths: List[int]) -> List[Tuple[int, int, str]]:
+        """已生成的縮略圖直接使用，缺少的一次解碼生成"""
+        image_dir = self._image_dir()
+        found = {}
+        for width in widths:
+            prefix = os.path.join(image_dir, f"{info['sha1'][:16]}_{width}w_q{self.quality}")
+            found[width] = next(
+                (f"{prefix}.{ext}" for ext in ("jpg", "png") if os.path.exists(f"{prefix}.{ext}")),
+                None,
+            )
+
+        missing = [width for width, variant in found.items() if variant is None]
+        if missing:
+            for width, (data, ext) in self._encode(path, info, missing).items():
+                prefix = os.path.join(image_dir, f"{info['sha1'][:16]}_{width}w_q{self.quality}")
+                found[width] = atomic_write_bytes(f"{prefix}.{ext}", data)
+
+        return [
+            (width, max(1, round(info["height"] * width / info["width"])), found[width])
+            for width in widths
+        ]
+
+    def _encode(self, path: str, info: Dict, widths: List[int]) -> Dict[int, Tuple[bytes, str]]:
+        """指定寬度的圖片字節（原寬度的 JPEG / PNG 直接使用原圖）"""
+        encoded = {}
+        if info["width"] in widths and info.get("format") in ("JPEG", "PNG"):
+            with open(path, "rb") as f:
+                encoded[info["width"]] = (f.read(), "jpg" if info["format"] == "JPEG" else "png")
+        rest = [width for width in widths if width not in encoded]
+        if rest:
+            encoded.update(_thumbnails(path, info, rest, self.quality))
+        return encoded
+
+    def _inline_uri(self, path: str, info: Dict, target: float) -> Optional[str]:
+        """適合顯示尺寸的縮略圖不超過閾值時返回 data URI"""
+        widths = self._target_widths(info)
+        width = next((w for w in widths if w >= target), widths[-1])
+        key = (info["sha1"], width)
+        if key not in self._inline:
+            self._inline[key] = self._build_inline_uri(path, info, width)
+        return self._inline[key]
+
+    def _build_inline_uri(self, path: str, info: Dict, width: int) -> Optional[str]:
+        if info.get("format") in _RESIZABLE_FORMATS:
+            if self.asset_dir:
+                # 縮略圖同時留給 linked 回退使用
+                variant = self._linked_resized(path, info, [width])[0][2]
+                with open(variant, "rb") as f:
+                    data, ext = f.read(), variant.rsplit(".", 1)[1]
+            else:
+                data, ext = self._encode(path, info, [width])[width]
+        else:
+            ext = os.path.splitext(path)[1].lower().lstrip(".")
+            if ext not in _MIME_TYPES or info.get("bytes", 0) > self.inline_max_bytes:
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+
+        if len(data) > self.inline_max_bytes:
+            return None
+        return f"data:{_MIME_TYPES[ext]};base64,{base64.b64encode(data).decode('ascii')}"
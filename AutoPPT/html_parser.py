@@ -0,0 +1,235 @@
+"""
+HTML 解析器 - 把（用戶編輯過的）HTML 預覽解析回 slide 數據
+
+使用 lxml 解析，所有選擇器在導入時預編譯為 XPath，每張 slide 只遍歷一次標記元素：
+
+- html_renderer 的輸出：<section class="slide" data-slide-type> 中帶 data-key 的元素，
+  要點來自 <li class="level-N">，圖片來自 <img data-image-id>，圖文布局來自 data-layout
+- 舊版 HTML 生成器的輸出：<div class="slide slide-opening"> 等類名
+
+解析結果與 AI 生成的 JSON 格式相同（{"title": ..., "slides": [...]}），
+可以直接交給 PPTXGenerator 按模板渲染。
+"""
+
+import os
+import re
+from typing import Dict, Optional, Union
+from urllib.parse import unquote, urlparse
+
+from lxml import etree
+from lxml import html as lxml_html
+
+from AutoPPT.utils.image_info import try_get_image_info
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# ---------- 預編譯的選擇器 ----------
+_TITLE = etree.XPath("string(//title)")
+_SLIDES = etree.XPath("//section[@data-slide-type]")
+_LEGACY_SLIDES = etree.XPath(
+    f"//div[{_has_class('presentation-container')}]/div[{_has_class('slide')}]"
+)
+_FIELDS = etree.XPath(".//*[@data-key]")
+_ITEMS = etree.XPath(".//li")
+_ITEM_TEXT = etree.XPath(f".//text()[not(ancestor::span[{_has_class('bullet')}])]")
+_PARAGRAPHS = etree.XPath(".//p")
+_IMAGE = etree.XPath(".//img[@src or @data-image-id][1]")
+
+_LEGACY_FIELDS = {
+    name: etree.XPath(f".//{tag}[{_has_class(css_class)}][1]")
+    for name, tag, css_class in (
+        ('main_title', 'h1', 'main-title'),
+        ('subtitle', 'p', 'subtitle'),
+        ('section_title', 'h2', 'section-title'),
+        ('closing_title', 'h1', 'closing-title'),
+        ('closing_subtext', 'p', 'closing-subtext'),
+        ('slide_title', 'h2', 'slide-title'),
+        ('bullet_list', 'ul', 'bullet-list'),
+        ('image_text', 'div', 'image-text-container'),
+        ('full_image', 'div', 'full-image-container'),
+        ('text_box', 'div', 'text-box'),
+        ('caption', 'p', 'caption'),
+    )
+}
+
+# 縮略圖文件名以原圖內容哈希的前 16 位開頭（見 html_images）
+_THUMBNAIL_NAME = re.compile(r"^([0-9a-f]{16})(?:_\d+w_q\d+)?\.\w+$")
+
+# 源碼中的換行（連同縮進）在 HTML 中只是空格
+_SOURCE_BREAK = re.compile(r"\s*\n\s*")
+
+
+def _clean(text: str) -> str:
+    return _SOURCE_BREAK.sub(" ", text).strip()
+
+
+def _text(elem) -> str:
+    """元素文本：多個 <p> 段落按行連接"""
+    paragraphs = _PARAGRAPHS(elem)
+    if paragraphs:
+        lines = (_clean("".join(p.itertext())) for p in paragraphs)
+        return "\n".join(line for line in lines if line)
+    return _clean("".join(elem.itertext()))
+
+
+def _bullets(list_elem) -> Dict:
+    """<li> → bullets、indent_levels（層級來自 level-N 或舊版的 indent-N 類名）"""
+    bullets = []
+    indent_levels = []
+    for item in _ITEMS(list_elem):
+        text = _clean("".join(_ITEM_TEXT(item)))
+        if not text:
+            continue
+        classes = (item.get("class") or "").split()
+        bullets.append(text)
+        indent_levels.append(1 if "level-1" in classes or "indent-1" in classes else 0)
+    return {'bullets': bullets, 'indent_levels': indent_levels}
+
+
+class HTMLSlideParser:
+    """HTML → slide 數據（可重複使用，不能在線程間共享）"""
+
+    def __init__(self, image_metadata: Dict = None):
+        """
+        Args:
+            image_metadata: 圖片元數據（用於把沒有 data-image-id 的圖片地址對應回圖片 ID）
+        """
+        self.image_metadata = image_metadata or {}
+        self._sources: Optional[Dict[str, str]] = None
+        self._base_dir = ''
+
+    def parse(self, html: Union[str, bytes], base_dir: str = '') -> Dict:
+        """
+        解析 HTML 文檔
+
+        Args:
+            html: HTML 文本或字節（字節按文檔聲明的編碼解碼）
+            base_dir: 相對圖片地址的基準目錄（通常為 HTML 文件所在目錄）
+
+        Returns:
+            {"title": 文檔標題, "slides": [slide 數據, ...]}；找不到 slides 時 slides 為空
+        """
+        root = lxml_html.document_fromstring(html)
+        self._base_dir = base_dir
+        sections = _SLIDES(root)
+        if sections:
+            slides = [self._parse_section(section) for section in sections]
+        else:
+            slides = [self._parse_legacy(elem) for elem in _LEGACY_SLIDES(root)]
+        return {'title': _clean(_TITLE(root)), 'slides': slides}
+
+    def parse_file(self, html_file: str) -> Dict:
+        """解析 HTML 文件"""
+        with open(html_file, "rb") as f:
+            return self.parse(f.read(), os.path.dirname(os.path.abspath(html_file)))
+
+    # ---------- html_renderer 輸出 ----------
+    def _parse_section(self, section) -> Dict:
+        slide_data = {'slide_type': section.get('data-slide-type')}
+        layout = section.get('data-layout')
+        if layout:
+            slide_data['layout'] = layout
+        for elem in _FIELDS(section):
+            image = _IMAGE(elem)
+            if image:
+                slide_data['image_id'] = self._image_id(image[0])
+            elif _ITEMS(elem):
+                slide_data.update(_bullets(elem))
+            else:
+                text = _text(elem)
+                if text:
+                    slide_data[elem.get('data-key')] = text
+        return slide_data
+
+    # ---------- 舊版 HTML ----------
+    def _parse_legacy(self, elem) -> Dict:
+        classes = (elem.get("class") or "").split()
+        field = self._legacy_field(elem)
+
+        if "slide-opening" in classes:
+            return {
+                'slide_type': 'opening',
+                'title': field('main_title'),
+                'subtitle': field('subtitle'),
+            }
+        if "slide-section" in classes:
+            return {'slide_type': 'section_divider', 'section_title': field('section_title')}
+        if "slide-closing" in classes:
+            return {
+                'slide_type': 'closing',
+                'closing_text': field('closing_title') or '謝謝觀看',
+                'subtext': field('closing_subtext'),
+            }
+
+        image = _IMAGE(elem)
+        image_id = self._image_id(image[0]) if image else ''
+        if _LEGACY_FIELDS['full_image'](elem):
+            return {
+                'slide_type': 'full_image',
+                'title': field('slide_title'),
+                'image_id': image_id,
+                'caption': field('caption'),
+            }
+        container = _LEGACY_FIELDS['image_text'](elem)
+        if container:
+            vertical = "layout-vertical" in (container[0].get("class") or "").split()
+            return {
+                'slide_type': 'image_with_text',
+                'title': field('slide_title'),
+                'image_id': image_id,
+                'text': field('text_box'),
+                'layout': 'vertical' if vertical else 'horizontal',
+            }
+
+        bullet_list = _LEGACY_FIELDS['bullet_list'](elem)
+        return {
+            'slide_type': 'text_content',
+            'title': field('slide_title'),
+            **(_bullets(bullet_list[0]) if bullet_list else {'bullets': [], 'indent_levels': []}),
+        }
+
+    @staticmethod
+    def _legacy_field(elem):
+        def field(name: str) -> str:
+            found = _LEGACY_FIELDS[name](elem)
+            return _clean("".join(found[0].itertext())) if found else ''
+        return field
+
+    # ---------- 圖片 ----------
+    def _image_id(self, img) -> str:
+        """圖片 ID：data-image-id，否則按地址（原圖路徑、文件名或縮略圖的內容哈希）查找"""
+        image_id = img.get("data-image-id")
+        if image_id:
+            return image_id
+        src = img.get("src") or ''
+        if not src or src.startswith("data:"):
+            return ''
+        if self._sources is None:
+            self._sources = self._index_sources()
+        path = unquote(urlparse(src).path) if src.startswith("file:") else src
+        name = os.path.basename(path)
+        thumbnail = _THUMBNAIL_NAME.match(name)
+        return (
+            self._sources.get(os.path.realpath(os.path.join(self._base_dir, path)))
+            or self._sources.get(name)
+            or (thumbnail and self._sources.get(thumbnail.group(1)))
+            or src
+        )
+
+    def _index_sources(self) -> Dict[str, str]:
+        """原圖路徑、文件名、內容哈希前 16 位（縮略圖文件名的前綴）→ 圖片 ID"""
+        sources = {}
+        for image_id, meta in self.image_metadata.items():
+            path = meta.get('path')
+            if path:
+                sources[os.path.realpath(path)] = image_id
+                sources.setdefault(os.path.basename(path), image_id)
+            if meta.get('filename'):
+                sources.setdefault(meta['filename'], image_id)
+            sha1 = meta.get('sha1') or (try_get_image_info(path).get('sha1') if path else None)
+            if sha1:
+                sources.setdefault(sha1[:16], image_id)
+        return sources
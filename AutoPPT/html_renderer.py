@@ -0,0 +1,598 @@
+"""
+HTML 渲染引擎 - 按 JSON 模板定義預編譯每個 Slide 類型的 HTML
+
+與 PPTX 使用同一份模板定義（位置、字號、顏色、背景），預覽與 PPTX 輸出一致：
+
+1. 每個模板只編譯一次（按模板文件的緩存鍵共享）：每個 Slide 類型、每種圖文布局
+   編譯成一串片段，靜態部分（位置、樣式）已經是 HTML 字符串，渲染時只需轉義數據並拼接
+2. 與模板無關的 CSS / JS 是固定的靜態資源，按內容哈希命名（autoppt.<哈希>.css），
+   可以寫入資源目錄由瀏覽器緩存，或內嵌到單個 HTML 文件中
+3. 所有數據（文字、圖片地址、標題）都經過轉義
+4. 內容元素帶有 data-key（數據字段）、slide 帶有 data-layout、圖片帶有 data-image-id，
+   編輯過的預覽可以解析回 slide 數據（見 html_parser）
+
+只有 PPTX 布局佔位符、沒有元素定義的類型使用通用的流式排版。
+"""
+
+import hashlib
+import html
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from AutoPPT.template_engine import (
+    DEFAULT_BULLET_STYLE,
+    PPTXTemplate,
+    Position,
+    SlideElement,
+    SlideTypeDefinition,
+    clean_markdown,
+)
+from AutoPPT.utils.fileio import atomic_write_text
+
+# 渲染邏輯改變時遞增（增量渲染的 HTML 片段隨之失效）
+HTML_RENDERER_VERSION = 2
+
+PX_PER_INCH = 96
+PX_PER_PT = 96 / 72
+
+# 圖文布局變體：horizontal、vertical，其他布局（None）使用默認位置與字號
+LAYOUT_VARIANTS = ('horizontal', 'vertical', None)
+
+_ALIGNMENTS = ('left', 'center', 'right')
+
+# 保存到文件時靜態資源所在的子目錄（與 HTML 同目錄）
+HTML_ASSET_DIRNAME = "assets"
+
+STATIC_CSS = """\
+* { margin: 0; padding: 0; box-sizing: border-box; }
+
+html, body { height: 100%; }
+
+body {
+    font-family: '微軟正黑體', 'Microsoft JhengHei', 'Helvetica Neue', Arial, sans-serif;
+    background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
+    overflow: hidden;
+}
+
+.presentation-container { position: relative; width: 100vw; height: 100vh; }
+
+.slide {
+    position: absolute;
+    inset: 0;
+    display: none;
+    align-items: center;
+    justify-content: center;
+}
+
+.slide.active { display: flex; }
+
+.slide-canvas {
+    position: relative;
+    flex: none;
+    width: var(--slide-width);
+    height: var(--slide-height);
+    background: #ffffff;
+    overflow: hidden;
+    transform: scale(var(--slide-scale, 1));
+    box-shadow: 0 10px 40px rgba(0, 0, 0, 0.3);
+}
+
+.el { position: absolute; overflow: hidden; overflow-wrap: anywhere; }
+.el p { white-space: pre-wrap; }
+.el ul { list-style: none; }
+.el li { line-height: 1.3; }
+.el li.level-1 { padding-left: 1.5em; }
+.el-image img { display: block; width: 100%; height: 100%; object-fit: contain; }
+
+.slide-flow {
+    display: flex;
+    flex-direction: column;
+    gap: 24px;
+    height: 100%;
+    padding: 48px 64px;
+    color: #2c3e50;
+}
+
+.slide-flow h2 { font-size: 40px; text-align: center; }
+.slide-flow .subtitle { font-size: 26px; text-align: center; color: #555555; }
+.slide-flow ul { list-style: none; font-size: 24px; }
+.slide-flow li.level-1 { padding-left: 1.5em; font-size: 22px; }
+.slide-flow p { font-size: 22px; line-height: 1.5; white-space: pre-wrap; }
+.slide-flow .el-image { position: relative; flex: 1; min-height: 0; }
+
+.nav-controls {
+    position: fixed;
+    bottom: 40px;
+    left: 50%;
+    transform: translateX(-50%);
+    background: rgba(0, 0, 0, 0.7);
+    padding: 15px 30px;
+    border-radius: 50px;
+    display: flex;
+    gap: 20px;
+    align-items: center;
+    backdrop-filter: blur(10px);
+}
+
+.nav-controls button {
+    background: white;
+    border: none;
+    padding: 12px 24px;
+    border-radius: 25px;
+    cursor: pointer;
+    font-size: 16px;
+    font-weight: bold;
+    color: #2c3e50;
+    transition: all 0.3s;
+}
+
+.nav-controls button:hover { background: #4682b4; color: white; transform: scale(1.05); }
+.nav-controls button:disabled { opacity: 0.5; cursor: not-allowed; }
+
+.slide-counter {
+    color: white;
+    font-size: 16px;
+    font-weight: bold;
+    min-width: 80px;
+    text-align: center;
+}
+"""
+
+STATIC_JS = """\
+(function () {
+    const container = document.querySelector('.presentation-container');
+    const slides = document.querySelectorAll('.slide');
+    const totalSlides = slides.length;
+    const prevBtn = document.getElementById('prevBtn');
+    const nextBtn = document.getElementById('nextBtn');
+    const currentSlideSpan = document.getElementById('currentSlide');
+    let currentSlide = 0;
+
+    document.getElementById('totalSlides').textContent = totalSlides;
+
+    function fit() {
+        const style = getComputedStyle(container);
+        const width = parseFloat(style.getPropertyValue('--slide-width'));
+        const height = parseFloat(style.getPropertyValue('--slide-height'));
+        const scale = Math.min(window.innerWidth / width, (window.innerHeight - 120) / height);
+        container.style.setProperty('--slide-scale', Math.max(scale, 0.1));
+    }
+
+    function showSlide(n) {
+        slides.forEach((slide, i) => slide.classList.toggle('active', i === n));
+        currentSlideSpan.textContent = n + 1;
+        prevBtn.disabled = n === 0;
+        nextBtn.disabled = n === totalSlides - 1;
+    }
+
+    function go(delta) {
+        const n = currentSlide + delta;
+        if (n >= 0 && n < totalSlides) {
+            currentSlide = n;
+            showSlide(n);
+        }
+    }
+
+    prevBtn.addEventListener('click', () => go(-1));
+    nextBtn.addEventListener('click', () => go(1));
+    document.addEventListener('keydown', (e) => {
+        if (e.key === 'ArrowRight' || e.key === ' ') {
+            e.preventDefault();
+            go(1);
+        } else if (e.key === 'ArrowLeft') {
+            e.preventDefault();
+            go(-1);
+        }
+    });
+    window.addEventListener('resize', fit);
+
+    fit();
+    if (totalSlides > 0) {
+        showSlide(0);
+    }
+})();
+"""
+
+_NAV_HTML = """\
+<div class="nav-controls">
+    <button id="prevBtn">◀ 上一張</button>
+    <span class="slide-counter"><span id="currentSlide">1</span> / <span id="totalSlides">0</span></span>
+    <button id="nextBtn">下一張 ▶</button>
+</div>
+"""
+
+
+@dataclass(frozen=True)
+class HTMLAsset:
+    """按內容哈希命名的靜態資源"""
+    kind: str  # css, js
+    content: str
+
+    @property
+    def filename(self) -> str:
+        digest = hashlib.sha1(self.content.encode("utf-8")).hexdigest()[:12]
+        return f"autoppt.{digest}.{self.kind}"
+
+
+CSS_ASSET = HTMLAsset("css", STATIC_CSS)
+JS_ASSET = HTMLAsset("js", STATIC_JS)
+
+
+def write_assets(asset_dir: str) -> Tuple[str, str]:
+    """
+    把靜態資源寫入資源目錄（同名文件已存在時跳過，內容哈希相同即內容相同）
+
+    Returns:
+        (CSS 文件名, JS 文件名)
+    """
+    for asset in (CSS_ASSET, JS_ASSET):
+        path = os.path.join(asset_dir, asset.filename)
+        if not os.path.exists(path):
+            atomic_write_text(path, asset.content)
+    return CSS_ASSET.filename, JS_ASSET.filename
+
+
+def escape(value) -> str:
+    """轉義文本與屬性值"""
+    return html.escape(str(value), quote=True)
+
+
+def image_file_attrs(meta: Dict, box_width: float) -> Optional[Dict[str, str]]:
+    """默認的圖片屬性：原圖的 file:// URI（縮略圖與內嵌見 html_images）"""
+    path = meta.get('path')
+    if not path or not os.path.exists(path):
+        return None
+    return {"src": Path(path).resolve().as_uri()}
+
+
+# (圖片元數據, 顯示寬度 CSS 像素) → <img> 屬性
+ImageAttrs = Callable[[Dict, float], Optional[Dict[str, str]]]
+
+
+# ---------- 編譯 ----------
+def _px(inches: float) -> str:
+    return f"{inches * PX_PER_INCH:g}px"
+
+
+def _font_px(size) -> str:
+    return f"{size.pt * PX_PER_PT:g}px"
+
+
+def _css_color(rgb) -> str:
+    return f"#{rgb}"
+
+
+def _box_css(position: Position) -> str:
+    return (
+        f"left:{_px(position.left)};top:{_px(position.top)};"
+        f"width:{_px(position.width)};height:{_px(position.height)}"
+    )
+
+
+def _background_css(bg_config: Dict) -> str:
+    if not bg_config:
+        return ""
+    if bg_config.get('type', 'solid') == 'gradient':
+        start = bg_config.get('color_start', '#FFFFFF')
+        end = bg_config.get('color_end', '#FFFFFF')
+        return f"background:linear-gradient(135deg,{start} 0%,{end} 100%)"
+    return f"background:{bg_config.get('color', '#FFFFFF')}"
+
+
+def _text_css(element: SlideElement, layout: Optional[str]) -> str:
+    if not element.style:
+        return ""
+    style = element.style.text
+    css = []
+    alignment = element.style.get('alignment')
+    if alignment in _ALIGNMENTS:
+        css.append(f"text-align:{alignment}")
+    font_size = style.font_size_for(layout)
+    if font_size:
+        css.append(f"font-size:{_font_px(font_size)}")
+    if style.bold:
+        css.append("font-weight:bold")
+    if style.color is not None:
+        css.append(f"color:{_css_color(style.color)}")
+    if style.line_spacing:
+        css.append(f"line-height:{style.line_spacing:g}")
+    return ";".join(css)
+
+
+def _bullet_prefixes(element: SlideElement) -> Tuple[str, str]:
+    """每個層級的 <li> 開頭（含項目符號），按層級 0、1"""
+    style = element.style.bullets if element.style else DEFAULT_BULLET_STYLE
+    prefixes = []
+    for level, (symbol, symbol_size, symbol_color, font_size, font_color) in enumerate((
+        (style.symbol_base, style.bullet_size_base, style.bullet_color_base,
+         style.font_size_base, style.font_color_base),
+        (style.symbol_indent, style.bullet_size_indent, style.bullet_color_indent,
+         style.font_size_indent, style.font_color_indent),
+    )):
+        prefixes.append(
+            f'<li class="level-{level}" style="'
+            f'{escape(f"font-size:{_font_px(font_size)};color:{_css_color(font_color)}")}">'
+            f'<span class="bullet" style="'
+            f'{escape(f"font-size:{_font_px(symbol_size)};color:{_css_color(symbol_color)}")}">'
+            f'{escape(symbol)}</span>'
+        )
+    return tuple(prefixes)
+
+
+@dataclass(frozen=True)
+class ElementPart:
+    """編譯後的元素：kind 為 text / image；open_tag、close_tag 已是 HTML"""
+    kind: str
+    key: str
+    open_tag: str
+    close_tag: str
+    # 內容為 bullets 時每個層級的 <li> 開頭（只有 content 文本框有）
+    bullet_prefixes: Tuple[str, ...] = ()
+    # 顯示寬度（CSS 像素，圖片用於選擇縮略圖）
+    width: float = 0
+
+
+@dataclass(frozen=True)
+class CompiledSlideType:
+    """編譯後的 Slide 類型：每種布局變體是一串靜態 HTML 與元素片段"""
+    type_id: str
+    # <section> 的類型屬性與畫布開始標籤（data-layout 按數據插入兩者之間）
+    section_attrs: str
+    canvas_tag: str
+    variants: Mapping[Optional[str], Tuple]
+
+    @classmethod
+    def compile(cls, slide_def: SlideTypeDefinition) -> Optional['CompiledSlideType']:
+        if not slide_def.elements:
+            return None
+        variants = {
+            layout: tuple(
+                part
+                for element in slide_def.elements
+                for part in [cls._compile_element(element, layout)]
+                if part is not None
+            )
+            for layout in LAYOUT_VARIANTS
+        }
+        background = _background_css(slide_def.background)
+        style_attr = f' style="{escape(background)}"' if background else ""
+        return cls(
+            type_id=slide_def.type_id,
+            section_attrs=f' data-slide-type="{escape(slide_def.type_id)}"',
+            canvas_tag=f'<div class="slide-canvas"{style_attr}>',
+            variants=MappingProxyType(variants),
+        )
+
+    @staticmethod
+    def _compile_element(element: SlideElement, layout: Optional[str]):
+        # 與 PPTXTemplate 使用相同的位置選擇邏輯
+        layout_data = {'layout': layout or 'default'}
+        if element.type == 'textbox':
+            position = PPTXTemplate.textbox_position(element, layout_data)
+            if not position:
+                return None
+            css = ";".join(filter(None, (_box_css(position), _text_css(element, layout))))
+            return ElementPart(
+                kind='text',
+                key=element.name,
+                open_tag=(
+                    f'<div class="el el-text" data-key="{escape(element.name)}" style="{escape(css)}">'
+                ),
+                close_tag='</div>',
+                bullet_prefixes=_bullet_prefixes(element) if element.name == 'content' else (),
+            )
+        if element.type == 'image':
+            position = PPTXTemplate.image_position(element, layout_data)
+            if not position:
+                return None
+            return ElementPart(
+                kind='image',
+                key=element.name,
+                open_tag=(
+                    f'<div class="el el-image" data-key="{escape(element.name)}" '
+                    f'style="{escape(_box_css(position))}">'
+                ),
+                close_tag='</div>',
+                width=position.width * PX_PER_INCH,
+            )
+        if element.type == 'shape' and element.position and element.shape_type == 'rectangle':
+            css = _box_css(element.position)
+            if element.style and element.style.text.fill_color is not None:
+                css += f";background:{_css_color(element.style.text.fill_color)}"
+            return f'<div class="el el-shape" style="{escape(css)}"></div>'
+        return None
+
+
+# ---------- 渲染 ----------
+def _paragraphs(text_value) -> str:
+    """文本 → <p> 段落（與 PPTX 一致：清理 markdown，多行時去掉空行）"""
+    text = clean_markdown(str(text_value))
+    if '\n' not in text:
+        return f"<p>{escape(text)}</p>"
+    return "".join(
+        f"<p>{escape(line.strip())}</p>" for line in text.split('\n') if line.strip()
+    )
+
+
+def _bullets_html(slide_data: Dict, prefixes: Tuple[str, ...] = None) -> str:
+    bullets = slide_data.get('bullets') or []
+    indent_levels = slide_data.get('indent_levels') or [0] * len(bullets)
+    items = []
+    for bullet, level in zip(bullets, indent_levels):
+        if prefixes:
+            items.append(f"{prefixes[1 if level > 0 else 0]}{escape(bullet)}</li>")
+        else:
+            items.append(f'<li class="level-{1 if level > 0 else 0}">{escape(bullet)}</li>')
+    return f"<ul>{''.join(items)}</ul>"
+
+
+def _section_open(slide_type_id: str, slide_data: Dict, section_attrs: str = None) -> str:
+    """<section> 開始標籤（數據中有 layout 時記錄在 data-layout）"""
+    if section_attrs is None:
+        section_attrs = f' data-slide-type="{escape(slide_type_id)}"'
+    layout = slide_data.get('layout')
+    if layout:
+        section_attrs += f' data-layout="{escape(str(layout))}"'
+    return f'<section class="slide"{section_attrs}>'
+
+
+# 流式排版使用的字段：標題、副標題、段落
+_FLOW_TITLES = ('title', 'section_title', 'closing_text')
+_FLOW_SUBTITLES = ('subtitle', 'subtext')
+_FLOW_TEXTS = ('text', 'content', 'caption')
+
+
+class HTMLRenderer:
+    """編譯後的 HTML 渲染器（不可變，可在線程間共享）"""
+
+    def __init__(self, template: PPTXTemplate):
+        self.template = template
+        self.slide_types: Dict[str, Optional[CompiledSlideType]] = {
+            type_id: CompiledSlideType.compile(slide_def)
+            for type_id, slide_def in template.slide_types.items()
+        }
+        config = template.get_presentation_config()
+        self.canvas_width = config['slide_width'] * PX_PER_INCH
+        self.canvas_style = (
+            f"--slide-width:{_px(config['slide_width'])};"
+            f"--slide-height:{_px(config['slide_height'])}"
+        )
+
+    @classmethod
+    def for_template(cls, template: PPTXTemplate) -> 'HTMLRenderer':
+        """獲取模板的渲染器（每個模板版本只編譯一次）"""
+        key = (template.json_path, template.compiled.key)
+        renderer = _renderers.get(key)
+        if renderer is None:
+            with _renderers_lock:
+                renderer = _renderers.get(key)
+                if renderer is None:
+                    renderer = cls(template)
+                    _renderers[key] = renderer
+        return renderer
+
+    def render_slide(
+        self,
+        slide_data: Dict,
+        image_metadata: Dict = None,
+        image_attrs: ImageAttrs = image_file_attrs,
+    ) -> str:
+        """
+        渲染單張 slide
+
+        Args:
+            slide_data: Slide 數據
+            image_metadata: 圖片元數據
+            image_attrs: (圖片元數據, 顯示寬度) → <img> 屬性（返回 None 時不顯示圖片）
+        """
+        image_id = slide_data.get('image_id')
+        image_meta = (image_metadata or {}).get(image_id) if image_id else None
+        slide_type_id = slide_data.get('slide_type', 'text_content')
+        compiled = self.slide_types.get(slide_type_id)
+        if compiled is None and slide_type_id not in self.slide_types:
+            compiled = self.slide_types.get('text_content')
+        if compiled is None:
+            image = self._image_html(image_id, image_meta, image_attrs, self.canvas_width)
+            return self._render_flow(slide_data, slide_type_id, image)
+
+        layout = slide_data.get('layout', 'horizontal')
+        parts = compiled.variants[layout if layout in ('horizontal', 'vertical') else None]
+        # 使用 text_content 回退的類型仍記錄原始類型
+        section_attrs = compiled.section_attrs if compiled.type_id == slide_type_id else None
+        out = [_section_open(slide_type_id, slide_data, section_attrs), compiled.canvas_tag]
+        for part in parts:
+            if isinstance(part, str):
+                out.append(part)
+            elif part.kind == 'text':
+                if part.bullet_prefixes and 'bullets' in slide_data:
+                    content = _bullets_html(slide_data, part.bullet_prefixes)
+                else:
+                    value = slide_data.get(part.key, '')
+                    if not value:
+                        continue
+                    content = _paragraphs(value)
+                out.append(f"{part.open_tag}{content}{part.close_tag}")
+            else:
+                image = self._image_html(image_id, image_meta, image_attrs, part.width)
+                if image:
+                    out.append(f"{part.open_tag}{image}{part.close_tag}")
+        out.append("</div></section>")
+        return "".join(out)
+
+    @staticmethod
+    def _render_flow(slide_data: Dict, slide_type_id: str, image: str) -> str:
+        """沒有元素定義的類型：標題、副標題、要點、段落、圖片依次排列"""
+        out = [
+            _section_open(slide_type_id, slide_data),
+            '<div class="slide-canvas"><div class="slide-flow">',
+        ]
+        for key in _FLOW_TITLES:
+            if slide_data.get(key):
+                out.append(f'<h2 data-key="{key}">{escape(clean_markdown(str(slide_data[key])))}</h2>')
+                break
+        for key in _FLOW_SUBTITLES:
+            if slide_data.get(key):
+                out.append(f'<div class="subtitle" data-key="{key}">{_paragraphs(slide_data[key])}</div>')
+        if slide_data.get('bullets'):
+            out.append(f'<div data-key="content">{_bullets_html(slide_data)}</div>')
+        for key in _FLOW_TEXTS:
+            if slide_data.get(key):
+                out.append(f'<div data-key="{key}">{_paragraphs(slide_data[key])}</div>')
+        if image:
+            out.append(f'<div class="el-image" data-key="image">{image}</div>')
+        out.append("</div></div></section>")
+        return "".join(out)
+
+    @staticmethod
+    def _image_html(image_id: str, meta: Optional[Dict], image_attrs: ImageAttrs, width: float) -> str:
+        attrs = image_attrs(meta, width) if meta else None
+        if not attrs:
+            return ""
+        attrs = {
+            **attrs,
+            "alt": meta.get('description') or meta.get('filename') or '',
+            "data-image-id": str(image_id),
+        }
+        return "<img " + " ".join(f'{name}="{escape(value)}"' for name, value in attrs.items()) + ">"
+
+    # ---------- 文檔 ----------
+    def head(self, title: str, assets: Tuple[str, str] = None) -> str:
+        """
+        文檔開頭（到幻燈片容器開始標籤為止）
+
+        Args:
+            title: 文檔標題
+            assets: (CSS 地址, JS 地址)；None 時內嵌靜態資源
+        """
+        if assets:
+            style = f'<link rel="stylesheet" href="{escape(assets[0])}">'
+        else:
+            style = f"<style>\n{CSS_ASSET.content}</style>"
+        return (
+            "<!DOCTYPE html>\n"
+            '<html lang="zh-TW">\n<head>\n<meta charset="UTF-8">\n'
+            '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+            f"<title>{escape(title)}</title>\n{style}\n</head>\n<body>\n"
+            f'<div class="presentation-container" style="{escape(self.canvas_style)}">\n'
+        )
+
+    def tail(self, assets: Tuple[str, str] = None) -> str:
+        """文檔結尾（幻燈片容器結束標籤之後）"""
+        if assets:
+            script = f'<script src="{escape(assets[1])}"></script>'
+        else:
+            script = f"<script>\n{JS_ASSET.content}</script>"
+        return f"</div>\n{_NAV_HTML}{script}\n</body>\n</html>\n"
+
+    def document(self, title: str, slides_html: List[str], assets: Tuple[str, str] = None) -> str:
+        """完整的 HTML 文檔"""
+        return self.head(title, assets) + "".join(f"{html}\n" for html in slides_html) + self.tail(assets)
+
+
+# (模板 JSON 路徑, 模板緩存鍵) → HTMLRenderer
+_renderers: Dict[Tuple, HTMLRenderer] = {}
+_renderers_lock = threading.Lock()
@@ -0,0 +1,184 @@
+"""
+增量渲染 - 只重新渲染數據有變化的 slides
+
+每張 slide 有一個指紋：slide 數據 + 模板中對應類型的定義 + 引用圖片的內容哈希。
+輸出文件旁保存指紋記錄（.<文件名>.fingerprints.json）：
+
+- PPTX：每個指紋對應的 slide 部件名；重新渲染時直接從上一次的包中複製未變化的
+  slide XML、關係和圖片，只渲染指紋變化的 slides
+- HTML：每個指紋對應的 slide HTML 片段
+
+記錄不存在、版本不符或讀取失敗時退回完整渲染。
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import zipfile
+from typing import Dict, List, Optional, Tuple
+
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import parse_xml
+from pptx.opc.packuri import PackURI
+from pptx.opc.spec import image_content_types
+
+from AutoPPT.utils.fileio import atomic_write_text
+from AutoPPT.utils.image_info import try_get_image_info
+from AutoPPT.utils.logger import get_logger
+
+logger = get_logger()
+
+# 渲染邏輯改變時遞增，舊的指紋記錄全部失效
+FINGERPRINT_VERSION = 1
+
+
+def fingerprint_path(output_path: str) -> str:
+    """輸出文件對應的指紋記錄路徑"""
+    directory, name = os.path.split(os.path.abspath(output_path))
+    return os.path.join(directory, f".{name}.fingerprints.json")
+
+
+def image_sha1(image_metadata: Dict, slide_data: Dict, image_path: str = None) -> Optional[str]:
+    """slide 引用圖片的內容哈希（image_path 為實際嵌入的圖片，默認為原圖）"""
+    meta = (image_metadata or {}).get(slide_data.get('image_id') or '')
+    if not meta:
+        return None
+    path = image_path or meta.get('path')
+    if not image_path and meta.get('sha1'):
+        return meta['sha1']
+    return try_get_image_info(path).get('sha1') if path else None
+
+
+def slide_fingerprint(slide_data: Dict, type_fingerprint: Optional[str], image: Optional[str], **extra) -> str:
+    """
+    計算 slide 指紋
+
+    Args:
+        slide_data: Slide 數據
+        type_fingerprint: 模板中對應類型的指紋
+        image: 引用圖片的內容哈希
+        **extra: 其他影響渲染結果的設置
+    """
+    payload = json.dumps(
+        [FINGERPRINT_VERSION, slide_data, type_fingerprint, image, extra],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def load_fingerprints(output_path: str, kind: str) -> List[Dict]:
+    """讀取輸出文件的指紋記錄（無效時返回空列表）"""
+    try:
+        with open(fingerprint_path(output_path), "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+    if record.get("version") != FINGERPRINT_VERSION or record.get("kind") != kind:
+        return []
+    return record.get("slides", [])
+
+
+def save_fingerprints(output_path: str, kind: str, slides: List[Dict]):
+    """保存輸出文件的指紋記錄（寫入失敗只記錄警告，不影響輸出文件）"""
+    record = {"version": FINGERPRINT_VERSION, "kind": kind, "slides": slides}
+    try:
+        atomic_write_text(fingerprint_path(output_path), json.dumps(record, ensure_ascii=False))
+    except OSError as e:
+        logger.warning(f"⚠️  保存 slide 指紋失敗：{e}")
+
+
+class PreviousPackage:
+    """上一次輸出的 PPTX（按指紋查找可以重用的 slide）"""
+
+    def __init__(self, path: str, slides: List[Dict]):
+        self._zip = zipfile.ZipFile(path)
+        self._partnames = {entry["fingerprint"]: entry["partname"] for entry in slides}
+        self._images: Dict[str, Optional[Tuple[str, tuple]]] = {}
+
+    @classmethod
+    def open(cls, path: Optional[str]) -> Optional["PreviousPackage"]:
+        """打開上一次的輸出（沒有文件或指紋記錄時返回 None）"""
+        if not path or not os.path.exists(path):
+            return None
+        slides = load_fingerprints(path, "pptx")
+        if not slides:
+            return None
+        try:
+            return cls(path, slides)
+        except (OSError, zipfile.BadZipFile) as e:
+            logger.warning(f"⚠️  無法讀取上一次的 PPTX，完整渲染：{e}")
+            return None
+
+    def __enter__(self) -> "PreviousPackage":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    def get(self, fingerprint: str) -> Optional[Tuple[bytes, List[Tuple], Dict]]:
+        """
+        獲取指紋相同的 slide
+
+        Returns:
+            (XML, 關係, 圖片 {sha1: (字節, 擴展名, 內容類型, 文件名)})，
+            格式與 parallel_render.export_slides 一致；找不到或無法重用時返回 None
+        """
+        partname = self._partnames.get(fingerprint)
+        if partname is None:
+            return None
+        try:
+            return self._read_slide(PackURI(partname))
+        except (KeyError, ValueError, OSError, zipfile.BadZipFile) as e:
+            logger.debug(f"   無法重用 slide {partname}：{e}")
+            return None
+
+    def _read_slide(self, partname: PackURI) -> Optional[Tuple[bytes, List[Tuple], Dict]]:
+        xml = self._zip.read(partname.membername)
+        rels = []
+        images = {}
+        if partname.rels_uri.membername in self._zip.NameToInfo:
+            rels_elm = parse_xml(self._zip.read(partname.rels_uri.membername))
+            # 圖片部件的文件名只記錄在引用它的圖片形狀上
+            descriptions = {
+                pic.blipFill.blip.rEmbed: pic.nvPicPr.cNvPr.get("descr")
+                for pic in parse_xml(xml).xpath(".//p:pic[p:blipFill/a:blip/@r:embed]")
+            }
+            for rel in rels_elm.relationship_lst:
+                if rel.targetMode == RTM.EXTERNAL:
+                    rels.append((rel.rId, rel.reltype, "external", rel.target_ref))
+                    continue
+
+                target = PackURI.from_rel_ref(partname.baseURI, rel.target_ref)
+                if rel.reltype == RT.SLIDE_LAYOUT:
+                    rels.append((rel.rId, rel.reltype, "layout", str(target)))
+                elif rel.reltype == RT.IMAGE:
+                    image = self._read_image(target, descriptions.get(rel.rId))
+                    if image is None:
+                        return None
+                    sha1, item = image
+                    images[sha1] = item
+                    rels.append((rel.rId, rel.reltype, "image", sha1))
+                else:
+                    # 備註、圖表等部件不重用
+                    return None
+        return xml, rels, images
+
+    def _read_image(self, partname: PackURI, filename: str = None) -> Optional[Tuple[str, tuple]]:
+        if partname not in self._images:
+            content_type = image_content_types.get(partname.ext.lower())
+            if content_type is None:
+                self._images[partname] = None
+            else:
+                blob = self._zip.read(partname.membername)
+                self._images[partname] = (
+                    hashlib.sha1(blob).hexdigest(),
+                    (blob, partname.ext, content_type, filename or posixpath.basename(partname)),
+                )
+        return self._images[partname]
@@ -0,0 +1,235 @@
+"""
+媒體去重 - 整個 PPTX 包中每張圖片只保存一個媒體部件
+
+同一張圖片可能出現在多張 slide（AI 重複使用同一個 image_id、模板中的 logo）。
+逐次 add_picture / insert_picture 時：
+
+1. 圖片預處理按每個放置框分別縮小，不同尺寸的放置會產生不同的媒體文件
+2. python-pptx 每次都重新讀取並哈希圖片，再掃描整個包查找相同的媒體部件
+   （完全相同的文件 python-pptx 本身也只保存一份）
+
+MediaRegistry 在渲染前為每張圖片選定一個共用版本（按要求最高的放置框縮小），
+之後按內容哈希（圖片信息緩存中的 sha1）直接找到已有的媒體部件，只新增關係。
+"""
+
+import os
+from typing import Dict, Iterable, Tuple
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+from pptx.oxml.shapes.picture import CT_Picture
+from pptx.parts.image import ImagePart
+from pptx.shapes.placeholder import PlaceholderPicture
+
+from AutoPPT.utils.image_info import get_image_info
+from AutoPPT.utils.logger import get_logger
+
+logger = get_logger()
+
+# 圖片格式 → (擴展名, MIME 類型)，與 python-pptx 的格式映射一致
+_IMAGE_FORMATS = {
+    "BMP": ("bmp", "image/bmp"),
+    "GIF": ("gif", "image/gif"),
+    "JPEG": ("jpg", "image/jpeg"),
+    "PNG": ("png", "image/png"),
+    "TIFF": ("tiff", "image/tiff"),
+}
+
+_MEDIA_PREFIX = "/ppt/media/image"
+
+
+class MediaRegistry:
+    """PPTX 包的圖片媒體登記（按內容哈希共用媒體部件）"""
+
+    def __init__(self, prs, image_optimizer=None):
+        """
+        Args:
+            prs: Presentation 對象（模板中已有的圖片也會登記）
+            image_optimizer: 圖片預處理器（可選，見 utils.image_optimizer）
+        """
+        self.prs = prs
+        self.package = prs.part.package
+        self.image_optimizer = image_optimizer
+        # 流式寫入器（可選，見 pptx_writer）：新的媒體部件創建後立即寫入並釋放字節
+        self.writer = None
+        self._parts: Dict[str, ImagePart] = {}
+        self._sizes: Dict[str, int] = {}
+        self._variants: Dict[str, str] = {}
+        self._used = set()
+        self._next_index = 1
+
+        self.placements = 0
+        self.placement_bytes = 0
+        self.created_bytes = 0
+
+        for part in self.package.iter_parts():
+            if isinstance(part, ImagePart):
+                self._register(part.sha1, part)
+
+    @property
+    def shared_bytes(self) -> int:
+        """
+        重複放置共用的字節數（placement_bytes - 新增的媒體大小）
+
+        不是相對舊版本的節省：相同文件的重複放置 python-pptx 也只保存一份。
+        """
+        return self.placement_bytes - self.created_bytes
+
+    @property
+    def variants(self) -> Dict[str, str]:
+        """規劃好的圖片版本 {原圖路徑: 要嵌入的圖片路徑}（可傳給其他進程共用）"""
+        return self._variants
+
+    def _register(self, sha1: str, part: ImagePart):
+        if sha1 in self._parts:
+            return
+        self._parts[sha1] = part
+        self._sizes[sha1] = len(part.blob)
+        if part.partname.startswith(_MEDIA_PREFIX) and part.partname.idx is not None:
+            self._next_index = max(self._next_index, part.partname.idx + 1)
+
+    # ---------- 圖片版本 ----------
+    def plan(self, template, slides: Iterable[Dict], image_metadata: Dict):
+        """
+        渲染前收集每張圖片的所有放置框，為每張圖片選定一個共用的預處理版本
+
+        Args:
+            template: PPTXTemplate 模板對象
+            slides: AI 數據中的 slides
+            image_metadata: 圖片元數據
+        """
+        if not self.image_optimizer or not image_metadata:
+            return
+
+        boxes: Dict[str, list] = {}
+        for slide_data in slides:
+            try:
+                slide_boxes = template.image_boxes(self.prs, slide_data, image_metadata)
+            except Exception as e:
+                # 無法規劃的放置在渲染時按自己的放置框處理
+                logger.debug(f"   圖片放置規劃失敗：{e}")
+                continue
+            if slide_boxes:
+                path = image_metadata[slide_data['image_id']]['path']
+                boxes.setdefault(path, []).extend(slide_boxes)
+
+        for path, path_boxes in boxes.items():
+            if os.path.exists(path):
+                self._variants[path] = self.image_optimizer.optimize_for(path, path_boxes)
+
+    def image_path(self, image_path: str, width: int, height: int, cover: bool = False) -> str:
+        """
+        獲取要嵌入的圖片路徑（優先使用規劃好的共用版本）
+
+        Args:
+            image_path: 原圖路徑
+            width: 放置寬度（EMU）
+            height: 放置高度（EMU）
+            cover: 圖片需要鋪滿放置框時為 True
+        """
+        if not self.image_optimizer:
+            return image_path
+        planned = self._variants.get(image_path)
+        if planned:
+            return planned
+        return self.image_optimizer.optimize(image_path, width, height, cover)
+
+    # ---------- 媒體部件 ----------
+    def relate_image(self, slide_part, image_path: str) -> Tuple[ImagePart, str]:
+        """
+        關聯圖片到 slide（相同內容的圖片共用一個媒體部件）
+
+        Returns:
+            (image_part, rId)
+        """
+        sha1 = get_image_info(image_path)["sha1"]
+        image_part = self._parts.get(sha1)
+
+        if image_part is None:
+            info = get_image_info(image_path)
+            if info.get("format") in _IMAGE_FORMATS:
+                ext, content_type = _IMAGE_FORMATS[info["format"]]
+                with open(image_path, "rb") as f:
+                    blob = f.read()
+                image_part = self._new_part(
+                    blob, ext, content_type, os.path.basename(image_path)
+                )
+            else:
+                # 其他格式交給 python-pptx 識別
+                image_part = self.package.get_or_add_image_part(image_path)
+            self._add_part(sha1, image_part)
+
+        self.placements += 1
+        self.placement_bytes += self._sizes[sha1]
+        self._used.add(sha1)
+        return image_part, slide_part.relate_to(image_part, RT.IMAGE)
+
+    def merge_media(
+        self, sha1: str, blob: bytes, ext: str, content_type: str, filename: str
+    ) -> ImagePart:
+        """合併其他進程渲染時使用的圖片（放置次數由 merge_stats 合併）"""
+        image_part = self._parts.get(sha1)
+        if image_part is None:
+            image_part = self._new_part(blob, ext, content_type, filename)
+            self._add_part(sha1, image_part)
+        self._used.add(sha1)
+        return image_part
+
+    def merge_stats(self, summary: Dict):
+        """合併其他進程的放置統計（summary() 的返回值）"""
+        self.placements += summary["placements"]
+        self.placement_bytes += summary["placement_bytes"]
+
+    def _add_part(self, sha1: str, image_part: ImagePart):
+        self._register(sha1, image_part)
+        self.created_bytes += self._sizes[sha1]
+        if self.writer:
+            self.writer.write_media(image_part)
+
+    def _new_part(self, blob: bytes, ext: str, content_type: str, filename: str) -> ImagePart:
+        return ImagePart(
+            PackURI(f"{_MEDIA_PREFIX}{self._next_index}.{ext}"),
+            content_type,
+            self.package,
+            blob,
+            filename,
+        )
+
+    def add_picture(self, slide, image_path: str, left: int, top: int, width: int, height: int):
+        """添加圖片（與 slide.shapes.add_picture 結果一致，尺寸已知，不解析圖片）"""
+        shapes = slide.shapes
+        image_part, rId = self.relate_image(slide.part, image_path)
+        shape_id = shapes._next_shape_id
+        pic = shapes._spTree.add_pic(
+            shape_id, f"Picture {shape_id - 1}", image_part.desc, rId, left, top, width, height
+        )
+        shapes._recalculate_extents()
+        return shapes._shape_factory(pic)
+
+    def insert_picture(self, placeholder, image_path: str) -> PlaceholderPicture:
+        """填充圖片佔位符（與 placeholder.insert_picture 結果一致，按佔位符裁剪）"""
+        info = get_image_info(image_path)
+        image_part, rId = self.relate_image(placeholder.part, image_path)
+        pic = CT_Picture.new_ph_pic(
+            placeholder.shape_id, placeholder.name, image_part.desc, rId
+        )
+        pic.crop_to_fit(
+            (info["width"], info["height"]), (placeholder.width, placeholder.height)
+        )
+        parent = placeholder._parent
+        placeholder._replace_placeholder_with(pic)
+        return PlaceholderPicture(pic, parent)
+
+    # ---------- 統計 ----------
+    def summary(self) -> Dict:
+        """
+        Returns:
+            {"placements": 放置次數, "media_parts": 使用的媒體部件數,
+             "placement_bytes": 放置的圖片總大小, "shared_bytes": 重複放置共用的字節數}
+        """
+        return {
+            "placements": self.placements,
+            "media_parts": len(self._used),
+            "placement_bytes": self.placement_bytes,
+            "shared_bytes": self.shared_bytes,
+        }
@@ -0,0 +1,222 @@
+"""
+並行渲染 - 把 slides 分給多個工作進程渲染，再按順序合併成一個 PPTX 包
+
+每個工作進程用相同的模板和圖片版本渲染一段連續的 slides，導出：
+
+- 每張 slide 的 XML 與關係（布局按部件名、圖片按內容哈希、外部鏈接按地址記錄）
+- 這段 slides 用到的圖片（按內容哈希，每段只傳一次）
+
+主進程按原順序創建 slide 部件並恢復關係（rId 不變，XML 不需要修改），
+圖片經 MediaRegistry 合併，整個包中每張圖片仍然只有一個媒體部件。
+"""
+
+import math
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TARGET_MODE as RTM
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.package import _Relationship
+from pptx.parts.image import ImagePart
+from pptx.parts.slide import SlideLayoutPart, SlidePart
+
+# 每個工作進程至少分到的 slide 數（太少時進程啟動和傳輸開銷大於收益）
+MIN_SLIDES_PER_WORKER = 8
+
+# 每個工作進程分到的段數（耗時不同的 slides 分得更均勻）
+CHUNKS_PER_WORKER = 2
+
+
+class UnmergeableSlide(Exception):
+    """slide 關聯了無法合併的部件（圖表、備註等），需要在單進程中渲染"""
+
+
+def resolve_workers(workers: Optional[int], slide_count: int) -> int:
+    """實際使用的進程數（None 表示 CPU 數，不超過 CPU 數；slides 太少時為 1，即單進程渲染）"""
+    cpu_count = os.cpu_count() or 1
+    workers = min(workers or cpu_count, cpu_count)
+    return max(1, min(workers, slide_count // MIN_SLIDES_PER_WORKER))
+
+
+def plan_chunks(slide_count: int, workers: int) -> List[Tuple[int, int]]:
+    """把 slides 分成連續的段，返回 [(開始, 結束), ...]"""
+    chunk_count = max(1, min(workers * CHUNKS_PER_WORKER, slide_count // MIN_SLIDES_PER_WORKER))
+    size = math.ceil(slide_count / chunk_count)
+    return [(start, min(start + size, slide_count)) for start in range(0, slide_count, size)]
+
+
+def picklable_metadata(image_metadata: Dict) -> Dict:
+    """只保留可以傳給工作進程的字段（上傳後的文件對象等不參與渲染）"""
+    return {
+        image_id: {
+            key: value
+            for key, value in meta.items()
+            if isinstance(value, (str, int, float, bool)) or value is None
+        }
+        for image_id, meta in image_metadata.items()
+    }
+
+
+# ---------- 工作進程 ----------
+def render_chunk(payload: Dict) -> Dict:
+    """
+    渲染一段 slides 並導出（在工作進程中執行，參數均可 pickle）
+
+    Args:
+        payload: {"slides", "start", "image_metadata", "template_json_path",
+                  "template_pptx_path", "fast_path", "image_optimizer", "variants"}
+
+    Returns:
+        {"slides": [(XML, 關係), ...], "media": {sha1: 圖片}, "media_stats": 放置統計}
+    """
+    from AutoPPT.slide_generator import PPTXGenerator
+    from AutoPPT.template_engine import PPTXTemplate
+    from AutoPPT.utils.image_info import flush_image_info
+
+    template = PPTXTemplate(
+        json_path=payload["template_json_path"], pptx_path=payload["template_pptx_path"]
+    )
+    generator = PPTXGenerator(
+        payload["image_metadata"],
+        template=template,
+        fast_path=payload["fast_path"],
+        image_optimizer=payload["image_optimizer"],
+    )
+    generator.media.variants.update(payload["variants"])
+    generator.render_slides(payload["slides"], start=payload["start"])
+    flush_image_info()
+    return {**export_slides(generator.prs), "media_stats": generator.media.summary()}
+
+
+def export_slides(prs) -> Dict:
+    """導出所有 slide 的 XML、關係與用到的圖片"""
+    slides = []
+    media = {}
+    for slide in prs.slides:
+        part = slide.part
+        rels = []
+        for rel in part.rels.values():
+            if rel.is_external:
+                rels.append((rel.rId, rel.reltype, "external", rel.target_ref))
+                continue
+
+            target = rel.target_part
+            if isinstance(target, SlideLayoutPart):
+                rels.append((rel.rId, rel.reltype, "layout", str(target.partname)))
+            elif isinstance(target, ImagePart):
+                sha1 = target.sha1
+                if sha1 not in media:
+                    media[sha1] = (
+                        target.blob, target.partname.ext, target.content_type, target.desc
+                    )
+                rels.append((rel.rId, rel.reltype, "image", sha1))
+            else:
+                raise UnmergeableSlide(f"無法合併的部件：{target.partname}")
+        slides.append((part.blob, rels))
+    return {"slides": slides, "media": media}
+
+
+# ---------- 主進程 ----------
+def render_parallel(
+    generator,
+    slides: Sequence[Dict],
+    workers: int,
+    executor: Executor = None,
+):
+    """
+    用多個工作進程渲染 slides，按順序合併到 generator.prs
+
+    Args:
+        generator: PPTXGenerator（提供模板、圖片元數據、圖片版本和目標 Presentation）
+        slides: AI 數據中的 slides
+        workers: 進程數
+        executor: 共享的進程池（可選，默認臨時創建 spawn 進程池）
+    """
+    template = generator.template
+    base = {
+        "image_metadata": picklable_metadata(generator.image_metadata),
+        "template_json_path": template.json_path,
+        "template_pptx_path": template.pptx_path,
+        "fast_path": generator.fast_path,
+        "image_optimizer": generator.image_optimizer,
+        "variants": dict(generator.media.variants),
+    }
+    payloads = [
+        {**base, "slides": list(slides[start:end]), "start": start + 1}
+        for start, end in plan_chunks(len(slides), workers)
+    ]
+
+    if executor is not None:
+        results = list(executor.map(render_chunk, payloads))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            results = list(pool.map(render_chunk, payloads))
+
+    merge_slides(generator.prs, generator.media, results)
+
+
+def layout_parts(prs) -> Dict[str, object]:
+    """Presentation 中所有布局部件 {部件名: 部件}"""
+    return {
+        str(layout.part.partname): layout.part
+        for master in prs.slide_masters
+        for layout in master.slide_layouts
+    }
+
+
+def add_exported_slide(prs, layouts: Dict, xml: bytes, rels: List[Tuple], images: Dict):
+    """
+    把導出的 slide 加到 Presentation 末尾（關係的 rId 保持不變）
+
+    Args:
+        prs: Presentation 對象
+        layouts: layout_parts(prs)
+        xml: slide XML
+        rels: [(rId, 關係類型, "layout" / "image" / "external", 引用), ...]
+        images: {sha1: 已合併的圖片部件}
+    """
+    presentation_part = prs.part
+    slide_part = SlidePart.load(
+        presentation_part._next_slide_partname, CT.PML_SLIDE, presentation_part.package, xml
+    )
+    slide_rels = slide_part.rels
+    for rId, reltype, kind, ref in rels:
+        if kind == "external":
+            target, target_mode = ref, RTM.EXTERNAL
+        else:
+            target = layouts[ref] if kind == "layout" else images[ref]
+            target_mode = RTM.INTERNAL
+        slide_rels._rels[rId] = _Relationship(
+            slide_rels._base_uri, rId, reltype, target_mode, target
+        )
+
+    rId = presentation_part.rels._add_relationship(RT.SLIDE, slide_part)
+    prs.slides._sldIdLst.add_sldId(rId)
+    return slide_part
+
+
+def merge_slides(prs, media, results: List[Dict]):
+    """
+    把工作進程導出的 slides 按順序加入 Presentation
+
+    先檢查所有布局都能找到，再修改 Presentation，失敗時不會留下一半的 slides。
+    """
+    layouts = layout_parts(prs)
+    for result in results:
+        for _, rels in result["slides"]:
+            for _, _, kind, ref in rels:
+                if kind == "layout" and ref not in layouts:
+                    raise UnmergeableSlide(f"模板中沒有布局：{ref}")
+
+    for result in results:
+        images = {
+            sha1: media.merge_media(sha1, *image) for sha1, image in result["media"].items()
+        }
+        for xml, rels in result["slides"]:
+            add_exported_slide(prs, layouts, xml, rels, images)
+        media.merge_stats(result["media_stats"])
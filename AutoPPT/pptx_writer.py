@@ -0,0 +1,89 @@
+"""
+流式 PPTX 寫入 - slide 和圖片生成後立即寫入 zip，不在內存中保留整個包
+
+prs.save() 在最後才寫 zip，所有 slide XML 和圖片字節都要一直留在內存中，
+圖片多的簡報會讓渲染進程的內存暴漲。配合 PPTXGenerator.write_from_data：
+
+1. 新的媒體部件創建後立即寫入並釋放字節（MediaRegistry 只保留內容哈希與大小）
+2. 每張 slide 渲染完成後立即寫入 XML 與關係，換成空 slide 釋放內存
+3. 最後寫入其餘部件（演示文稿、布局、母版、主題等）、包關係與 [Content_Types].xml
+
+已經壓縮過的媒體（JPEG、PNG、GIF、音視頻）直接存儲，XML 等其他部件使用 deflate。
+"""
+
+import zipfile
+from typing import IO, Set, Union
+
+from pptx.opc.oxml import serialize_part_xml
+from pptx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from pptx.opc.serialized import _ContentTypesItem
+from pptx.oxml.slide import CT_Slide
+
+# 已經壓縮過的內容，再次 deflate 只浪費 CPU
+_STORED_CONTENT_TYPES = frozenset({"image/jpeg", "image/png", "image/gif"})
+_STORED_PREFIXES = ("audio/", "video/")
+
+
+def compression_for(content_type: str) -> int:
+    """部件在 zip 中的壓縮方式"""
+    if content_type in _STORED_CONTENT_TYPES or content_type.startswith(_STORED_PREFIXES):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+class StreamingPPTXWriter:
+    """按生成順序寫入 PPTX 包的各個部件（每個部件只寫一次）"""
+
+    def __init__(self, file: Union[str, IO[bytes]]):
+        """
+        Args:
+            file: 文件路徑或可寫的二進制流
+        """
+        self._zip = zipfile.ZipFile(
+            file, "w", compression=zipfile.ZIP_DEFLATED, strict_timestamps=False
+        )
+        self._written: Set[str] = set()
+        self.parts_written = 0
+
+    def __enter__(self) -> "StreamingPPTXWriter":
+        return self
+
+    def __exit__(self, *exc):
+        # 出錯時也關閉 zip，釋放文件（半成品由調用方的原子寫入丟棄）
+        self._zip.close()
+
+    def _write(self, membername: str, blob: bytes, compress_type: int):
+        self._zip.writestr(membername, blob, compress_type=compress_type)
+
+    def write_part(self, part):
+        """寫入部件及其關係"""
+        if part.partname in self._written:
+            return
+        self._write(part.partname.membername, part.blob, compression_for(part.content_type))
+        if part._rels:
+            self._write(part.partname.rels_uri.membername, part.rels.xml, zipfile.ZIP_DEFLATED)
+        self._written.add(part.partname)
+        self.parts_written += 1
+
+    def write_media(self, image_part):
+        """寫入媒體部件並釋放字節（部件對象保留，供之後的 slide 關聯）"""
+        self.write_part(image_part)
+        image_part._blob = b""
+
+    def write_slide(self, slide_part):
+        """寫入渲染完成的 slide 並釋放 XML（之後只需要部件名）"""
+        self.write_part(slide_part)
+        slide_part._element = CT_Slide.new()
+        slide_part.__dict__.pop("slide", None)
+
+    def finish(self, package):
+        """寫入其餘部件、包關係與 [Content_Types].xml"""
+        parts = tuple(package.iter_parts())
+        for part in parts:
+            self.write_part(part)
+        self._write(PACKAGE_URI.rels_uri.membername, package._rels.xml, zipfile.ZIP_DEFLATED)
+        self._write(
+            CONTENT_TYPES_URI.membername,
+            serialize_part_xml(_ContentTypesItem.xml_for(parts)),
+            zipfile.ZIP_DEFLATED,
+        )
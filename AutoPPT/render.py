@@ -0,0 +1,340 @@
+"""
+離線渲染 - 從已保存的 *_data.json 重新生成 HTML / PPTX
+
+不需要 Gemini Client 和爬蟲：只讀取 save_json() 保存的數據與圖片目錄，
+用模板引擎重新渲染。重量級模塊在函數內才導入，命令行啟動很快，
+也可以用進程池批量處理整個目錄。
+
+命令行用法：
+    python -m AutoPPT.render temp_dir/xxx/output/123456_主題_data.json
+    python -m AutoPPT.render temp_dir/ --recursive --workers 4 --formats pptx
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+DATA_SUFFIX = "_data.json"
+DEFAULT_FORMATS = ("html", "pptx")
+
+
+def list_image_files(image_dir: str) -> List[tuple]:
+    """
+    列出圖片目錄中的圖片（index 與文件名，順序與 AutoPPT.load_images 一致）
+
+    隱藏文件（圖片信息 sidecar、原子寫入的臨時文件）不參與編號，避免 image_id 偏移。
+    """
+    return [
+        (index, file)
+        for index, file in enumerate(
+            f for f in sorted(os.listdir(image_dir)) if not f.startswith(".")
+        )
+        if file.endswith(IMAGE_EXTENSIONS)
+    ]
+
+
+def build_image_metadata(image_dir: str) -> Dict:
+    """根據圖片目錄重建 image_metadata（image_id 與生成時一致）"""
+    if not image_dir or not os.path.isdir(image_dir):
+        return {}
+
+    from AutoPPT.utils.image_info import flush_image_info, try_get_image_info
+
+    metadata = {
+        f"img_{index+1:02d}": {
+            "filename": file,
+            "path": f"{image_dir}/{file}",
+            "index": index + 1,
+            **try_get_image_info(f"{image_dir}/{file}"),
+        }
+        for index, file in list_image_files(image_dir)
+    }
+    flush_image_info()
+    return metadata
+
+
+def _find_job_dir(json_path: str) -> Optional[Path]:
+    """AutoPPT 的輸出結構為 <output_dir>/output/*_data.json，返回 <output_dir>"""
+    parent = Path(json_path).resolve().parent
+    if parent.name == "output":
+        return parent.parent
+    return None
+
+
+def load_image_metadata(json_path: str, image_dir: str = None) -> Dict:
+    """
+    獲取渲染用的圖片元數據
+
+    優先順序：指定的圖片目錄 → 任務檢查點 manifest.json → 任務目錄下的 images/
+    """
+    if image_dir:
+        return build_image_metadata(image_dir)
+
+    job_dir = _find_job_dir(json_path)
+    if job_dir is None:
+        return {}
+
+    manifest_path = job_dir / "manifest.json"
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                images = json.load(f).get("images")
+            # 路徑可能是相對於原始運行目錄的，失效時改為掃描 images/
+            if images and all(os.path.exists(m.get("path", "")) for m in images.values()):
+                return images
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    return build_image_metadata(str(job_dir / "images"))
+
+
+def output_basename(json_path: str) -> str:
+    """123456_主題_data.json → 123456_主題"""
+    name = os.path.basename(json_path)
+    if name.endswith(DATA_SUFFIX):
+        return name[: -len(DATA_SUFFIX)]
+    return os.path.splitext(name)[0]
+
+
+def write_pptx_file(
+    data: Dict,
+    filename: str,
+    image_metadata: Dict = None,
+    template_json_path: str = None,
+    template_pptx_path: str = None,
+    image_optimizer=None,
+    render_workers: int = 1,
+) -> Dict:
+    """
+    渲染並原子寫入 PPTX（可在工作進程中執行，參數均可 pickle）
+
+    覆蓋已有文件時只重新渲染數據有變化的 slides（見 incremental）。
+
+    Returns:
+        {"path": 文件路徑, "seconds": 渲染與寫入耗時}
+    """
+    from AutoPPT.incremental import save_fingerprints
+    from AutoPPT.slide_generator import PPTXGenerator
+    from AutoPPT.template_engine import PPTXTemplate
+    from AutoPPT.utils.fileio import atomic_open
+
+    start = time.perf_counter()
+    template = PPTXTemplate(json_path=template_json_path, pptx_path=template_pptx_path)
+    pptx_gen = PPTXGenerator(
+        image_metadata or {},
+        template=template,
+        image_optimizer=image_optimizer,
+        workers=render_workers,
+    )
+    with atomic_open(filename, "wb") as f:
+        pptx_gen.write_from_data(data, f, previous=filename)
+    save_fingerprints(filename, "pptx", pptx_gen.slide_manifest)
+    return {"path": filename, "seconds": time.perf_counter() - start}
+
+
+def render_saved_json(
+    json_path: str,
+    image_dir: str = None,
+    output_dir: str = None,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    template_json_path: str = None,
+    template_pptx_path: str = None,
+    image_optimizer=None,
+    render_workers: int = 1,
+    html_image_mode: str = "linked",
+) -> Dict[str, str]:
+    """
+    從已保存的 JSON 重新渲染簡報
+
+    Args:
+        json_path: save_json() 保存的 *_data.json
+        image_dir: 圖片目錄（可選，默認從任務目錄推斷）
+        output_dir: 輸出目錄（默認與 JSON 同目錄）
+        formats: 要輸出的格式（html / pptx）
+        template_json_path: 模板 JSON 配置文件路徑（可選）
+        template_pptx_path: 模板 PPTX 文件路徑（可選）
+        image_optimizer: 圖片預處理器（可選，見 utils.image_optimizer）
+        render_workers: 單個 PPTX 渲染 slides 的進程數（見 parallel_render）
+        html_image_mode: HTML 預覽的圖片模式（linked / inline，見 html_images）
+
+    Returns:
+        {格式: 輸出文件路徑}
+    """
+    from AutoPPT.incremental import save_fingerprints
+    from AutoPPT.utils.fileio import atomic_open
+    from AutoPPT.utils.logger import get_logger
+
+    logger = get_logger()
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    image_metadata = load_image_metadata(json_path, image_dir)
+    output_dir = output_dir or os.path.dirname(os.path.abspath(json_path))
+    os.makedirs(output_dir, exist_ok=True)
+    basename = output_basename(json_path)
+
+    logger.info(f"🔁 重新渲染：{json_path}（{len(image_metadata)} 張圖片）")
+
+    outputs = {}
+    if "html" in formats:
+        from AutoPPT.html_renderer import HTML_ASSET_DIRNAME
+        from AutoPPT.slide_generator import HTMLGenerator
+        from AutoPPT.template_engine import PPTXTemplate
+
+        filename = os.path.join(output_dir, f"{basename}_presentation.html")
+        html_gen = HTMLGenerator(
+            image_metadata,
+            PPTXTemplate(json_path=template_json_path, pptx_path=template_pptx_path),
+            asset_dir=os.path.join(output_dir, HTML_ASSET_DIRNAME),
+            image_mode=html_image_mode,
+        )
+        with atomic_open(filename, "w", encoding="utf-8") as f:
+            html_gen.write_to(data, f, previous=filename)
+        save_fingerprints(filename, "html", html_gen.slide_manifest)
+        outputs["html"] = filename
+        logger.info(f"   ✓ HTML 已保存：{filename}")
+
+    if "pptx" in formats:
+        filename = os.path.join(output_dir, f"{basename}.pptx")
+        write_pptx_file(
+            data,
+            filename,
+            image_metadata,
+            template_json_path,
+            template_pptx_path,
+            image_optimizer,
+            render_workers,
+        )
+        outputs["pptx"] = filename
+        logger.info(f"   ✓ PPTX 已保存：{filename}")
+
+    return outputs
+
+
+def _render_job(kwargs: Dict) -> Dict:
+    """進程池任務（失敗時返回錯誤記錄，不中斷其他任務）"""
+    try:
+        return {
+            "json_path": kwargs["json_path"],
+            "status": "success",
+            "outputs": render_saved_json(**kwargs),
+        }
+    except Exception as e:
+        return {"json_path": kwargs["json_path"], "status": "failed", "error": str(e)}
+
+
+def find_saved_json(directory: str, recursive: bool = False) -> List[str]:
+    """查找目錄中的 *_data.json"""
+    pattern = f"**/*{DATA_SUFFIX}" if recursive else f"*{DATA_SUFFIX}"
+    return sorted(str(p) for p in Path(directory).glob(pattern))
+
+
+def render_many(
+    json_paths: Sequence[str],
+    workers: int = None,
+    **render_kwargs,
+) -> List[Dict]:
+    """
+    用進程池批量重新渲染
+
+    Args:
+        json_paths: *_data.json 列表
+        workers: 進程數（默認為 CPU 數；1 表示在當前進程中執行）
+        **render_kwargs: 傳給 render_saved_json 的其他參數
+
+    Returns:
+        每個 JSON 的渲染結果記錄
+    """
+    jobs = [{"json_path": path, **render_kwargs} for path in json_paths]
+    if workers == 1 or len(jobs) <= 1:
+        return [_render_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_render_job, jobs))
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m AutoPPT.render",
+        description="從已保存的 *_data.json 重新渲染 HTML / PPTX（不調用 AI 與爬蟲）",
+    )
+    parser.add_argument("paths", nargs="+", help="*_data.json 文件或包含它們的目錄")
+    parser.add_argument("--images", dest="image_dir", help="圖片目錄（默認從任務目錄推斷）")
+    parser.add_argument("--output-dir", help="輸出目錄（默認與 JSON 同目錄）")
+    parser.add_argument("--template-json", help="模板 JSON 配置文件路徑")
+    parser.add_argument("--template-pptx", help="模板 PPTX 文件路徑")
+    parser.add_argument(
+        "--formats",
+        default=",".join(DEFAULT_FORMATS),
+        help="輸出格式，逗號分隔（默認：html,pptx）",
+    )
+    parser.add_argument("--image-dpi", type=int, default=150, help="圖片預處理 DPI（默認：150）")
+    parser.add_argument("--image-quality", type=int, default=85, help="JPEG 質量（默認：85）")
+    parser.add_argument(
+        "--no-optimize-images", action="store_true", help="按原始分辨率嵌入圖片"
+    )
+    parser.add_argument(
+        "--html-images",
+        choices=("linked", "inline"),
+        default="linked",
+        help="HTML 預覽的圖片模式：linked 延遲加載的縮略圖，inline 小圖內嵌（默認：linked）",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="進程數")
+    parser.add_argument(
+        "--slide-workers",
+        type=int,
+        default=1,
+        help="單個 PPTX 並行渲染 slides 的進程數（默認：1；0 表示 CPU 數）",
+    )
+    parser.add_argument("--recursive", action="store_true", help="遞歸查找目錄")
+    args = parser.parse_args(argv)
+
+    json_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            json_paths.extend(find_saved_json(path, recursive=args.recursive))
+        else:
+            json_paths.append(path)
+
+    if not json_paths:
+        print("❌ 沒有找到 *_data.json")
+        return 1
+
+    image_optimizer = None
+    if not args.no_optimize_images:
+        from AutoPPT.utils.image_optimizer import ImageOptimizer
+
+        image_optimizer = ImageOptimizer(dpi=args.image_dpi, quality=args.image_quality)
+
+    results = render_many(
+        json_paths,
+        workers=args.workers,
+        image_dir=args.image_dir,
+        output_dir=args.output_dir,
+        formats=tuple(f.strip() for f in args.formats.split(",") if f.strip()),
+        template_json_path=args.template_json,
+        template_pptx_path=args.template_pptx,
+        image_optimizer=image_optimizer,
+        render_workers=args.slide_workers or None,
+        html_image_mode=args.html_images,
+    )
+
+    failed = [r for r in results if r["status"] != "success"]
+    for result in results:
+        if result["status"] == "success":
+            for kind, filename in result["outputs"].items():
+                print(f"✓ {kind}: {filename}")
+        else:
+            print(f"❌ {result['json_path']}: {result['error']}")
+    print(f"完成：成功 {len(results) - len(failed)} / {len(results)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,3 +1,3 @@
-from .playwright import AsyncScrapyPlaywright, SyncScrapyPlaywright
+from .playwright import AsyncBrowserPool, AsyncScrapyPlaywright, SyncScrapyPlaywright
 
-__all__ = ["AsyncScrapyPlaywright", "SyncScrapyPlaywright"]
+__all__ = ["AsyncBrowserPool", "AsyncScrapyPlaywright", "SyncScrapyPlaywright"]
@@ -1,7 +1,41 @@
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict
+
+from AutoPPT.utils.logger import get_logger
+
+
+class PhaseTimer:
+    """
+    記錄一次爬取各階段的耗時（秒，同名階段累加）
+
+    每個階段同時是 logger.performance 中的區段，嵌套在調用方（例如每個 URL）的區段之下。
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """計時一個階段，產出區段（可記錄字節數與計數）"""
+        start = time.perf_counter()
+        try:
+            with get_logger().performance.span(name) as span:
+                yield span
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def add(self, name: str, seconds: float, **counts: int):
+        """記錄調用方自己測量的階段耗時"""
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+        get_logger().performance.record(name, seconds, **counts)
 
 
 class BaseScrapy(ABC):
+    # 爬取階段：直連測試、啟動瀏覽器、訪問頁面、滾動、提取文字、下載圖片、截圖、保存
+    PHASES = ("probe", "launch", "navigate", "scroll", "extract", "download", "screenshot", "save")
+
     def __init__(self):
         pass
 
@@ -12,6 +46,6 @@ class BaseScrapy(ABC):
         ::param target_url: 目標網站
         ::param extracted_content_file: 爬取的內容保存到 extracted_content_file 中
         ::param images_downloaded_dir: 爬取的圖片保存到 images_downloaded_dir 中
-        ::return: 爬取的內容和圖片
+        ::return: 爬取統計 {"timings": {階段: 秒}, "texts": 文字數, "images": 圖片數, "screenshots": 截圖數}
         """
         pass
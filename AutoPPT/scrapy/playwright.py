@@ -6,7 +6,9 @@ import json
 import os
 import random
 import re
+import time
 import uuid
+from contextlib import asynccontextmanager
 from typing import Dict, List, Optional, Set
 from urllib.parse import urljoin, urlparse
 
@@ -20,7 +22,8 @@ from playwright.async_api import async_playwright
 from playwright.sync_api import sync_playwright
 from playwright_stealth import Stealth
 
-from AutoPPT.scrapy.base_scrapy import BaseScrapy
+from AutoPPT.scrapy.base_scrapy import BaseScrapy, PhaseTimer
+from AutoPPT.utils.image_info import flush_image_info, record_image_info
 from AutoPPT.utils.logger import get_logger
 
 # 获取日志器
@@ -72,6 +75,43 @@ class SimpleProxyManager:
         return False
 
 
+def _probe_proxy(target_url: str):
+    """
+    測試能否直連目標頁面，不能時依次嘗試代理（阻塞調用）
+
+    Returns:
+        (playwright 代理地址, requests 代理設置)；直連或沒有可用代理時為 (None, None)
+    """
+    proxy_manager = SimpleProxyManager()
+    try:
+        response = requests.get(target_url, timeout=10)
+        if response.status_code == 200:
+            return None, None
+        logger.info("無法訪問頁面，嘗試獲取代理")
+        # 嘗試獲取可用的代理
+        for attempt in range(len(proxy_manager.proxies)):
+            proxy = proxy_manager.get_next_proxy()
+            if proxy and proxy_manager.test_proxy(proxy, target_url):
+                return f"http://{proxy}", {
+                    "http": f"http://{proxy}",
+                    "https": f"http://{proxy}",
+                }
+            logger.info(f"代理 {proxy} 不可用，嘗試下一個...")
+        logger.info("沒有可用的代理，使用直連")
+    except Exception as e:
+        logger.info(f"連接測試失敗: {e}")
+    return None, None
+
+
+def _downloaded_bytes(images: List[Dict]) -> int:
+    """本次下載並保存的圖片字節數"""
+    return sum(
+        os.path.getsize(image["local_path"])
+        for image in images
+        if image.get("status") == "downloaded" and os.path.exists(image["local_path"])
+    )
+
+
 class HTMLTextExtractor:
     def __init__(self):
         # 要排除的標籤
@@ -384,9 +424,11 @@ class HTMLTextExtractor:
                 }
 
             # 檢查圖片尺寸
+            image_info = {}
             try:
                 img = Image.open(io.BytesIO(img_data))
                 width, height = img.size
+                image_info = {"width": width, "height": height, "format": img.format}
                 min_width = 500  # 設定最小寬度
                 min_height = 500  # 設定最小高度
                 logger.info(f"圖片尺寸: {width}x{height}")
@@ -423,6 +465,10 @@ class HTMLTextExtractor:
                 logger.info(f"save")
                 f.write(img_data)
 
+            # 記錄尺寸等信息，之後排版時不再重新讀取圖片
+            if image_info:
+                record_image_info(filepath, img_data, **image_info)
+
             return {
                 "original_url": (
                     img_url[:100] + "..." if len(img_url) > 100 else img_url
@@ -451,6 +497,19 @@ class HTMLTextExtractor:
         proxy_request: Optional[dict] = None,
     ) -> Dict:
         """提取文字和圖片內容"""
+        return {
+            "texts": self.extract_texts(html_content),
+            "images": self.download_images(
+                image_urls,
+                base_url,
+                temp_dir,
+                original_images_downloaded_dir,
+                proxy_request,
+            ),
+        }
+
+    def extract_texts(self, html_content: str) -> List[Dict]:
+        """提取文字內容（純 CPU，不下載圖片）"""
         soup = BeautifulSoup(html_content, "html.parser")
         # 找到並移除 class="recommend_wrapper" 的元素
         recommend_wrapper = soup.find(class_="recommend_wrapper")
@@ -462,7 +521,7 @@ class HTMLTextExtractor:
         body = soup.find("body")
 
         if not body:
-            return {"texts": [], "images": []}
+            return []
 
         # 移除 style 和 script 標籤
         for tag in body.find_all(["style", "script"]):
@@ -490,7 +549,17 @@ class HTMLTextExtractor:
                     "id": element.parent.get("id", ""),
                 }
             )
+        return texts
 
+    def download_images(
+        self,
+        image_urls: List[str],
+        base_url: str,
+        temp_dir: str,
+        original_images_downloaded_dir: Optional[str] = None,
+        proxy_request: Optional[dict] = None,
+    ) -> List[Dict]:
+        """下載圖片，返回下載成功（或已存在）的圖片信息"""
         images = []
         for image_url in image_urls:
             img_info = self.download_image(
@@ -502,8 +571,8 @@ class HTMLTextExtractor:
             )
             if img_info.get("status", None) in ["downloaded", "exists"]:
                 images.append(img_info)
-
-        return {"texts": texts, "images": images}
+        flush_image_info()
+        return images
 
     def get_base_domain(self, url: str) -> str:
         """獲取URL的基本域名"""
@@ -511,80 +580,185 @@ class HTMLTextExtractor:
         return f"{parsed.scheme}://{parsed.netloc}/"
 
 
-class AsyncScrapyPlaywright(BaseScrapy):
-    async def start(self, target_url, extracted_content_file, images_downloaded_dir):
-        proxy_manager = SimpleProxyManager()
-        proxy_server = None
-        proxy_request = None
+# 瀏覽器啟動參數
+BROWSER_LAUNCH_ARGS = [
+    # 基本反檢測參數
+    "--disable-blink-features=AutomationControlled",
+    "--disable-web-security",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    # 性能和穩定性參數
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-gpu",
+    # 添加安全的渲染參數
+    "--disable-software-rasterizer",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-features=VizDisplayCompositor",
+    # 新增的反檢測參數
+    "--disable-extensions-file-access-check",
+    "--disable-extensions-except",
+    "--disable-plugins-discovery",
+    "--disable-default-apps",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-features=TranslateUI,VizDisplayCompositor",
+    "--disable-ipc-flooding-protection",
+    # 模擬真實瀏覽器環境
+    "--enable-webgl",
+    "--use-gl=swiftshader",
+    "--enable-accelerated-2d-canvas",
+]
+
+
+async def launch_async_browser(p):
+    """使用統一的啟動參數啟動 Chromium（非同步）"""
+    return await p.chromium.launch(
+        headless=True,
+        args=BROWSER_LAUNCH_ARGS,
+    )
+
+
+class AsyncBrowserPool:
+    """共享的非同步瀏覽器池
+
+    批量任務中所有爬取共用少量瀏覽器進程，每次爬取只創建新的 context。
+    瀏覽器在第一次 acquire 時才啟動，沒有 URL 的批量任務不會啟動 Chromium。
+
+    用法：
+        async with AsyncBrowserPool(size=2) as pool:
+            scrapy = AsyncScrapyPlaywright(browser_pool=pool)
+            await scrapy.start(...)
+    """
+
+    def __init__(self, size: int = 1):
+        self.size = max(1, size)
+        self._playwright_cm = None
+        self._playwright = None
+        self._browsers = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncBrowserPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _ensure_started(self):
+        """懶啟動 playwright 與瀏覽器"""
+        async with self._lock:
+            if self._queue is not None:
+                return
+            logger.info(f"🌐 啟動共享瀏覽器池（{self.size} 個瀏覽器）")
+            self._playwright_cm = Stealth().use_async(async_playwright())
+            self._playwright = await self._playwright_cm.__aenter__()
+            queue = asyncio.Queue()
+            for _ in range(self.size):
+                browser = await launch_async_browser(self._playwright)
+                self._browsers.append(browser)
+                queue.put_nowait(browser)
+            self._queue = queue
+
+    @asynccontextmanager
+    async def acquire(self):
+        """借出一個瀏覽器，用完自動歸還"""
+        await self._ensure_started()
+        browser = await self._queue.get()
+        try:
+            yield browser
+        finally:
+            self._queue.put_nowait(browser)
 
-        response = requests.get(target_url, timeout=10)
-        if response.status_code != 200:
-            logger.info("無法訪問頁面，嘗試獲取代理")
-            # 嘗試獲取可用的代理
-            for attempt in range(len(proxy_manager.proxies)):
-                proxy = proxy_manager.get_next_proxy()
-                if proxy and proxy_manager.test_proxy(proxy, target_url):
-                    proxy_server = f"http://{proxy}"
-                    proxy_request = {
-                        "http": f"http://{proxy}",
-                        "https": f"http://{proxy}",
-                    }
-                    break
-                else:
-                    logger.info(f"代理 {proxy} 不可用，嘗試下一個...")
+    async def close(self):
+        """關閉所有瀏覽器與 playwright"""
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.info(f"關閉瀏覽器失敗: {e}")
+        self._browsers = []
+        self._queue = None
+        if self._playwright_cm is not None:
+            await self._playwright_cm.__aexit__(None, None, None)
+            self._playwright_cm = None
+            self._playwright = None
 
-            if not proxy_server:
-                logger.info("沒有可用的代理，使用直連")
+
+class AsyncScrapyPlaywright(BaseScrapy):
+    def __init__(self, browser_pool: Optional["AsyncBrowserPool"] = None):
+        """
+        Args:
+            browser_pool: 共享瀏覽器池（可選），提供時不再為每個 URL 啟動新瀏覽器
+        """
+        super().__init__()
+        self.browser_pool = browser_pool
+
+    async def start(self, target_url, extracted_content_file, images_downloaded_dir):
+        timer = PhaseTimer()
+
+        # 測試直連（requests 為阻塞調用，放到工作線程避免卡住事件循環）
+        with timer.phase("probe"):
+            proxy_server, proxy_request = await asyncio.to_thread(_probe_proxy, target_url)
+
+        started = time.perf_counter()
+        if self.browser_pool:
+            # 重用共享瀏覽器，只為本次爬取創建獨立的 context
+            async with self.browser_pool.acquire() as browser:
+                timer.add("launch", time.perf_counter() - started)
+                return await self._scrape(
+                    browser,
+                    target_url,
+                    extracted_content_file,
+                    images_downloaded_dir,
+                    proxy_server,
+                    proxy_request,
+                    timer,
+                )
 
         async with Stealth().use_async(async_playwright()) as p:
-            ua = UserAgent()
-            # 修改瀏覽器啟動選項
-            browser = await p.chromium.launch(
-                headless=True,
-                args=[
-                    # 基本反檢測參數
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-web-security",
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    # 性能和穩定性參數
-                    "--disable-dev-shm-usage",
-                    "--disable-extensions",
-                    "--disable-gpu",
-                    # 添加安全的渲染參數
-                    "--disable-software-rasterizer",
-                    "--disable-background-timer-throttling",
-                    "--disable-backgrounding-occluded-windows",
-                    "--disable-renderer-backgrounding",
-                    "--disable-features=VizDisplayCompositor",
-                    # 新增的反檢測參數
-                    "--disable-extensions-file-access-check",
-                    "--disable-extensions-except",
-                    "--disable-plugins-discovery",
-                    "--disable-default-apps",
-                    "--no-first-run",
-                    "--no-default-browser-check",
-                    "--disable-background-timer-throttling",
-                    "--disable-backgrounding-occluded-windows",
-                    "--disable-renderer-backgrounding",
-                    "--disable-features=TranslateUI,VizDisplayCompositor",
-                    "--disable-ipc-flooding-protection",
-                    # 模擬真實瀏覽器環境
-                    "--enable-webgl",
-                    "--use-gl=swiftshader",
-                    "--enable-accelerated-2d-canvas",
-                ],
-                # 移除可能衝突的選項
-                devtools=False,  # 確保不啟動開發工具
-            )
-            if proxy_server:
-                proxy = {
-                    "server": proxy_server,
-                }
-            else:
-                proxy = None
+            browser = await launch_async_browser(p)
+            timer.add("launch", time.perf_counter() - started)
+            try:
+                return await self._scrape(
+                    browser,
+                    target_url,
+                    extracted_content_file,
+                    images_downloaded_dir,
+                    proxy_server,
+                    proxy_request,
+                    timer,
+                )
+            finally:
+                await browser.close()
 
-            # 創建具有特定 user-agent 的上下文
+    async def _scrape(
+        self,
+        browser,
+        target_url,
+        extracted_content_file,
+        images_downloaded_dir,
+        proxy_server=None,
+        proxy_request=None,
+        timer: Optional[PhaseTimer] = None,
+    ) -> Dict:
+        """在指定瀏覽器中創建 context 並爬取頁面，返回爬取統計"""
+        timer = timer or PhaseTimer()
+        ua = UserAgent()
+        if proxy_server:
+            proxy = {
+                "server": proxy_server,
+            }
+        else:
+            proxy = None
+
+        # 創建具有特定 user-agent 的上下文
+        with timer.phase("launch"):
             context = await browser.new_context(
                 user_agent=ua.random,
                 viewport={"width": 1920, "height": 1080},
@@ -607,27 +781,29 @@ class AsyncScrapyPlaywright(BaseScrapy):
 
             page = await context.new_page()
 
-            try:
-                # 等待更長時間
-                logger.info("等待更長時間")
-                page.set_default_timeout(60000)
+        screenshot_count = 0
+        try:
+            # 等待更長時間
+            logger.info("等待更長時間")
+            page.set_default_timeout(60000)
 
-                base_url = target_url
+            base_url = target_url
 
-                image_urls = []
+            image_urls = []
 
-                def handle_response(response):
-                    # 檢查 content-type
-                    content_type = response.headers.get("content-type", "")
-                    if "image" in content_type.lower():
-                        if content_type.lower() in ["image/jpeg", "image/png", "image/webp"]:
-                            image_urls.append(response.url)
-                            logger.info(f"攔截到圖片響應: {response.url[:100]}...")
-                            logger.info(f"Content-Type: {content_type}")
-                            logger.info(f"狀態碼: {response.status}")
+            def handle_response(response):
+                # 檢查 content-type
+                content_type = response.headers.get("content-type", "")
+                if "image" in content_type.lower():
+                    if content_type.lower() in ["image/jpeg", "image/png", "image/webp"]:
+                        image_urls.append(response.url)
+                        logger.info(f"攔截到圖片響應: {response.url[:100]}...")
+                        logger.info(f"Content-Type: {content_type}")
+                        logger.info(f"狀態碼: {response.status}")
 
-                page.on("response", handle_response)
+            page.on("response", handle_response)
 
+            with timer.phase("navigate"):
                 # 訪問頁面並等待加載
                 logger.info("訪問頁面")
                 response = await page.goto(base_url)
@@ -638,13 +814,13 @@ class AsyncScrapyPlaywright(BaseScrapy):
                 try:
                     # 沒有這個元素則跳過
                     button_selector = "/html/body/div/div[1]/div[3]/div/div/form/div/div/span/span/button"
-                    if page.locator(button_selector).count() == 0:
+                    if await page.locator(button_selector).count() == 0:
                         logger.info("沒有這個元素，跳過")
                     else:
                         logger.info(f"嘗試點擊按鈕: {button_selector}")
-                        page.click(f"xpath={button_selector}")
+                        await page.click(f"xpath={button_selector}")
                         logger.info("按鈕點擊成功")
-                        page.wait_for_timeout(2000)  # 等待點擊後的響應
+                        await page.wait_for_timeout(2000)  # 等待點擊後的響應
                 except Exception as e:
                     logger.info(f"點擊按鈕失敗: {e}")
 
@@ -652,6 +828,7 @@ class AsyncScrapyPlaywright(BaseScrapy):
                 await page.wait_for_load_state("domcontentloaded")
                 logger.info("DOM 內容已加載")
 
+            with timer.phase("scroll"):
                 # 滾動頁面觸發懶加載
                 logger.info("滾動頁面觸發懶加載...")
                 for i in range(10):
@@ -671,41 +848,54 @@ class AsyncScrapyPlaywright(BaseScrapy):
                 logger.info("額外等待一些動態內容")
                 await page.wait_for_timeout(2000)
 
+            # 創建提取器並提取內容
+            extractor = HTMLTextExtractor()
+            original_images_downloaded_dir = (
+                images_downloaded_dir + "_original_images"
+            )
+            os.makedirs(images_downloaded_dir, exist_ok=True)
+            os.makedirs(original_images_downloaded_dir, exist_ok=True)
+
+            with timer.phase("extract") as span:
                 # 獲取 HTML
                 logger.info("獲取 HTML")
                 html_content = await page.content()
+                # 調用同步方法，放到工作線程
+                texts = await asyncio.to_thread(extractor.extract_texts, html_content)
+                span.add(bytes_in=len(html_content.encode("utf-8")), texts=len(texts))
 
-                # 創建提取器並提取內容
-                extractor = HTMLTextExtractor()
-                original_images_downloaded_dir = (
-                    images_downloaded_dir + "_original_images"
-                )
-                os.makedirs(images_downloaded_dir, exist_ok=True)
-                os.makedirs(original_images_downloaded_dir, exist_ok=True)
-                content = await asyncio.to_thread(
-                    extractor.extract_content,  # 調用原來的同步方法
-                    html_content,
+            with timer.phase("download") as span:
+                images = await asyncio.to_thread(
+                    extractor.download_images,
+                    image_urls,
                     base_url,
                     images_downloaded_dir,
-                    image_urls,
                     original_images_downloaded_dir,
                     proxy_request,
                 )
+                span.add(
+                    bytes_out=_downloaded_bytes(images),
+                    requested=len(image_urls),
+                    images=len(images),
+                )
 
-                # 保存文字結果
+            # 保存文字結果
+            with timer.phase("save") as span:
                 async with aiofiles.open(
                     extracted_content_file, "w", encoding="utf-8"
                 ) as f:
                     # 保存文字
                     await f.write("=== 文字內容 ===\n")
-                    for item in content["texts"]:
+                    for item in texts:
                         await f.write(f"{item['text']}\n")
+                span.add(bytes_out=os.path.getsize(extracted_content_file))
 
-                # 打印統計信息
-                logger.info(f"總共提取了 {len(content['texts'])} 個文字元素")
-                logger.info(f"總共下載了 {len(content['images'])} 張圖片")
+            # 打印統計信息
+            logger.info(f"總共提取了 {len(texts)} 個文字元素")
+            logger.info(f"總共下載了 {len(images)} 張圖片")
 
-                if content["images"] == [] or len(content["images"]) <= 3:
+            if images == [] or len(images) <= 3:
+                with timer.phase("screenshot") as span:
                     # 如果沒有下載到任何圖片，進行全頁面截圖
                     logger.info("沒有下載到圖片，開始進行全頁面截圖")
 
@@ -717,18 +907,19 @@ class AsyncScrapyPlaywright(BaseScrapy):
                     total_height = await page.evaluate("document.body.scrollHeight")
                     viewport_height = page.viewport_size["height"]
 
-                    screenshot_count = 0
                     current_position = 0
+                    # 並行爬取多個 URL 時共用圖片目錄，文件名需帶唯一後綴
+                    uid = uuid.uuid4().hex[:8]
 
                     while current_position < total_height:
                         # 截圖
                         screenshot_path = os.path.join(
                             images_downloaded_dir,
-                            f"screenshot_{screenshot_count:03d}.jpg",
+                            f"screenshot_{screenshot_count:03d}_{uid}.jpg",
                         )
                         original_screenshot_path = os.path.join(
                             original_images_downloaded_dir,
-                            f"original_screenshot_{screenshot_count:03d}.jpg",
+                            f"original_screenshot_{screenshot_count:03d}_{uid}.jpg",
                         )
 
                         await page.screenshot(path=screenshot_path)
@@ -748,15 +939,22 @@ class AsyncScrapyPlaywright(BaseScrapy):
                             break
 
                     logger.info(f"完成全頁面截圖，共截取 {screenshot_count} 張圖片")
+                    span.add(screenshots=screenshot_count)
 
-            except Exception as e:
-                logger.info(f"Error: {e}")
-                await page.screenshot(path="error.png")
-                raise e
-
-            finally:
-                await context.close()
-                await browser.close()
+        except Exception as e:
+            logger.info(f"Error: {e}")
+            await page.screenshot(path="error.png")
+            raise e
+
+        finally:
+            await context.close()
+
+        return {
+            "timings": timer.timings,
+            "texts": len(texts),
+            "images": len(images),
+            "screenshots": screenshot_count,
+        }
 
 
 class SyncScrapyPlaywright(BaseScrapy):
@@ -770,97 +968,56 @@ class SyncScrapyPlaywright(BaseScrapy):
             target_url: 目标URL
             extracted_content_file: 提取内容保存路径
             images_downloaded_dir: 图片下载目录
-        """
-        proxy_manager = SimpleProxyManager()
-        proxy_server = None
-        proxy_request = None
 
-        # 测试直连
-        try:
-            response = requests.get(target_url, timeout=10)
-            if response.status_code != 200:
-                logger.info("无法访问页面，尝试获取代理")
-                # 尝试获取可用的代理
-                for attempt in range(len(proxy_manager.proxies)):
-                    proxy = proxy_manager.get_next_proxy()
-                    if proxy and proxy_manager.test_proxy(proxy, target_url):
-                        proxy_server = f"http://{proxy}"
-                        proxy_request = {
-                            "http": f"http://{proxy}",
-                            "https": f"http://{proxy}",
-                        }
-                        break
-                    else:
-                        logger.info(f"代理 {proxy} 不可用，尝试下一个...")
+        Returns:
+            爬取统计（各阶段耗时、文字数、图片数、截图数）
+        """
+        timer = PhaseTimer()
 
-                if not proxy_server:
-                    logger.info("没有可用的代理，使用直连")
-        except Exception as e:
-            logger.info(f"连接测试失败: {e}")
+        # 测试直连，失败时尝试代理
+        with timer.phase("probe"):
+            proxy_server, proxy_request = _probe_proxy(target_url)
 
         # 使用同步 playwright
         with Stealth().use_sync(sync_playwright()) as p:
             ua = UserAgent()
 
-            # 启动浏览器
-            browser = p.chromium.launch(
-                headless=True,
-                args=[
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-web-security",
-                    "--no-sandbox",
-                    "--disable-setuid-sandbox",
-                    "--disable-dev-shm-usage",
-                    "--disable-extensions",
-                    "--disable-gpu",
-                    "--disable-software-rasterizer",
-                    "--disable-background-timer-throttling",
-                    "--disable-backgrounding-occluded-windows",
-                    "--disable-renderer-backgrounding",
-                    "--disable-features=VizDisplayCompositor",
-                    "--disable-extensions-file-access-check",
-                    "--disable-extensions-except",
-                    "--disable-plugins-discovery",
-                    "--disable-default-apps",
-                    "--no-first-run",
-                    "--no-default-browser-check",
-                    "--disable-features=TranslateUI,VizDisplayCompositor",
-                    "--disable-ipc-flooding-protection",
-                    "--enable-webgl",
-                    "--use-gl=swiftshader",
-                    "--enable-accelerated-2d-canvas",
-                ],
-                devtools=False,
-            )
-
-            # 配置代理
-            if proxy_server:
-                proxy = {"server": proxy_server}
-            else:
-                proxy = None
+            with timer.phase("launch"):
+                # 启动浏览器
+                browser = p.chromium.launch(
+                    headless=True,
+                    args=BROWSER_LAUNCH_ARGS,
+                )
 
-            # 创建浏览器上下文
-            context = browser.new_context(
-                user_agent=ua.random,
-                viewport={"width": 1920, "height": 1080},
-                bypass_csp=True,
-                java_script_enabled=True,
-                extra_http_headers={
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-                    "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8,ja;q=0.7",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "Cache-Control": "max-age=0",
-                    "Upgrade-Insecure-Requests": "1",
-                    "Sec-Fetch-Dest": "document",
-                    "Sec-Fetch-Mode": "navigate",
-                    "Sec-Fetch-Site": "none",
-                    "Sec-Fetch-User": "?1",
-                },
-                proxy=proxy,
-            )
+                # 配置代理
+                if proxy_server:
+                    proxy = {"server": proxy_server}
+                else:
+                    proxy = None
+
+                # 创建浏览器上下文
+                context = browser.new_context(
+                    user_agent=ua.random,
+                    viewport={"width": 1920, "height": 1080},
+                    bypass_csp=True,
+                    java_script_enabled=True,
+                    extra_http_headers={
+                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+                        "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8,ja;q=0.7",
+                        "Accept-Encoding": "gzip, deflate, br",
+                        "Cache-Control": "max-age=0",
+                        "Upgrade-Insecure-Requests": "1",
+                        "Sec-Fetch-Dest": "document",
+                        "Sec-Fetch-Mode": "navigate",
+                        "Sec-Fetch-Site": "none",
+                        "Sec-Fetch-User": "?1",
+                    },
+                    proxy=proxy,
+                )
 
-            page = context.new_page()
+                page = context.new_page()
 
+            screenshot_count = 0
             try:
                 # 设置超时时间
                 logger.info("设置超时时间")
@@ -880,48 +1037,46 @@ class SyncScrapyPlaywright(BaseScrapy):
 
                 page.on("response", handle_response)
 
-                # 访问页面
-                logger.info("访问页面")
-                response = page.goto(base_url)
-                logger.info(
-                    f"访问页面完成，状态: {response.status if response else 'None'}"
-                )
+                with timer.phase("navigate"):
+                    # 访问页面
+                    logger.info("访问页面")
+                    response = page.goto(base_url)
+                    logger.info(
+                        f"访问页面完成，状态: {response.status if response else 'None'}"
+                    )
 
-                # 尝试点击特定按钮（针对某些网站）
-                try:
-                    button_selector = "/html/body/div/div[1]/div[3]/div/div/form/div/div/span/span/button"
-                    if page.locator(button_selector).count() == 0:
-                        logger.info("没有找到特定按钮，跳过")
-                    else:
-                        logger.info(f"尝试点击按钮: {button_selector}")
-                        page.click(f"xpath={button_selector}")
-                        logger.info("按钮点击成功")
-                        page.wait_for_timeout(2000)
-                except Exception as e:
-                    logger.info(f"点击按钮失败: {e}")
+                    # 尝试点击特定按钮（针对某些网站）
+                    try:
+                        button_selector = "/html/body/div/div[1]/div[3]/div/div/form/div/div/span/span/button"
+                        if page.locator(button_selector).count() == 0:
+                            logger.info("没有找到特定按钮，跳过")
+                        else:
+                            logger.info(f"尝试点击按钮: {button_selector}")
+                            page.click(f"xpath={button_selector}")
+                            logger.info("按钮点击成功")
+                            page.wait_for_timeout(2000)
+                    except Exception as e:
+                        logger.info(f"点击按钮失败: {e}")
 
-                # 等待初始内容加载
-                page.wait_for_load_state("domcontentloaded")
-                logger.info("DOM 内容已加载")
+                    # 等待初始内容加载
+                    page.wait_for_load_state("domcontentloaded")
+                    logger.info("DOM 内容已加载")
 
-                # 滚动页面触发懒加载
-                logger.info("滚动页面触发懒加载...")
-                for i in range(10):
-                    page.evaluate("window.scrollBy(0, 300)")
-                    page.wait_for_timeout(500)
+                with timer.phase("scroll"):
+                    # 滚动页面触发懒加载
+                    logger.info("滚动页面触发懒加载...")
+                    for i in range(10):
+                        page.evaluate("window.scrollBy(0, 300)")
+                        page.wait_for_timeout(500)
 
-                # 滚动到底部
-                logger.info("滚动到底部")
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(2000)
+                    # 滚动到底部
+                    logger.info("滚动到底部")
+                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    page.wait_for_timeout(2000)
 
-                # 额外等待动态内容
-                logger.info("额外等待动态内容")
-                page.wait_for_timeout(2000)
-
-                # 获取 HTML
-                logger.info("获取 HTML")
-                html_content = page.content()
+                    # 额外等待动态内容
+                    logger.info("额外等待动态内容")
+                    page.wait_for_timeout(2000)
 
                 # 提取内容
                 extractor = HTMLTextExtractor()
@@ -931,69 +1086,84 @@ class SyncScrapyPlaywright(BaseScrapy):
                 os.makedirs(images_downloaded_dir, exist_ok=True)
                 os.makedirs(original_images_downloaded_dir, exist_ok=True)
 
-                content = extractor.extract_content(
-                    html_content,
-                    base_url,
-                    images_downloaded_dir,
-                    image_urls,
-                    original_images_downloaded_dir,
-                    proxy_request,
-                )
+                with timer.phase("extract") as span:
+                    # 获取 HTML
+                    logger.info("获取 HTML")
+                    html_content = page.content()
+                    texts = extractor.extract_texts(html_content)
+                    span.add(bytes_in=len(html_content.encode("utf-8")), texts=len(texts))
+
+                with timer.phase("download") as span:
+                    images = extractor.download_images(
+                        image_urls,
+                        base_url,
+                        images_downloaded_dir,
+                        original_images_downloaded_dir,
+                        proxy_request,
+                    )
+                    span.add(
+                        bytes_out=_downloaded_bytes(images),
+                        requested=len(image_urls),
+                        images=len(images),
+                    )
 
                 # 保存文字结果（同步方式）
-                with open(extracted_content_file, "w", encoding="utf-8") as f:
-                    f.write("=== 文字内容 ===\n")
-                    for item in content["texts"]:
-                        f.write(f"{item['text']}\n")
+                with timer.phase("save") as span:
+                    with open(extracted_content_file, "w", encoding="utf-8") as f:
+                        f.write("=== 文字内容 ===\n")
+                        for item in texts:
+                            f.write(f"{item['text']}\n")
+                    span.add(bytes_out=os.path.getsize(extracted_content_file))
 
                 # 打印统计信息
-                logger.info(f"总共提取了 {len(content['texts'])} 个文字元素")
-                logger.info(f"总共下载了 {len(content['images'])} 张图片")
+                logger.info(f"总共提取了 {len(texts)} 个文字元素")
+                logger.info(f"总共下载了 {len(images)} 张图片")
 
                 # 如果图片太少，进行全页面截图
-                if content["images"] == [] or len(content["images"]) <= 3:
-                    logger.info("没有下载到足够图片，开始进行全页面截图")
+                if images == [] or len(images) <= 3:
+                    with timer.phase("screenshot") as span:
+                        logger.info("没有下载到足够图片，开始进行全页面截图")
 
-                    # 滚动到页面顶部
-                    page.evaluate("window.scrollTo(0, 0)")
-                    page.wait_for_timeout(1000)
+                        # 滚动到页面顶部
+                        page.evaluate("window.scrollTo(0, 0)")
+                        page.wait_for_timeout(1000)
 
-                    # 获取页面总高度
-                    total_height = page.evaluate("document.body.scrollHeight")
-                    viewport_height = page.viewport_size["height"]
+                        # 获取页面总高度
+                        total_height = page.evaluate("document.body.scrollHeight")
+                        viewport_height = page.viewport_size["height"]
 
-                    screenshot_count = 0
-                    current_position = 0
-                    uid = uuid.uuid4().hex[:8]
+                        current_position = 0
+                        uid = uuid.uuid4().hex[:8]
 
-                    while current_position < total_height:
-                        # 截图
-                        screenshot_path = os.path.join(
-                            images_downloaded_dir,
-                            f"screenshot_{screenshot_count:03d}_{uid}.jpg",
-                        )
-                        original_screenshot_path = os.path.join(
-                            original_images_downloaded_dir,
-                            f"original_screenshot_{screenshot_count:03d}_{uid}.jpg",
-                        )
+                        while current_position < total_height:
+                            # 截图
+                            screenshot_path = os.path.join(
+                                images_downloaded_dir,
+                                f"screenshot_{screenshot_count:03d}_{uid}.jpg",
+                            )
+                            original_screenshot_path = os.path.join(
+                                original_images_downloaded_dir,
+                                f"original_screenshot_{screenshot_count:03d}_{uid}.jpg",
+                            )
 
-                        page.screenshot(path=screenshot_path)
-                        page.screenshot(path=original_screenshot_path)
-                        logger.info(f"截图保存至: {screenshot_path}")
+                            page.screenshot(path=screenshot_path)
+                            page.screenshot(path=original_screenshot_path)
+                            logger.info(f"截图保存至: {screenshot_path}")
 
-                        # 向下滚动一个视窗高度
-                        current_position += viewport_height
-                        page.evaluate(f"window.scrollTo(0, {current_position})")
-                        page.wait_for_timeout(1000)
+                            # 向下滚动一个视窗高度
+                            current_position += viewport_height
+                            page.evaluate(f"window.scrollTo(0, {current_position})")
+                            page.wait_for_timeout(1000)
 
-                        screenshot_count += 1
+                            screenshot_count += 1
 
-                        # 防止无限循环
-                        if screenshot_count > 30:
-                            logger.info("截图数量超过限制，停止截图")
-                            break
+                            # 防止无限循环
+                            if screenshot_count > 30:
+                                logger.info("截图数量超过限制，停止截图")
+                                break
 
-                    logger.info(f"完成全页面截图，共截取 {screenshot_count} 张图片")
+                        logger.info(f"完成全页面截图，共截取 {screenshot_count} 张图片")
+                        span.add(screenshots=screenshot_count)
 
             except Exception as e:
                 logger.info(f"Error: {e}")
@@ -1003,3 +1173,10 @@ class SyncScrapyPlaywright(BaseScrapy):
             finally:
                 context.close()
                 browser.close()
+
+        return {
+            "timings": timer.timings,
+            "texts": len(texts),
+            "images": len(images),
+            "screenshots": screenshot_count,
+        }
@@ -4,11 +4,33 @@ Slide 生成器（統一的 HTML 和 PPTX 生成接口）
 使用 Strategy Pattern，每個 slide 類型負責自己的渲染邏輯
 """
 
-from typing import Any, Dict, List
+import os
+from typing import IO, Any, Dict, Iterator, List, Union
 
 from pptx import Presentation
 from pptx.util import Inches
 
+from AutoPPT.html_images import INLINE_MAX_BYTES, HTMLImages
+from AutoPPT.html_parser import HTMLSlideParser
+from AutoPPT.html_renderer import HTML_RENDERER_VERSION, HTMLRenderer, write_assets
+from AutoPPT.incremental import (
+    PreviousPackage,
+    image_sha1,
+    load_fingerprints,
+    slide_fingerprint,
+)
+from AutoPPT.media_registry import MediaRegistry
+from AutoPPT.parallel_render import (
+    add_exported_slide,
+    layout_parts,
+    render_parallel,
+    resolve_workers,
+)
+from AutoPPT.pptx_writer import StreamingPPTXWriter
+from AutoPPT.slide_prototype import PrototypeSlideBuilder
+from AutoPPT.template_engine import PPTXTemplate
+from AutoPPT.utils.fileio import write_text_to
+from AutoPPT.utils.image_info import flush_image_info
 from AutoPPT.utils.logger import get_logger
 
 # 获取日志器
@@ -17,474 +39,158 @@ logger = get_logger(name="SlideGenerator")
 
 # ==================== HTML 生成器 ====================
 class HTMLGenerator:
-    """HTML 演示文稿生成器"""
-
-    def __init__(self, image_metadata: Dict = None):
+    """HTML 演示文稿生成器（按模板預編譯，見 html_renderer）"""
+
+    def __init__(
+        self,
+        image_metadata: Dict = None,
+        template=None,
+        asset_dir: str = None,
+        image_mode: str = "linked",
+        inline_max_bytes: int = INLINE_MAX_BYTES,
+    ):
+        """
+        Args:
+            image_metadata: 圖片元數據
+            template: PPTXTemplate 模板對象（默認為默認模板，與 PPTX 使用同一份定義）
+            asset_dir: 靜態資源目錄（可選，HTML 所在目錄下的子目錄；CSS / JS 按內容哈希
+                       寫入一次並以相對地址引用，默認內嵌到 HTML 中）
+            image_mode: 圖片模式（linked：延遲加載的縮略圖；inline：小圖內嵌，見 html_images）
+            inline_max_bytes: inline 模式內嵌的最大字節數
+        """
         self.image_metadata = image_metadata or {}
         self.context = {'image_metadata': self.image_metadata}
-
-    def generate_from_data(self, ai_data: Dict) -> str:
+        self.template = template or PPTXTemplate()
+        self.renderer = HTMLRenderer.for_template(self.template)
+        self.asset_dir = asset_dir
+        self.images = HTMLImages(image_mode, asset_dir, inline_max_bytes)
+        # 每張 slide 的指紋與 HTML 片段（見 incremental）
+        self.slide_manifest: List[Dict] = []
+
+    def generate_from_data(self, ai_data: Dict, previous: str = None) -> str:
         """從 AI JSON 數據生成完整 HTML
         
         Args:
             ai_data: AI 生成的結構化數據
+            previous: 上一次輸出的 HTML 路徑（可選，指紋未變化的 slides 重用上一次的片段）
             
         Returns:
             完整的 HTML 字符串
         """
-        slides_html = []
+        return "".join(self.iter_html(ai_data, previous))
+
+    def iter_html(self, ai_data: Dict, previous: str = None, record: bool = True) -> Iterator[str]:
+        """
+        逐段生成 HTML：文檔開頭、每張 slide、文檔結尾
+
+        每段生成後即可寫入文件或 HTTP 響應，第一張 slide 不必等其他 slides 渲染完成，
+        內存中只有當前片段。
+
+        Args:
+            ai_data: AI 生成的結構化數據
+            previous: 上一次輸出的 HTML 路徑（可選，見 generate_from_data）
+            record: 是否把每張 slide 的片段記錄到 slide_manifest（保存指紋時需要）
+        """
+        cached = {
+            entry["fingerprint"]: entry["html"]
+            for entry in (load_fingerprints(previous, "html") if previous else [])
+        }
+        self.slide_manifest = []
+        assets = self._assets()
+        rendered = 0
+        reused = 0
+
+        yield self.renderer.head(ai_data.get('title', '演示文稿'), assets)
 
         for slide_data in ai_data.get('slides', []):
-            slide_html = self._create_slide_html(slide_data)
+            fingerprint = slide_fingerprint(
+                slide_data,
+                self.template.type_fingerprint(slide_data),
+                image_sha1(self.image_metadata, slide_data),
+                html=HTML_RENDERER_VERSION,
+                images=self.images.fingerprint,
+            )
+            slide_html = cached.get(fingerprint)
+            if slide_html is None:
+                slide_html = self._create_slide_html(slide_data)
+            else:
+                reused += 1
             if slide_html:
-                slides_html.append(slide_html)
+                rendered += 1
+                if record:
+                    self.slide_manifest.append({"fingerprint": fingerprint, "html": slide_html})
+                yield slide_html + "\n"
 
-        return self._build_full_html(
-            title=ai_data.get('title', '演示文稿'),
-            slides_html=slides_html
-        )
+        if cached:
+            logger.info(f"♻️  增量渲染：重用 {reused} 張，重新渲染 {rendered - reused} 張")
+        flush_image_info()
+
+        yield self.renderer.tail(assets)
 
     def _create_slide_html(self, slide_data: Dict) -> str:
-        """根據類型創建單個 slide 的 HTML（簡化版）"""
-        slide_type = slide_data.get('slide_type', 'text_content')
-        title = slide_data.get("title", slide_data.get("section_title", ""))
-
-        # 簡單的 HTML 生成（後續可擴展）
-        return f"""
-        <div class="slide">
-            <h2>{title}</h2>
-            <p>Slide Type: {slide_type}</p>
-        </div>
-        """
+        """根據類型創建單個 slide 的 HTML（使用預編譯的類型模板）"""
+        return self.renderer.render_slide(slide_data, self.image_metadata, self.images)
+
+    def _assets(self):
+        """靜態資源的相對地址（沒有資源目錄時為 None，即內嵌）"""
+        if not self.asset_dir:
+            return None
+        dirname = os.path.basename(os.path.normpath(self.asset_dir))
+        return tuple(f"{dirname}/{name}" for name in write_assets(self.asset_dir))
 
     def _build_full_html(self, title: str, slides_html: List[str]) -> str:
-        """構建完整的 HTML 文檔（包含 CSS 和 JS）"""
-        slides_content = '\n'.join(slides_html)
-
-        return f"""
-<!DOCTYPE html>
-<html lang="zh-TW">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: '微軟正黑體', 'Microsoft JhengHei', 'Helvetica Neue', Arial, sans-serif;
-            background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        
-        .presentation-container {{
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-        
-        .slide {{
-            width: 100%;
-            aspect-ratio: 4 / 3;
-            background: white;
-            margin-bottom: 30px;
-            box-shadow: 0 10px 40px rgba(0,0,0,0.3);
-            border-radius: 12px;
-            overflow: hidden;
-            position: relative;
-            display: none;
-        }}
-        
-        .slide.active {{
-            display: block;
-            animation: slideIn 0.5s ease-out;
-        }}
-        
-        @keyframes slideIn {{
-            from {{
-                opacity: 0;
-                transform: translateY(20px);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateY(0);
-            }}
-        }}
-        
-        .slide-content {{
-            padding: 60px 80px;
-            height: 100%;
-            display: flex;
-            flex-direction: column;
-        }}
-        
-        /* 開場頁 */
-        .slide-opening {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }}
-        
-        .slide-opening .slide-content {{
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            width: 100%;
-            height: 100%;
-        }}
-        
-        .slide-opening .main-title {{
-            font-size: 64px;
-            font-weight: bold;
-            color: white;
-            text-align: center;
-            margin-bottom: 30px;
-            text-shadow: 3px 3px 6px rgba(0,0,0,0.3);
-        }}
-        
-        .slide-opening .subtitle {{
-            font-size: 32px;
-            color: rgba(255,255,255,0.95);
-            text-align: center;
-        }}
-        
-        /* 章節頁 */
-        .slide-section {{
-            background: linear-gradient(135deg, #4682b4 0%, #2c5f8d 100%);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }}
-        
-        .slide-section .slide-content {{
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            width: 100%;
-            height: 100%;
-        }}
-        
-        .slide-section .section-title {{
-            font-size: 56px;
-            font-weight: bold;
-            color: white;
-            text-align: center;
-            padding: 40px;
-        }}
-        
-        .decoration-line {{
-            width: 200px;
-            height: 4px;
-            background: white;
-            margin: 30px auto;
-            border-radius: 2px;
-        }}
-        
-        /* 內容頁 */
-        .slide-content .slide-title {{
-            font-size: 42px;
-            font-weight: bold;
-            color: #2c3e50;
-            margin-bottom: 40px;
-            padding-bottom: 20px;
-            border-bottom: 4px solid #4682b4;
-        }}
-        
-        .bullet-list {{
-            list-style: none;
-            padding: 0;
-        }}
-        
-        .bullet-list li {{
-            font-size: 28px;
-            color: #34495e;
-            margin: 25px 0;
-            padding-left: 50px;
-            position: relative;
-            line-height: 1.6;
-        }}
-        
-        .bullet-list li:before {{
-            content: "▶";
-            position: absolute;
-            left: 0;
-            color: #4682b4;
-            font-size: 24px;
-        }}
-        
-        .bullet-list li.indent-1 {{
-            padding-left: 100px;
-            font-size: 24px;
-            color: #555;
-        }}
-        
-        .bullet-list li.indent-1:before {{
-            content: "▸";
-            left: 50px;
-            font-size: 20px;
-        }}
-        
-        /* 圖文混合 */
-        .image-text-container {{
-            display: grid;
-            gap: 40px;
-            flex: 1;
-        }}
-        
-        .image-text-container.layout-horizontal {{
-            grid-template-columns: 1fr 1fr;
-        }}
-        
-        .image-text-container.layout-vertical {{
-            grid-template-rows: auto auto;
-        }}
-        
-        .image-box {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }}
-        
-        .image-box img {{
-            max-width: 100%;
-            max-height: 100%;
-            object-fit: contain;
-            border-radius: 8px;
-            box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-        }}
-        
-        .text-box {{
-            display: flex;
-            align-items: center;
-        }}
-        
-        .text-box p {{
-            font-size: 24px;
-            color: #2c3e50;
-            line-height: 1.8;
-        }}
-        
-        /* 大圖展示 */
-        .full-image-container {{
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-        }}
-        
-        .full-image-container img {{
-            max-width: 90%;
-            max-height: 70%;
-            object-fit: contain;
-            border-radius: 12px;
-            box-shadow: 0 8px 20px rgba(0,0,0,0.25);
-        }}
-        
-        .caption {{
-            margin-top: 20px;
-            font-size: 20px;
-            color: #7f8c8d;
-            text-align: center;
-        }}
-        
-        /* 結尾頁 */
-        .slide-closing {{
-            background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }}
-        
-        .slide-closing .slide-content {{
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            justify-content: center;
-            width: 100%;
-            height: 100%;
-        }}
-        
-        .slide-closing .closing-title {{
-            font-size: 64px;
-            font-weight: bold;
-            color: white;
-            text-align: center;
-            margin-bottom: 30px;
-        }}
-        
-        .slide-closing .closing-subtext {{
-            font-size: 28px;
-            color: rgba(255,255,255,0.95);
-            text-align: center;
-        }}
-        
-        /* 導航控制 */
-        .nav-controls {{
-            position: fixed;
-            bottom: 40px;
-            left: 50%;
-            transform: translateX(-50%);
-            background: rgba(0,0,0,0.7);
-            padding: 15px 30px;
-            border-radius: 50px;
-            display: flex;
-            gap: 20px;
-            align-items: center;
-            backdrop-filter: blur(10px);
-        }}
-        
-        .nav-controls button {{
-            background: white;
-            border: none;
-            padding: 12px 24px;
-            border-radius: 25px;
-            cursor: pointer;
-            font-size: 16px;
-            font-weight: bold;
-            color: #2c3e50;
-            transition: all 0.3s;
-        }}
-        
-        .nav-controls button:hover {{
-            background: #4682b4;
-            color: white;
-            transform: scale(1.05);
-        }}
-        
-        .nav-controls button:disabled {{
-            opacity: 0.5;
-            cursor: not-allowed;
-        }}
-        
-        .slide-counter {{
-            color: white;
-            font-size: 16px;
-            font-weight: bold;
-            min-width: 80px;
-            text-align: center;
-        }}
-        
-        /* 響應式 */
-        @media (max-width: 768px) {{
-            .slide-content {{
-                padding: 30px 40px;
-            }}
-            
-            .slide-opening .main-title {{
-                font-size: 40px;
-            }}
-            
-            .image-text-container.layout-horizontal {{
-                grid-template-columns: 1fr;
-            }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="presentation-container">
-        {slides_content}
-    </div>
-    
-    <div class="nav-controls">
-        <button id="prevBtn">◀ 上一張</button>
-        <span class="slide-counter"><span id="currentSlide">1</span> / <span id="totalSlides">0</span></span>
-        <button id="nextBtn">下一張 ▶</button>
-    </div>
-    
-    <script>
-        let currentSlide = 0;
-        const slides = document.querySelectorAll('.slide');
-        const totalSlides = slides.length;
-        
-        const prevBtn = document.getElementById('prevBtn');
-        const nextBtn = document.getElementById('nextBtn');
-        const currentSlideSpan = document.getElementById('currentSlide');
-        const totalSlidesSpan = document.getElementById('totalSlides');
-        
-        totalSlidesSpan.textContent = totalSlides;
-        
-        function showSlide(n) {{
-            slides.forEach((slide, i) => {{
-                slide.classList.remove('active');
-                if (i === n) {{
-                    slide.classList.add('active');
-                }}
-            }});
-            
-            currentSlideSpan.textContent = n + 1;
-            prevBtn.disabled = n === 0;
-            nextBtn.disabled = n === totalSlides - 1;
-        }}
-        
-        function nextSlide() {{
-            if (currentSlide < totalSlides - 1) {{
-                currentSlide++;
-                showSlide(currentSlide);
-            }}
-        }}
-        
-        function prevSlide() {{
-            if (currentSlide > 0) {{
-                currentSlide--;
-                showSlide(currentSlide);
-            }}
-        }}
-        
-        prevBtn.addEventListener('click', prevSlide);
-        nextBtn.addEventListener('click', nextSlide);
-        
-        document.addEventListener('keydown', (e) => {{
-            if (e.key === 'ArrowRight' || e.key === ' ') {{
-                e.preventDefault();
-                nextSlide();
-            }} else if (e.key === 'ArrowLeft') {{
-                e.preventDefault();
-                prevSlide();
-            }}
-        }});
-        
-        // 初始化
-        if (totalSlides > 0) {{
-            showSlide(0);
-        }}
-    </script>
-</body>
-</html>
-        """
+        """構建完整的 HTML 文檔（靜態 CSS 和 JS 見 html_renderer）"""
+        return self.renderer.document(title, slides_html, self._assets())
+
+    def write_to(self, ai_data: Dict, stream: IO, previous: str = None, record: bool = True) -> IO:
+        """把 HTML 逐段寫入文本流或二進制流（二進制流按 UTF-8 編碼）"""
+        for chunk in self.iter_html(ai_data, previous, record):
+            write_text_to(stream, chunk)
+        return stream
 
 
 # ==================== PPTX 生成器 ====================
 class PPTXGenerator:
     """PPTX 演示文稿生成器（使用模板引擎）"""
 
-    def __init__(self, image_metadata: Dict = None, template=None):
+    def __init__(
+        self,
+        image_metadata: Dict = None,
+        template=None,
+        fast_path: bool = True,
+        image_optimizer=None,
+        workers: int = 1,
+        executor=None,
+    ):
         """
         初始化 PPTX 生成器
 
         Args:
             image_metadata: 圖片元數據
             template: PPTXTemplate 模板對象
+            fast_path: JSON 模板是否使用原型克隆快速路徑（見 slide_prototype）
+            image_optimizer: 圖片預處理器（可選，嵌入前按放置尺寸縮小圖片）
+            workers: 渲染 slides 的進程數（1 為單進程，None 為 CPU 數；見 parallel_render）
+            executor: 並行渲染使用的共享進程池（可選）
         """
         self.template = template
         self.image_metadata = image_metadata or {}
+        self.image_optimizer = image_optimizer
+        self.fast_path = fast_path
+        self.workers = workers
+        self.executor = executor
+        self.media_stats: Dict = {}
+        self.writer = None
+        self._flushed_slides = 0
+        # 每張已創建 slide 的指紋與部件名（見 incremental）
+        self.slide_manifest: List[Dict] = []
 
         # 創建 Presentation
         # 如果模板有 PPTX 文件，使用它作為基礎
         if self.template and self.template.pptx_path:
-            # 使用 PPTX 模板文件創建新的 Presentation
-            self.prs = Presentation(self.template.pptx_path)
+            # 從模板緩存的精簡包創建新的 Presentation（不重新讀取文件，示例 slides 已刪除）
+            self.prs = self.template.open_pptx()
             logger.info(f"   ✓ 使用 PPTX 模板文件：{self.template.pptx_path}")
-
-            # 刪除模板中原本的 slides
-            self._clear_template_slides()
         elif self.template:
             # 只有 JSON 配置，創建新的 Presentation
             self.prs = Presentation()
@@ -497,23 +203,20 @@ class PPTXGenerator:
             self.prs.slide_width = Inches(10)
             self.prs.slide_height = Inches(7.5)
 
-    def _clear_template_slides(self):
-        """刪除模板中原本的 slides"""
-        slide_count = len(self.prs.slides)
-        if slide_count > 0:
-            logger.info(f"   ✓ 刪除模板中的 {slide_count} 個示例 slides...")
-            # 從後往前刪除所有 slides
-            for i in range(slide_count - 1, -1, -1):
-                rId = self.prs.slides._sldIdLst[i].rId
-                self.prs.part.drop_rel(rId)
-                del self.prs.slides._sldIdLst[i]
-            logger.info(f"   ✓ 已清空模板 slides，保留布局和主題")
-
-    def generate_from_data(self, ai_data: Dict) -> Presentation:
+        # 同一張圖片在整個包中只保存一個媒體部件（模板中已有的圖片也會共用）
+        self.media = MediaRegistry(self.prs, image_optimizer)
+        self.slide_builder = (
+            PrototypeSlideBuilder(template, self.media)
+            if fast_path and PrototypeSlideBuilder.supports(template)
+            else None
+        )
+
+    def generate_from_data(self, ai_data: Dict, previous: PreviousPackage = None) -> Presentation:
         """從 AI JSON 數據生成 PPTX（使用模板引擎）
 
         Args:
             ai_data: AI 生成的結構化數據
+            previous: 上一次的輸出（可選，指紋未變化的 slides 直接重用，見 incremental）
 
         Returns:
             Presentation 對象
@@ -522,19 +225,167 @@ class PPTXGenerator:
             logger.error("❌ 沒有模板，無法生成 PPTX")
             return self.prs
 
-        for i, slide_data in enumerate(ai_data.get('slides', []), 1):
+        slides = ai_data.get('slides', [])
+        # 圖片預處理（按放置尺寸縮小）
+        with logger.performance.span("media"):
+            self.media.plan(self.template, slides, self.image_metadata)
+            flush_image_info()
+        fingerprints = [self.slide_fingerprint(slide_data) for slide_data in slides]
+
+        workers = resolve_workers(self.workers, len(slides))
+        with logger.performance.span("slides", slides=len(slides), workers=workers):
+            if previous is not None:
+                # 通常只有少數 slides 變化，在當前進程中渲染
+                self._render_incremental(slides, fingerprints, previous)
+            elif workers > 1:
+                logger.info(f"⚡ 並行渲染 {len(slides)} 張幻燈片（{workers} 個進程）...")
+                try:
+                    render_parallel(self, slides, workers, self.executor)
+                    if len(self.prs.slides._sldIdLst) == len(slides):
+                        for index, fingerprint in enumerate(fingerprints):
+                            self._record_slide(fingerprint, index)
+                    self._flush_slides()
+                except Exception as e:
+                    logger.warning(f"⚠️  並行渲染失敗，改為單進程渲染：{e}")
+                    self.render_slides(slides, fingerprints=fingerprints)
+            else:
+                self.render_slides(slides, fingerprints=fingerprints)
+
+        self.media_stats = self.media.summary()
+        if self.media_stats["placements"]:
+            logger.info(
+                f"🧩 媒體共用：{self.media_stats['placements']} 次放置 → "
+                f"{self.media_stats['media_parts']} 個媒體文件"
+                f"（重複放置 {self.media_stats['shared_bytes'] // 1024} KB）"
+            )
+        return self.prs
+
+    def render_slides(self, slides: List[Dict], start: int = 1, fingerprints: List[str] = None):
+        """
+        在當前進程中逐張渲染 slides
+
+        Args:
+            slides: Slide 數據
+            start: 第一張的序號（只用於日誌）
+            fingerprints: 每張 slide 的指紋（可選，記錄到 slide_manifest）
+        """
+        for offset, slide_data in enumerate(slides):
+            i = start + offset
             logger.info(f"📝 處理第 {i} 張幻燈片...")
+            count = len(self.prs.slides._sldIdLst)
 
             try:
                 # 使用模板引擎創建 slide
-                self.template.create_slide(self.prs, slide_data, self.image_metadata)
+                if self.slide_builder:
+                    self.slide_builder.create_slide(
+                        self.prs, slide_data, self.image_metadata
+                    )
+                else:
+                    self.template.create_slide(
+                        self.prs, slide_data, self.image_metadata, self.media
+                    )
                 logger.info(f"   ✓ 創建成功")
             except Exception as e:
                 logger.error(f"   ❌ 創建失敗：{e}")
                 import traceback
                 traceback.print_exc()
+            if fingerprints and len(self.prs.slides._sldIdLst) == count + 1:
+                self._record_slide(fingerprints[offset], count)
+            self._flush_slides()
+
+    def slide_fingerprint(self, slide_data: Dict) -> str:
+        """slide 指紋（數據 + 類型定義 + 實際嵌入圖片的內容哈希 + 圖片預處理設置）"""
+        image_path = None
+        optimizer = None
+        if self.image_optimizer:
+            meta = self.image_metadata.get(slide_data.get('image_id') or '') or {}
+            image_path = self.media.variants.get(meta.get('path'))
+            optimizer = (self.image_optimizer.dpi, self.image_optimizer.quality)
+        return slide_fingerprint(
+            slide_data,
+            self.template.type_fingerprint(slide_data),
+            image_sha1(self.image_metadata, slide_data, image_path),
+            optimizer=optimizer,
+        )
 
-        return self.prs
+    def _record_slide(self, fingerprint: str, index: int):
+        rId = self.prs.slides._sldIdLst[index].rId
+        partname = self.prs.part.related_part(rId).partname
+        self.slide_manifest.append({"fingerprint": fingerprint, "partname": str(partname)})
+
+    def _render_incremental(
+        self, slides: List[Dict], fingerprints: List[str], previous: PreviousPackage
+    ):
+        """重用指紋未變化的 slides，只渲染變化的 slides"""
+        layouts = layout_parts(self.prs)
+        reused = 0
+        for i, (slide_data, fingerprint) in enumerate(zip(slides, fingerprints), 1):
+            exported = previous.get(fingerprint)
+            if exported and all(
+                ref in layouts for _, _, kind, ref in exported[1] if kind == "layout"
+            ):
+                xml, rels, images = exported
+                images = {
+                    sha1: self.media.merge_media(sha1, *image) for sha1, image in images.items()
+                }
+                add_exported_slide(self.prs, layouts, xml, rels, images)
+                self._record_slide(fingerprint, len(self.prs.slides._sldIdLst) - 1)
+                self._flush_slides()
+                reused += 1
+            else:
+                self.render_slides([slide_data], start=i, fingerprints=[fingerprint])
+        logger.info(f"♻️  增量渲染：重用 {reused} 張，重新渲染 {len(slides) - reused} 張")
+
+    def _flush_slides(self):
+        """流式寫入模式下，把新渲染完成的 slides 寫入並釋放"""
+        if not self.writer:
+            return
+        sld_ids = self.prs.slides._sldIdLst
+        for index in range(self._flushed_slides, len(sld_ids)):
+            self.writer.write_slide(self.prs.part.related_part(sld_ids[index].rId))
+        self._flushed_slides = len(sld_ids)
+
+    def write_from_data(
+        self, ai_data: Dict, file: Union[str, IO[bytes]], previous: str = None
+    ):
+        """
+        流式生成並寫入 PPTX（見 pptx_writer）
+
+        slide 和圖片生成後立即寫入，內存中只保留正在渲染的 slide；
+        寫入後 self.prs 中的 slides 已被釋放，不能再保存或修改。
+
+        Args:
+            ai_data: AI 生成的結構化數據
+            file: 文件路徑或可寫的二進制流
+            previous: 上一次輸出的 PPTX 路徑（可選，有指紋記錄時增量渲染；
+                      不能與 file 是同一個文件，覆蓋時先寫臨時文件）
+
+        Returns:
+            file
+        """
+        if (
+            previous
+            and isinstance(file, (str, os.PathLike))
+            and os.path.abspath(file) == os.path.abspath(previous)
+        ):
+            raise ValueError("增量渲染不能直接覆蓋上一次的輸出，請先寫入臨時文件")
+
+        previous_package = PreviousPackage.open(previous)
+        try:
+            with StreamingPPTXWriter(file) as writer:
+                self.writer = self.media.writer = writer
+                self._flushed_slides = len(self.prs.slides._sldIdLst)
+                try:
+                    self.generate_from_data(ai_data, previous_package)
+                    # 寫入剩餘部件與 [Content_Types].xml
+                    with logger.performance.span("package"):
+                        writer.finish(self.prs.part.package)
+                finally:
+                    self.writer = self.media.writer = None
+        finally:
+            if previous_package is not None:
+                previous_package.close()
+        return file
 
     def save(self, output_path: str):
         """保存 PPTX 文件"""
@@ -544,154 +395,40 @@ class PPTXGenerator:
 
 # ==================== HTML 轉 PPTX 解析器 ====================
 class HTMLToPPTXParser:
-    """解析 HTML 並轉換為 PPTX（用於向後兼容）"""
-
-    def __init__(self, image_metadata: Dict = None):
-        self.generator = PPTXGenerator(image_metadata)
+    """把（用戶編輯過的）HTML 預覽轉換回 PPTX（見 html_parser）"""
 
-    def parse_html_file(self, html_file: str):
-        """解析 HTML 文件並轉換為 PPTX
-        
-        Note: 這個方法保留是為了向後兼容
-        推薦使用 JSON → HTML/PPTX 的新流程
+    def __init__(self, image_metadata: Dict = None, template=None, **generator_options):
         """
-        from bs4 import BeautifulSoup
-
-        logger.info(f"📂 讀取 HTML 文件：{html_file}")
-
-        with open(html_file, "r", encoding="utf-8") as f:
-            html_content = f.read()
-
-        soup = BeautifulSoup(html_content, "html.parser")
-        container = soup.find("div", class_="presentation-container")
-
-        if not container:
-            logger.info("❌ 找不到 presentation-container")
-            return
-
-        slides = container.find_all("div", class_="slide")
-        logger.info(f"   ✓ 找到 {len(slides)} 張幻燈片")
-
-        for i, slide_elem in enumerate(slides, 1):
-            logger.info(f"📝 處理第 {i} 張幻燈片...")
-
-            try:
-                # 判斷 slide 類型
-                slide_classes = slide_elem.get("class", [])
-                slide_data = self._parse_slide_elem(slide_elem, slide_classes)
-
-                if slide_data:
-                    self.generator._create_slide_pptx(slide_data)
-                    logger.info(f"   ✓ 創建成功")
-            except Exception as e:
-                logger.info(f"   ❌ 創建失敗：{e}")
-                import traceback
-                traceback.logger.info_exc()
-
-    def _parse_slide_elem(self, slide_elem, slide_classes: List[str]) -> Dict:
-        """從 HTML 元素解析出 slide 數據"""
-        if "slide-opening" in slide_classes:
-            return self._parse_opening_elem(slide_elem)
-        elif "slide-section" in slide_classes:
-            return self._parse_section_elem(slide_elem)
-        elif "slide-closing" in slide_classes:
-            return self._parse_closing_elem(slide_elem)
-        else:
-            # 檢查是否有圖片
-            if slide_elem.find("div", class_="full-image-container"):
-                return self._parse_full_image_elem(slide_elem)
-            elif slide_elem.find("div", class_="image-text-container"):
-                return self._parse_image_text_elem(slide_elem)
-            else:
-                return self._parse_text_content_elem(slide_elem)
-
-    def _parse_opening_elem(self, elem) -> Dict:
-        title = elem.find("h1", class_="main-title")
-        subtitle = elem.find("p", class_="subtitle")
-        return {
-            'slide_type': 'opening',
-            'title': title.get_text(strip=True) if title else '',
-            'subtitle': subtitle.get_text(strip=True) if subtitle else ''
-        }
-
-    def _parse_section_elem(self, elem) -> Dict:
-        section_title = elem.find("h2", class_="section-title")
-        return {
-            'slide_type': 'section_divider',
-            'section_title': section_title.get_text(strip=True) if section_title else ''
-        }
-
-    def _parse_closing_elem(self, elem) -> Dict:
-        closing_title = elem.find("h1", class_="closing-title")
-        subtext = elem.find("p", class_="closing-subtext")
-        return {
-            'slide_type': 'closing',
-            'closing_text': closing_title.get_text(strip=True) if closing_title else '謝謝觀看',
-            'subtext': subtext.get_text(strip=True) if subtext else ''
-        }
-
-    def _parse_text_content_elem(self, elem) -> Dict:
-        title = elem.find("h2", class_="slide-title")
-        bullet_list = elem.find("ul", class_="bullet-list")
-
-        bullets = []
-        indent_levels = []
+        Args:
+            image_metadata: 圖片元數據
+            template: PPTXTemplate 模板對象（默認使用默認模板）
+            **generator_options: 傳給 PPTXGenerator 的其他選項（fast_path、workers 等）
+        """
+        self.parser = HTMLSlideParser(image_metadata)
+        self.generator = PPTXGenerator(image_metadata, template or PPTXTemplate(), **generator_options)
 
-        if bullet_list:
-            for item in bullet_list.find_all("li"):
-                bullets.append(item.get_text(strip=True))
-                indent_levels.append(1 if "indent-1" in item.get("class", []) else 0)
+    def parse_html(self, html: Union[str, bytes], base_dir: str = '') -> Dict:
+        """解析 HTML 為 slide 數據（{"title": ..., "slides": [...]}，不生成 slides）"""
+        return self.parser.parse(html, base_dir)
 
-        return {
-            'slide_type': 'text_content',
-            'title': title.get_text(strip=True) if title else '',
-            'bullets': bullets,
-            'indent_levels': indent_levels
-        }
+    def parse_html_file(self, html_file: str) -> Dict:
+        """
+        解析 HTML 文件，並按模板把 slides 添加到 PPTX
 
-    def _parse_image_text_elem(self, elem) -> Dict:
-        title = elem.find("h2", class_="slide-title")
-        container = elem.find("div", class_="image-text-container")
-        img_tag = elem.find("img")
-        text_box = elem.find("div", class_="text-box")
-
-        layout = "horizontal"
-        if container and "layout-vertical" in container.get("class", []):
-            layout = "vertical"
-
-        # 提取 image_id（如果 src 是 downloaded_images/xxx.jpg 格式）
-        image_id = ""
-        if img_tag:
-            src = img_tag.get("src", "")
-            # 簡單提取文件名作為 id
-            if src:
-                image_id = src
-
-        return {
-            'slide_type': 'image_with_text',
-            'title': title.get_text(strip=True) if title else '',
-            'image_id': image_id,
-            'text': text_box.get_text(strip=True) if text_box else '',
-            'layout': layout
-        }
+        可以依次解析多個文件，slides 按順序追加到同一份 PPTX 中。
 
-    def _parse_full_image_elem(self, elem) -> Dict:
-        title = elem.find("h2", class_="slide-title")
-        img_tag = elem.find("img")
-        caption = elem.find("p", class_="caption")
-
-        image_id = ""
-        if img_tag:
-            src = img_tag.get("src", "")
-            if src:
-                image_id = src
-
-        return {
-            'slide_type': 'full_image',
-            'title': title.get_text(strip=True) if title else '',
-            'image_id': image_id,
-            'caption': caption.get_text(strip=True) if caption else ''
-        }
+        Returns:
+            解析得到的 slide 數據
+        """
+        logger.info(f"📂 讀取 HTML 文件：{html_file}")
+        data = self.parser.parse_file(html_file)
+        if not data['slides']:
+            logger.warning(f"⚠️  找不到幻燈片：{html_file}")
+            return data
+
+        logger.info(f"   ✓ 找到 {len(data['slides'])} 張幻燈片")
+        self.generator.generate_from_data(data)
+        return data
 
     def save(self, output_path: str):
         """保存 PPTX 文件"""
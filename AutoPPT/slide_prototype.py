@@ -0,0 +1,326 @@
+"""
+Slide 原型克隆 - JSON 模板渲染的快速路徑
+
+python-pptx 的 add_textbox / add_shape / 字體設置每次都要構造大量代理對象。
+同一模板中，同一類型、同一布局、同一組字段的 slide 結構完全相同，只有文字與圖片不同：
+
+1. 第一次遇到某種結構時，用常規路徑在草稿 Presentation 中渲染一個「原型」，
+   記錄每個元素對應的 XML 節點
+2. 之後每張 slide 直接深拷貝原型的 spTree，用 lxml 修改文字節點和圖片引用
+
+原型按（模板, 幻燈片尺寸, 結構）在進程內緩存。生成的 XML 與常規路徑一致；
+遇到常規路徑才能處理的內容（控制字符、非字符串等）時自動退回 create_slide。
+"""
+
+import copy
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from pptx import Presentation
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.parts.slide import SlidePart
+from pptx.slide import Slide
+
+from AutoPPT.template_engine import PPTXTemplate, SlideElement, SlideTypeDefinition
+from AutoPPT.utils.logger import get_logger
+
+logger = get_logger()
+
+# python-pptx 會轉義這些控制字符（或把 \v 轉成換行），交給常規路徑處理
+_CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b-\x1f]')
+
+# 原型中用來佔位的文字與圖片
+_SENTINEL = "S"
+_SENTINEL_IMAGE_ID = "__prototype__"
+
+# 需要逐張修改的元素類型
+_PATCH_KINDS = ("single", "multi", "bullets", "image")
+
+
+class _Fallback(Exception):
+    """內容需要常規路徑處理"""
+
+
+@dataclass(frozen=True, slots=True)
+class ElementPatch:
+    """原型中需要替換內容的節點"""
+    shape_index: int    # 在 spTree 子節點中的位置
+    element_index: int  # 在 SlideTypeDefinition.elements 中的位置
+    kind: str           # single, multi, bullets, image
+
+
+@dataclass(frozen=True)
+class SlidePrototype:
+    """原型 slide（spTree 只讀，使用時深拷貝）"""
+    sp_tree: object
+    patches: Tuple[ElementPatch, ...]
+
+
+_prototypes: Dict[Tuple, SlidePrototype] = {}
+_prototypes_lock = threading.Lock()
+
+
+class PrototypeSlideBuilder:
+    """用原型克隆創建 slide（只用於沒有 PPTX 模板文件的 JSON 模板）"""
+
+    def __init__(self, template: PPTXTemplate, media=None):
+        self.template = template
+        self.media = media
+
+    @staticmethod
+    def supports(template: PPTXTemplate) -> bool:
+        """PPTX 模板文件走佔位符填充，不使用原型"""
+        return template is not None and not template.pptx_path
+
+    def create_slide(
+        self, prs: Presentation, slide_data: Dict, image_metadata: Dict = None
+    ) -> Slide:
+        """創建 slide（與 PPTXTemplate.create_slide 結果一致）"""
+        slide_def = self.template.resolve_slide_def(slide_data)
+        try:
+            if slide_def is None:
+                raise _Fallback()
+            kinds, values = self._plan(slide_def, slide_data, image_metadata)
+            key = (slide_def.type_id, slide_data.get('layout', 'horizontal'), kinds)
+            prototype = self._get_prototype(prs, slide_def, key)
+        except (_Fallback, TypeError, ValueError):
+            return self.template.create_slide(
+                prs, slide_data, image_metadata, self.media
+            )
+
+        layout, _ = self.template.select_layout(prs, slide_def)
+        slide = _add_blank_slide(prs, layout)
+
+        # 原型已包含布局佔位符，直接換上原型的形狀
+        sp_tree = slide.shapes._spTree
+        for child in list(sp_tree):
+            sp_tree.remove(child)
+        sp_tree.extend(copy.deepcopy(child) for child in prototype.sp_tree)
+
+        shapes = list(sp_tree)
+        for patch in prototype.patches:
+            value = values[patch.element_index]
+            shape = shapes[patch.shape_index]
+            if patch.kind == "single":
+                _patch_single(shape, value)
+            elif patch.kind == "multi":
+                _patch_lines(shape, value)
+            elif patch.kind == "bullets":
+                _patch_bullets(shape, value)
+            elif patch.kind == "image":
+                _patch_image(slide, shape, *value, self.media)
+
+        return slide
+
+    # ---------- 結構分析 ----------
+    def _plan(
+        self, slide_def: SlideTypeDefinition, slide_data: Dict, image_metadata: Dict
+    ) -> Tuple[Tuple[str, ...], List]:
+        """分析每個元素的結構（決定使用哪個原型）與要填入的內容"""
+        kinds = []
+        values = []
+        for element in slide_def.elements:
+            if element.type == 'textbox':
+                kind, value = self._plan_textbox(element, slide_data)
+            elif element.type == 'image':
+                kind, value = self._plan_image(element, slide_data, image_metadata)
+            else:
+                kind, value = "static", None
+            kinds.append(kind)
+            values.append(value)
+        return tuple(kinds), values
+
+    def _plan_textbox(self, element: SlideElement, slide_data: Dict) -> Tuple[str, object]:
+        if not PPTXTemplate.textbox_position(element, slide_data):
+            return "absent", None
+
+        if element.name == 'content' and 'bullets' in slide_data:
+            bullets = slide_data.get('bullets', [])
+            indent_levels = slide_data.get('indent_levels', [0] * len(bullets))
+            items = list(zip(bullets, indent_levels))
+            if not items:
+                return "bullets_empty", None
+            for bullet, _ in items:
+                if not isinstance(bullet, str) or _CONTROL_CHARS.search(bullet):
+                    raise _Fallback()
+            return "bullets", [(bullet, level > 0) for bullet, level in items]
+
+        text_value = slide_data.get(element.name, '')
+        if not text_value:
+            return "absent", None
+
+        text_value = self.template._clean_markdown(str(text_value))
+        if _CONTROL_CHARS.search(text_value):
+            raise _Fallback()
+        if '\n' in text_value:
+            return "multi", [line.strip() for line in text_value.split('\n')]
+        return "single", text_value
+
+    def _plan_image(
+        self, element: SlideElement, slide_data: Dict, image_metadata: Dict
+    ) -> Tuple[str, object]:
+        image_id = slide_data.get('image_id', '')
+        if not image_id or not image_metadata or image_id not in image_metadata:
+            return "absent", None
+
+        image_path = image_metadata[image_id].get('path')
+        position = PPTXTemplate.image_position(element, slide_data)
+        if not image_path or not os.path.exists(image_path) or not position:
+            return "absent", None
+
+        try:
+            box = PPTXTemplate.fit_image(
+                position, *PPTXTemplate.image_size(image_metadata[image_id])
+            )
+        except Exception:
+            # 常規路徑會記錄警告並跳過圖片
+            raise _Fallback()
+        if self.media:
+            image_path = self.media.image_path(image_path, box[2], box[3])
+        return "image", (image_path, box)
+
+    # ---------- 原型 ----------
+    def _get_prototype(
+        self, prs: Presentation, slide_def: SlideTypeDefinition, key: Tuple
+    ) -> SlidePrototype:
+        cache_key = (self.template.compiled.key, prs.slide_width, prs.slide_height, key)
+        prototype = _prototypes.get(cache_key)
+        if prototype is None:
+            prototype = self._build_prototype(prs, slide_def, key)
+            with _prototypes_lock:
+                prototype = _prototypes.setdefault(cache_key, prototype)
+        return prototype
+
+    def _build_prototype(
+        self, prs: Presentation, slide_def: SlideTypeDefinition, key: Tuple
+    ) -> SlidePrototype:
+        """在草稿 Presentation 中用常規路徑渲染佔位內容，記錄需要替換的節點"""
+        _, layout, kinds = key
+        logger.debug(f"   🧬 構建 Slide 原型：{slide_def.type_id} {layout} {kinds}")
+
+        skeleton = {'layout': layout}
+        for element, kind in zip(slide_def.elements, kinds):
+            if kind == "single":
+                skeleton[element.name] = _SENTINEL
+            elif kind == "multi":
+                skeleton[element.name] = f"{_SENTINEL}\n{_SENTINEL}"
+            elif kind == "bullets":
+                skeleton['bullets'] = [_SENTINEL, _SENTINEL]
+                skeleton['indent_levels'] = [0, 1]
+            elif kind == "bullets_empty":
+                skeleton['bullets'] = []
+            elif kind == "image":
+                skeleton['image_id'] = _SENTINEL_IMAGE_ID
+
+        scratch = Presentation()
+        scratch.slide_width = prs.slide_width
+        scratch.slide_height = prs.slide_height
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            from PIL import Image
+
+            image_path = os.path.join(tmp_dir, "prototype.png")
+            Image.new("RGB", (4, 3)).save(image_path)
+            image_metadata = {
+                _SENTINEL_IMAGE_ID: {"path": image_path, "width": 4, "height": 3}
+            }
+
+            slide, _ = self.template.add_layout_slide(scratch, slide_def)
+            sp_tree = slide.shapes._spTree
+            self.template._add_background(slide, scratch, slide_def.background)
+
+            patches = []
+            for index, (element, kind) in enumerate(zip(slide_def.elements, kinds)):
+                before = len(sp_tree)
+                self.template._add_element(slide, element, skeleton, image_metadata)
+                added = len(sp_tree) - before
+                if kind in _PATCH_KINDS:
+                    if added != 1:
+                        # 結構與預期不符，不使用原型
+                        raise _Fallback()
+                    patches.append(ElementPatch(len(sp_tree) - 1, index, kind))
+
+        return SlidePrototype(sp_tree=copy.deepcopy(sp_tree), patches=tuple(patches))
+
+
+def _add_blank_slide(prs: Presentation, layout) -> Slide:
+    """
+    添加不含佔位符的空白 slide
+
+    等同 prs.slides.add_slide 但不克隆佔位符；新 slide 部件必然沒有已存在的關係，
+    直接添加關係，避免每張 slide 都遍歷演示文稿的全部關係。
+    """
+    presentation_part = prs.part
+    slide_part = SlidePart.new(
+        presentation_part._next_slide_partname, presentation_part.package, layout.part
+    )
+    rId = presentation_part.rels._add_relationship(RT.SLIDE, slide_part)
+    prs.slides._sldIdLst.add_sldId(rId)
+    return slide_part.slide
+
+
+# ---------- XML 修改 ----------
+def _text_body(shape):
+    return shape.find(qn('p:txBody'))
+
+
+def _set_run_text(paragraph, text: str, run_index: int = 0):
+    paragraph.findall(qn('a:r'))[run_index].find(qn('a:t')).text = text
+
+
+def _patch_single(shape, text: str):
+    """單行文本：替換唯一 run 的文字"""
+    _set_run_text(_text_body(shape).find(qn('a:p')), text)
+
+
+def _patch_lines(shape, lines: List[str]):
+    """多行文本：按行克隆原型段落（空行跳過，首行為空時保留空段落）"""
+    body = _text_body(shape)
+    templates = body.findall(qn('a:p'))
+    for paragraph in templates:
+        body.remove(paragraph)
+
+    if not lines[0]:
+        body.append(parse_xml(f'<a:p {nsdecls("a")}/>'))
+    for i, line in enumerate(lines):
+        if not line:
+            continue
+        paragraph = copy.deepcopy(templates[0] if i == 0 else templates[1])
+        _set_run_text(paragraph, line)
+        body.append(paragraph)
+
+
+def _patch_bullets(shape, items: List[Tuple[str, bool]]):
+    """項目符號：按縮排級別克隆原型段落，替換文字 run"""
+    body = _text_body(shape)
+    templates = body.findall(qn('a:p'))
+    for paragraph in templates:
+        body.remove(paragraph)
+
+    for text, is_indent in items:
+        paragraph = copy.deepcopy(templates[1] if is_indent else templates[0])
+        _set_run_text(paragraph, text, run_index=1)
+        body.append(paragraph)
+
+
+def _patch_image(slide: Slide, shape, image_path: str, box: Tuple, media=None):
+    """圖片：關聯圖片部件，替換引用、描述和位置"""
+    if media:
+        image_part, rId = media.relate_image(slide.part, image_path)
+    else:
+        image_part, rId = slide.part.get_or_add_image_part(image_path)
+    shape.find(f".//{qn('a:blip')}").set(qn('r:embed'), rId)
+    shape.find(f".//{qn('p:cNvPr')}").set('descr', image_part.desc)
+
+    left, top, width, height = box
+    xfrm = shape.find(f"{qn('p:spPr')}/{qn('a:xfrm')}")
+    xfrm.find(qn('a:off')).set('x', str(left))
+    xfrm.find(qn('a:off')).set('y', str(top))
+    xfrm.find(qn('a:ext')).set('cx', str(width))
+    xfrm.find(qn('a:ext')).set('cy', str(height))
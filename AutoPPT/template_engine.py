@@ -6,12 +6,19 @@
 2. 動態生成 SlideType 類
 3. 生成 AI Prompt
 4. 管理 Slide 佈局和樣式
+5. 編譯模板並在進程內共享（TemplateRegistry）
 """
 
+import hashlib
+import io
 import json
 import os
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+import re
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
@@ -20,12 +27,13 @@ from pptx.presentation import Presentation
 from pptx.slide import Slide
 from pptx.util import Inches, Pt
 
+from AutoPPT.utils.image_info import get_image_info
 from AutoPPT.utils.logger import get_logger
 
 logger = get_logger()
 
 
-@dataclass
+@dataclass(frozen=True)
 class Position:
     """位置信息"""
     left: float
@@ -49,24 +57,117 @@ class Position:
                 Inches(self.width), Inches(self.height))
 
 
-@dataclass
+@lru_cache(maxsize=None)
+def parse_hex_color(color_hex: str) -> RGBColor:
+    """解析 #RRGGBB 顏色（RGBColor 不可變，結果可共享）"""
+    color_hex = color_hex.lstrip('#')
+    r, g, b = tuple(int(color_hex[i:i+2], 16) for i in (0, 2, 4))
+    return RGBColor(r, g, b)
+
+
+_ALIGNMENTS = {
+    'center': PP_ALIGN.CENTER,
+    'left': PP_ALIGN.LEFT,
+    'right': PP_ALIGN.RIGHT,
+}
+
+
+def _pt(value) -> Optional[Pt]:
+    return Pt(value) if value else None
+
+
+@dataclass(frozen=True, slots=True)
+class TextStyle:
+    """編譯後的文本樣式（加載模板時計算一次，渲染時直接使用）"""
+    alignment: Optional[PP_ALIGN] = None
+    font_size: Optional[Pt] = None
+    font_size_horizontal: Optional[Pt] = None
+    font_size_vertical: Optional[Pt] = None
+    bold: bool = False
+    color: Optional[RGBColor] = None
+    line_spacing: Optional[float] = None
+    fill_color: Optional[RGBColor] = None
+
+    def font_size_for(self, layout: str) -> Optional[Pt]:
+        """按圖文布局選擇字體大小"""
+        if layout == 'horizontal':
+            return self.font_size_horizontal
+        if layout == 'vertical':
+            return self.font_size_vertical
+        return self.font_size
+
+
+@dataclass(frozen=True, slots=True)
+class BulletStyle:
+    """編譯後的項目符號樣式（符號已帶空格，字號已轉為 Pt）"""
+    symbol_base: str = "▸ "
+    symbol_indent: str = "▸ "
+    bullet_size_base: Pt = Pt(26)
+    bullet_size_indent: Pt = Pt(20)
+    bullet_color_base: RGBColor = RGBColor(70, 130, 180)
+    bullet_color_indent: RGBColor = RGBColor(100, 100, 100)
+    font_size_base: Pt = Pt(24)
+    font_size_indent: Pt = Pt(22)
+    font_color_base: RGBColor = RGBColor(52, 73, 94)
+    font_color_indent: RGBColor = RGBColor(85, 85, 85)
+
+
+# 沒有配置樣式時使用的項目符號樣式
+DEFAULT_BULLET_STYLE = BulletStyle()
+
+
+@dataclass(frozen=True)
 class ElementStyle:
     """元素樣式"""
     data: Dict
-    
+    text: TextStyle = field(init=False, repr=False, compare=False)
+    bullets: BulletStyle = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, 'text', self._compile_text())
+        object.__setattr__(self, 'bullets', self._compile_bullets())
+
     def get(self, key: str, default=None):
         """獲取樣式屬性"""
         return self.data.get(key, default)
     
     def get_color_rgb(self, key: str, default="#000000") -> RGBColor:
         """獲取 RGB 顏色"""
-        color_hex = self.data.get(key, default)
-        color_hex = color_hex.lstrip('#')
-        r, g, b = tuple(int(color_hex[i:i+2], 16) for i in (0, 2, 4))
-        return RGBColor(r, g, b)
+        return parse_hex_color(self.data.get(key, default))
+
+    def _color(self, key: str) -> Optional[RGBColor]:
+        return parse_hex_color(self.data[key]) if self.data.get(key) else None
+
+    def _compile_text(self) -> TextStyle:
+        font_size = self.data.get('font_size')
+        return TextStyle(
+            alignment=_ALIGNMENTS.get(self.data.get('alignment')),
+            font_size=_pt(font_size),
+            font_size_horizontal=_pt(self.data.get('font_size_horizontal', font_size)),
+            font_size_vertical=_pt(self.data.get('font_size_vertical', font_size)),
+            bold=bool(self.data.get('font_bold')),
+            color=self._color('font_color'),
+            line_spacing=self.data.get('line_spacing') or None,
+            fill_color=self._color('fill_color'),
+        )
+
+    def _compile_bullets(self) -> BulletStyle:
+        get = self.data.get
+        return BulletStyle(
+            symbol_base=f"{get('bullet_symbol_base', '▸')} ",
+            symbol_indent=f"{get('bullet_symbol_indent', '▸')} ",
+            bullet_size_base=Pt(get('bullet_size_base', 26)),
+            bullet_size_indent=Pt(get('bullet_size_indent', 20)),
+            bullet_color_base=self.get_color_rgb('bullet_color_base', '#4682B4'),
+            bullet_color_indent=self.get_color_rgb('bullet_color_indent', '#646464'),
+            font_size_base=Pt(get('font_size_base', 24)),
+            font_size_indent=Pt(get('font_size_indent', 22)),
+            font_color_base=self.get_color_rgb('font_color_base', '#34495E'),
+            font_color_indent=self.get_color_rgb('font_color_indent', '#555555'),
+        )
 
 
-@dataclass
+@dataclass(frozen=True)
 class SlideElement:
     """Slide 元素定義"""
     type: str  # textbox, image, shape
@@ -104,7 +205,7 @@ class SlideElement:
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class SlideTypeDefinition:
     """Slide 類型定義"""
     type_id: str
@@ -134,85 +235,269 @@ class SlideTypeDefinition:
         )
 
 
-class PPTXTemplate:
-    """PPTX 模板管理器"""
-
-    def __init__(self, json_path: str = None, pptx_path: str = None):
-        """
-        初始化模板
-
-        Args:
-            json_path: JSON 配置文件路徑
-            pptx_path: PPTX 模板文件路徑（可選，用於保留原始設計）
-        """
-        self.json_path = json_path or self._get_default_template_path()
-        self.pptx_path = pptx_path
-        self.template_data = {}
-        self.slide_types: Dict[str, SlideTypeDefinition] = {}
-        self.pptx_template = None  # 存儲 PPTX 模板對象
-
-        # 加載模板
-        self._load_template()
-
-        # 如果提供了 PPTX 模板，加載它
-        if self.pptx_path:
-            self._load_pptx_template()
-
-    def _get_default_template_path(self) -> str:
-        """獲取默認模板路徑"""
-        return os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'templates', 'default_template.json'
-        )
+@dataclass(frozen=True, slots=True)
+class PlaceholderSlot:
+    """布局中的一個可填充佔位符"""
+    idx: int
+    kind: str  # title, subtitle, body, object, picture
+
+
+# 佔位符類型 → 填充槽類型
+# TITLE=1, CENTER_TITLE=3, SUBTITLE=4, BODY=2, OBJECT=7, PICTURE=18
+PLACEHOLDER_KINDS = {
+    1: 'title',
+    3: 'title',
+    4: 'subtitle',
+    2: 'body',
+    7: 'object',
+    18: 'picture',
+}
+
+
+def build_placeholder_map(layout) -> Tuple[PlaceholderSlot, ...]:
+    """計算布局的佔位符填充順序（與 add_slide 克隆出的佔位符順序一致）"""
+    slots = []
+    for placeholder in layout.iter_cloneable_placeholders():
+        kind = PLACEHOLDER_KINDS.get(placeholder.placeholder_format.type)
+        if kind:
+            slots.append(PlaceholderSlot(placeholder.placeholder_format.idx, kind))
+    return tuple(slots)
+
+
+# markdown 標記：粗體 **text**、斜體 *text*、其他常見的 __text__ 與 _text_
+_MARKDOWN_PATTERNS = tuple(
+    re.compile(pattern)
+    for pattern in (r'\*\*([^*]+)\*\*', r'\*([^*]+)\*', r'__([^_]+)__', r'_([^_]+)_')
+)
+
+
+def clean_markdown(text: str) -> str:
+    """清理 markdown 格式（PPTX 與 HTML 渲染共用）"""
+    for pattern in _MARKDOWN_PATTERNS:
+        text = pattern.sub(r'\1', text)
+    return text
+
+
+def get_default_template_path() -> str:
+    """獲取默認模板路徑"""
+    return os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        'templates', 'default_template.json'
+    )
+
+
+def _file_key(path: Optional[str]) -> Optional[Tuple[str, int]]:
+    """文件的緩存鍵（絕對路徑 + 修改時間），文件更新後自動重新編譯"""
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    return (path, os.stat(path).st_mtime_ns)
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    編譯後的模板（不可變，可在線程間共享）
+
+    JSON 定義只解析一次；PPTX 模板保存為刪除示例 slides 後的精簡包字節
+    （見 template_package），每份簡報從內存中的字節打開，不再重複讀取和解析文件。
+    """
+    json_path: str
+    pptx_path: Optional[str]
+    key: Tuple
+    template_data: Mapping[str, Any]
+    slide_types: Mapping[str, SlideTypeDefinition]
+    pptx_bytes: Optional[bytes] = None
+    # 原始 PPTX 模板的內容哈希
+    pptx_sha1: Optional[str] = None
+    layout_names: Tuple[str, ...] = ()
+    # 每個布局的佔位符填充槽（按布局索引）
+    layout_placeholders: Tuple[Tuple[PlaceholderSlot, ...], ...] = ()
+    # 每個 Slide 類型的內容指紋（類型定義 + 模板信息 + PPTX 模板內容），用於增量渲染
+    type_fingerprints: Mapping[str, str] = MappingProxyType({})
 
-    def _load_template(self):
-        """加載模板配置文件"""
+    @classmethod
+    def compile(
+        cls, json_path: str, pptx_path: str = None, key: Tuple = None
+    ) -> 'CompiledTemplate':
+        """讀取並編譯模板"""
         try:
-            logger.info(f"📄 加載模板配置：{self.json_path}")
+            logger.info(f"📄 加載模板配置：{json_path}")
 
-            with open(self.json_path, "r", encoding="utf-8") as f:
-                self.template_data = json.load(f)
+            with open(json_path, "r", encoding="utf-8") as f:
+                template_data = json.load(f)
 
             # 解析 Slide 類型
-            for slide_data in self.template_data.get('slide_types', []):
+            slide_types = {}
+            for slide_data in template_data.get('slide_types', []):
                 slide_def = SlideTypeDefinition.from_dict(slide_data)
-                self.slide_types[slide_def.type_id] = slide_def
+                slide_types[slide_def.type_id] = slide_def
 
-            template_info = self.template_data.get('template_info', {})
+            template_info = template_data.get('template_info', {})
             logger.info(f"   ✓ 模板：{template_info.get('name', 'Unknown')}")
             logger.info(f"   ✓ 版本：{template_info.get('version', 'Unknown')}")
-            logger.info(f"   ✓ Slide 類型數量：{len(self.slide_types)}")
+            logger.info(f"   ✓ Slide 類型數量：{len(slide_types)}")
 
         except FileNotFoundError:
-            logger.error(f"❌ 模板配置文件不存在：{self.json_path}")
+            logger.error(f"❌ 模板配置文件不存在：{json_path}")
             raise
         except json.JSONDecodeError as e:
             logger.error(f"❌ 模板 JSON 格式錯誤：{e}")
             raise
 
-    def _load_pptx_template(self):
-        """加載 PPTX 模板文件"""
+        pptx_bytes = None
+        pptx_sha1 = None
+        layout_names = ()
+        layout_placeholders = ()
+        if pptx_path:
+            pptx_bytes, pptx_sha1, layout_names, layout_placeholders = cls._load_pptx(pptx_path)
+
+        type_fingerprints = {
+            slide_data['type_id']: hashlib.sha1(
+                json.dumps(
+                    [slide_data, template_data.get('template_info', {}), pptx_sha1],
+                    sort_keys=True,
+                    ensure_ascii=False,
+                ).encode("utf-8")
+            ).hexdigest()
+            for slide_data in template_data.get('slide_types', [])
+        }
+
+        return cls(
+            json_path=json_path,
+            pptx_path=pptx_path,
+            key=key or (_file_key(json_path), _file_key(pptx_path)),
+            template_data=MappingProxyType(template_data),
+            slide_types=MappingProxyType(slide_types),
+            pptx_bytes=pptx_bytes,
+            pptx_sha1=pptx_sha1,
+            layout_names=layout_names,
+            layout_placeholders=layout_placeholders,
+            type_fingerprints=MappingProxyType(type_fingerprints),
+        )
+
+    @staticmethod
+    def _load_pptx(pptx_path: str) -> Tuple[bytes, str, Tuple[str, ...], Tuple]:
+        """加載 PPTX 模板文件（返回精簡包字節、原始內容哈希、布局名稱與佔位符填充槽）"""
         try:
-            logger.info(f"📄 加載 PPTX 模板：{self.pptx_path}")
+            logger.info(f"📄 加載 PPTX 模板：{pptx_path}")
 
             from pptx import Presentation
 
-            self.pptx_template = Presentation(self.pptx_path)
+            from AutoPPT.template_package import load_stripped
+
+            with open(pptx_path, "rb") as f:
+                source_bytes = f.read()
+            pptx_sha1 = hashlib.sha1(source_bytes).hexdigest()
+            pptx_bytes = load_stripped(pptx_path, source_bytes)
+            layouts = Presentation(io.BytesIO(pptx_bytes)).slide_layouts
+            layout_names = tuple(layout.name for layout in layouts)
+            layout_placeholders = tuple(build_placeholder_map(layout) for layout in layouts)
 
             logger.info(f"   ✓ PPTX 模板加載成功")
-            logger.info(f"   ✓ 可用布局數量：{len(self.pptx_template.slide_layouts)}")
+            logger.info(f"   ✓ 可用布局數量：{len(layout_names)}")
 
             # 列出所有可用的布局
-            for i, layout in enumerate(self.pptx_template.slide_layouts):
-                logger.info(f"      - Layout {i}: {layout.name}")
+            for i, name in enumerate(layout_names):
+                logger.info(f"      - Layout {i}: {name}")
+
+            return pptx_bytes, pptx_sha1, layout_names, layout_placeholders
 
         except FileNotFoundError:
-            logger.error(f"❌ PPTX 模板文件不存在：{self.pptx_path}")
+            logger.error(f"❌ PPTX 模板文件不存在：{pptx_path}")
             raise
         except Exception as e:
             logger.error(f"❌ 加載 PPTX 模板失敗：{e}")
             raise
 
+
+class TemplateRegistry:
+    """
+    進程內的模板註冊表
+
+    以（路徑, 修改時間）為鍵緩存 CompiledTemplate，同一模板在進程內只編譯一次；
+    文件被修改後下一次獲取時自動重新編譯。
+    """
+
+    def __init__(self):
+        # (json 路徑, pptx 路徑) → 最新版本的 CompiledTemplate
+        self._compiled: Dict[Tuple, CompiledTemplate] = {}
+        self._lock = threading.Lock()
+
+    def get(self, json_path: str = None, pptx_path: str = None) -> CompiledTemplate:
+        """獲取編譯後的模板（未編譯或文件已更新時編譯）"""
+        json_path = json_path or get_default_template_path()
+        try:
+            key = (_file_key(json_path), _file_key(pptx_path))
+        except FileNotFoundError:
+            # 交給 compile 記錄錯誤並拋出
+            return CompiledTemplate.compile(json_path, pptx_path)
+
+        paths = (key[0][0], key[1] and key[1][0])
+        compiled = self._compiled.get(paths)
+        if compiled is not None and compiled.key == key:
+            return compiled
+
+        with self._lock:
+            compiled = self._compiled.get(paths)
+            if compiled is None or compiled.key != key:
+                with logger.performance.span("template", label=paths[0]):
+                    compiled = CompiledTemplate.compile(json_path, pptx_path, key=key)
+                self._compiled[paths] = compiled
+            return compiled
+
+    def clear(self):
+        """清空緩存"""
+        with self._lock:
+            self._compiled.clear()
+
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+
+# 進程內共享的模板註冊表
+template_registry = TemplateRegistry()
+
+
+class PPTXTemplate:
+    """
+    PPTX 模板管理器
+
+    輕量句柄：解析結果來自 template_registry 中共享的 CompiledTemplate，
+    創建實例不會重新讀取和解析模板文件。
+    """
+
+    def __init__(
+        self,
+        json_path: str = None,
+        pptx_path: str = None,
+        compiled: CompiledTemplate = None,
+    ):
+        """
+        初始化模板
+
+        Args:
+            json_path: JSON 配置文件路徑
+            pptx_path: PPTX 模板文件路徑（可選，用於保留原始設計）
+            compiled: 已編譯的模板（可選，提供時忽略路徑）
+        """
+        self.compiled = compiled or template_registry.get(json_path, pptx_path)
+        self.json_path = self.compiled.json_path
+        self.pptx_path = self.compiled.pptx_path
+        self.template_data = self.compiled.template_data
+        self.slide_types = self.compiled.slide_types
+
+    @property
+    def pptx_template(self) -> Optional[Presentation]:
+        """PPTX 模板對象（每次返回新的副本）"""
+        return self.open_pptx() if self.pptx_path else None
+
+    def open_pptx(self) -> Presentation:
+        """從緩存的精簡模板字節打開一份新的 Presentation（沒有示例 slides）"""
+        from pptx import Presentation
+
+        return Presentation(io.BytesIO(self.compiled.pptx_bytes))
+
     def get_slide_type_definition(self, type_id: str) -> Optional[SlideTypeDefinition]:
         """獲取 Slide 類型定義"""
         return self.slide_types.get(type_id)
@@ -305,7 +590,8 @@ class PPTXTemplate:
         self,
         prs: Presentation,
         slide_data: Dict,
-        image_metadata: Dict = None
+        image_metadata: Dict = None,
+        media=None,
     ) -> Slide:
         """
         根據數據創建 Slide
@@ -314,29 +600,15 @@ class PPTXTemplate:
             prs: Presentation 對象
             slide_data: Slide 數據
             image_metadata: 圖片元數據
+            media: 圖片媒體登記（可選，見 media_registry；共用媒體部件並預處理圖片）
             
         Returns:
             創建的 Slide
         """
-        slide_type_id = slide_data.get('slide_type', 'text_content')
-        slide_def = self.get_slide_type_definition(slide_type_id)
-
-        if not slide_def:
-            logger.warning(f"⚠️  未知的 Slide 類型：{slide_type_id}")
-            slide_def = self.get_slide_type_definition('text_content')
+        slide_def = self.resolve_slide_def(slide_data)
 
         # 創建 slide
-        layout_index = slide_def.layout_index
-
-        # 使用 prs 的布局（如果有 PPTX 模板，prs 就是從模板創建的）
-        if layout_index < len(prs.slide_layouts):
-            slide = prs.slides.add_slide(prs.slide_layouts[layout_index])
-            logger.info(
-                f"   ✓ 使用布局 {layout_index}: {prs.slide_layouts[layout_index].name}"
-            )
-        else:
-            logger.warning(f"⚠️  布局索引 {layout_index} 超出範圍，使用布局 0")
-            slide = prs.slides.add_slide(prs.slide_layouts[0])
+        slide, layout_index = self.add_layout_slide(prs, slide_def)
 
         # 檢查是否使用 PPTX 模板
         # 只有在沒有 PPTX 模板時才添加背景和元素
@@ -347,17 +619,72 @@ class PPTXTemplate:
 
             # 添加元素
             for element in slide_def.elements:
-                self._add_element(slide, element, slide_data, image_metadata)
+                self._add_element(
+                    slide, element, slide_data, image_metadata, media
+                )
         else:
             # 使用 PPTX 模板時，填充佔位符
-            self._fill_placeholders(slide, slide_data, image_metadata)
+            self._fill_placeholders(
+                slide, slide_data, image_metadata, layout_index, media
+            )
 
         return slide
 
+    def type_fingerprint(self, slide_data: Dict) -> Optional[str]:
+        """Slide 數據對應類型定義的內容指紋（未知類型使用 text_content 的指紋）"""
+        fingerprints = self.compiled.type_fingerprints
+        slide_type_id = slide_data.get('slide_type', 'text_content')
+        if slide_type_id in fingerprints:
+            return fingerprints[slide_type_id]
+        return fingerprints.get('text_content')
+
+    def resolve_slide_def(self, slide_data: Dict) -> SlideTypeDefinition:
+        """獲取 Slide 數據對應的類型定義（未知類型使用 text_content）"""
+        slide_type_id = slide_data.get('slide_type', 'text_content')
+        slide_def = self.get_slide_type_definition(slide_type_id)
+
+        if not slide_def:
+            logger.warning(f"⚠️  未知的 Slide 類型：{slide_type_id}")
+            slide_def = self.get_slide_type_definition('text_content')
+        return slide_def
+
+    def add_layout_slide(
+        self, prs: Presentation, slide_def: SlideTypeDefinition
+    ) -> Tuple[Slide, int]:
+        """按類型定義的布局添加空白 slide，返回 slide 與實際使用的布局索引"""
+        layout, layout_index = self.select_layout(prs, slide_def)
+        return prs.slides.add_slide(layout), layout_index
+
+    def select_layout(self, prs: Presentation, slide_def: SlideTypeDefinition) -> Tuple:
+        """選擇類型定義使用的布局，返回（布局, 實際使用的布局索引）"""
+        layout_index = slide_def.layout_index
+
+        # 使用 prs 的布局（如果有 PPTX 模板，prs 就是從模板創建的）
+        if layout_index < len(prs.slide_layouts):
+            layout = prs.slide_layouts[layout_index]
+            logger.info(f"   ✓ 使用布局 {layout_index}: {layout.name}")
+        else:
+            logger.warning(f"⚠️  布局索引 {layout_index} 超出範圍，使用布局 0")
+            layout_index = 0
+            layout = prs.slide_layouts[0]
+        return layout, layout_index
+
+    def _placeholder_slots(self, slide: Slide, layout_index: int) -> Tuple[PlaceholderSlot, ...]:
+        """獲取布局的佔位符填充槽（模板編譯時已計算，prs 布局不同時現算）"""
+        slots = self.compiled.layout_placeholders
+        if layout_index < len(slots):
+            return slots[layout_index]
+        return build_placeholder_map(slide.slide_layout)
+
     def _fill_placeholders(
-        self, slide: Slide, slide_data: Dict, image_metadata: Dict = None
+        self,
+        slide: Slide,
+        slide_data: Dict,
+        image_metadata: Dict = None,
+        layout_index: int = 0,
+        media=None,
     ):
-        """填充 PPTX 模板的佔位符"""
+        """填充 PPTX 模板的佔位符（按預先計算的佔位符表直接查找）"""
         try:
             filled_count = 0
 
@@ -379,31 +706,31 @@ class PPTXTemplate:
                 f"      數據：標題={bool(title)}, 副標題={bool(subtitle)}, 內容={len(content_fields)}, 圖片={bool(image_id)}, Bullets={len(bullets)}"
             )
 
-            # 按佔位符類型填充
-            content_index = 0
-            for shape in slide.shapes:
-                try:
-                    if not hasattr(shape, "placeholder_format"):
-                        continue
+            shapes = {
+                shape.placeholder_format.idx: shape for shape in slide.placeholders
+            }
 
-                    placeholder_type = shape.placeholder_format.type
+            # 按佔位符表填充
+            content_index = 0
+            for slot in self._placeholder_slots(slide, layout_index):
+                shape = shapes.get(slot.idx)
+                if shape is None:
+                    continue
 
-                    # 標題佔位符 (TITLE=1, CENTER_TITLE=3)
-                    if placeholder_type in [1, 3]:
+                try:
+                    if slot.kind == 'title':
                         if title:
                             shape.text = title
                             logger.info(f"      ✓ 填充標題：{title[:40]}...")
                             filled_count += 1
 
-                    # 副標題佔位符 (SUBTITLE=4)
-                    elif placeholder_type == 4:
+                    elif slot.kind == 'subtitle':
                         if subtitle:
                             shape.text = subtitle
                             logger.info(f"      ✓ 填充副標題：{subtitle[:40]}...")
                             filled_count += 1
 
-                    # 內容佔位符 (BODY=2, OBJECT=7)
-                    elif placeholder_type in [2, 7]:
+                    elif slot.kind in ('body', 'object'):
                         # 優先填充 bullets
                         if bullets:
                             text_frame = shape.text_frame
@@ -447,7 +774,7 @@ class PPTXTemplate:
                             content_index += 1
 
                         # 最後嘗試填充副標題（如果還沒有被 SUBTITLE 佔位符填充）
-                        elif subtitle and placeholder_type == 2:  # 只在 BODY 類型
+                        elif subtitle and slot.kind == 'body':  # 只在 BODY 類型
                             shape.text = subtitle
                             logger.info(
                                 f"      ✓ 填充副標題（BODY）：{subtitle[:40]}..."
@@ -455,13 +782,19 @@ class PPTXTemplate:
                             filled_count += 1
                             subtitle = ""  # 清空，避免重複填充
 
-                    # 圖片佔位符 (PICTURE=18)
-                    elif placeholder_type == 18:
+                    elif slot.kind == 'picture':
                         if image_id and image_metadata and image_id in image_metadata:
                             image_path = image_metadata[image_id].get("path")
                             if image_path and os.path.exists(image_path):
                                 try:
-                                    shape.insert_picture(image_path)
+                                    if media:
+                                        # 佔位符會裁剪圖片，需要鋪滿佔位符
+                                        image_path = media.image_path(
+                                            image_path, shape.width, shape.height, cover=True
+                                        )
+                                        media.insert_picture(shape, image_path)
+                                    else:
+                                        shape.insert_picture(image_path)
                                     logger.info(f"      ✓ 填充圖片：{image_id}")
                                     filled_count += 1
                                 except Exception as img_error:
@@ -492,24 +825,17 @@ class PPTXTemplate:
         bg_type = bg_config.get('type', 'solid')
 
         if bg_type == 'solid':
-            color_hex = bg_config.get('color', '#FFFFFF')
             bg = slide.shapes.add_shape(
                 MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, prs.slide_height
             )
             bg.fill.solid()
-
-            color_hex = color_hex.lstrip('#')
-            r, g, b = tuple(int(color_hex[i:i+2], 16) for i in (0, 2, 4))
-            bg.fill.fore_color.rgb = RGBColor(r, g, b)
+            bg.fill.fore_color.rgb = parse_hex_color(bg_config.get('color', '#FFFFFF'))
             bg.line.fill.background()
 
         elif bg_type == 'gradient':
             # 使用中間色作為近似
-            start_hex = bg_config.get('color_start', '#FFFFFF').lstrip('#')
-            end_hex = bg_config.get('color_end', '#FFFFFF').lstrip('#')
-
-            start_rgb = tuple(int(start_hex[i:i+2], 16) for i in (0, 2, 4))
-            end_rgb = tuple(int(end_hex[i:i+2], 16) for i in (0, 2, 4))
+            start_rgb = parse_hex_color(bg_config.get('color_start', '#FFFFFF'))
+            end_rgb = parse_hex_color(bg_config.get('color_end', '#FFFFFF'))
 
             # 計算中間色
             mid_rgb = tuple((s + e) // 2 for s, e in zip(start_rgb, end_rgb))
@@ -526,19 +852,20 @@ class PPTXTemplate:
         slide: Slide,
         element: SlideElement,
         slide_data: Dict,
-        image_metadata: Dict = None
+        image_metadata: Dict = None,
+        media=None,
     ):
         """添加元素"""
         if element.type == 'textbox':
             self._add_textbox(slide, element, slide_data)
         elif element.type == 'image':
-            self._add_image(slide, element, slide_data, image_metadata)
+            self._add_image(slide, element, slide_data, image_metadata, media)
         elif element.type == 'shape':
             self._add_shape(slide, element)
 
-    def _add_textbox(self, slide: Slide, element: SlideElement, slide_data: Dict):
-        """添加文本框"""
-        # 獲取位置（支持 position、position_horizontal、position_vertical）
+    @staticmethod
+    def textbox_position(element: SlideElement, slide_data: Dict) -> Optional[Position]:
+        """獲取文本框位置（支持 position、position_horizontal、position_vertical）"""
         position = element.position
 
         # 如果有 horizontal/vertical 位置，根據 layout 選擇
@@ -550,7 +877,96 @@ class PPTXTemplate:
                 position = element.position_vertical
             elif element.position_horizontal:  # 默認使用 horizontal
                 position = element.position_horizontal
+        return position
+
+    @staticmethod
+    def image_position(element: SlideElement, slide_data: Dict) -> Optional[Position]:
+        """根據 layout 選擇圖片位置"""
+        layout = slide_data.get('layout', 'horizontal')
+        if layout == 'vertical' and element.position_vertical:
+            return element.position_vertical
+        if element.position_horizontal:
+            return element.position_horizontal
+        return element.position
+
+    def image_boxes(
+        self, prs: Presentation, slide_data: Dict, image_metadata: Dict
+    ) -> List[Tuple[int, int, bool]]:
+        """
+        Slide 中圖片的放置框（不創建 slide，用於渲染前規劃圖片版本）
+
+        Returns:
+            [(寬度 EMU, 高度 EMU, cover), ...]；佔位符會裁剪圖片，cover 為 True
+        """
+        image_info = (image_metadata or {}).get(slide_data.get('image_id') or '')
+        if not image_info or not image_info.get('path'):
+            return []
+
+        slide_def = self.get_slide_type_definition(
+            slide_data.get('slide_type', 'text_content')
+        ) or self.get_slide_type_definition('text_content')
+        if not slide_def:
+            return []
+
+        if not self.pptx_path:
+            boxes = []
+            for element in slide_def.elements:
+                position = self.image_position(element, slide_data)
+                if element.type == 'image' and position:
+                    _, _, width, height = self.fit_image(
+                        position, *self.image_size(image_info)
+                    )
+                    boxes.append((width, height, False))
+            return boxes
+
+        layout_index = slide_def.layout_index
+        if layout_index >= len(prs.slide_layouts):
+            layout_index = 0
+        layout = prs.slide_layouts[layout_index]
+        slots = self.compiled.layout_placeholders
+        slots = slots[layout_index] if layout_index < len(slots) else build_placeholder_map(layout)
+        pictures = {slot.idx for slot in slots if slot.kind == 'picture'}
+        return [
+            (placeholder.width, placeholder.height, True)
+            for placeholder in layout.placeholders
+            if placeholder.placeholder_format.idx in pictures
+        ]
+
+    @staticmethod
+    def image_size(image_info: Dict) -> Tuple[int, int]:
+        """圖片尺寸（優先使用 image_metadata 中記錄的尺寸，否則查圖片信息緩存）"""
+        if image_info.get('width') and image_info.get('height'):
+            return image_info['width'], image_info['height']
+        info = get_image_info(image_info['path'])
+        return info['width'], info['height']
+
+    @staticmethod
+    def fit_image(position: Position, img_width: int, img_height: int) -> Tuple:
+        """在位置框內保持寬高比並居中，返回 (left, top, width, height) Inches"""
+        aspect_ratio = img_width / img_height
+
+        max_width = position.width
+        max_height = position.height
+
+        # 計算實際尺寸
+        if aspect_ratio >= max_width / max_height:
+            # 寬度優先
+            actual_width = max_width
+            actual_height = max_width / aspect_ratio
+        else:
+            # 高度優先
+            actual_height = max_height
+            actual_width = max_height * aspect_ratio
 
+        # 居中
+        left = position.left + (max_width - actual_width) / 2
+        top = position.top + (max_height - actual_height) / 2
+
+        return Inches(left), Inches(top), Inches(actual_width), Inches(actual_height)
+
+    def _add_textbox(self, slide: Slide, element: SlideElement, slide_data: Dict):
+        """添加文本框"""
+        position = self.textbox_position(element, slide_data)
         if not position:
             return
 
@@ -587,16 +1003,7 @@ class PPTXTemplate:
 
     def _clean_markdown(self, text: str) -> str:
         """清理 markdown 格式"""
-        import re
-
-        # 移除粗體標記 **text**
-        text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-        # 移除斜體標記 *text*
-        text = re.sub(r'\*([^*]+)\*', r'\1', text)
-        # 移除其他常見 markdown 標記
-        text = re.sub(r'__([^_]+)__', r'\1', text)
-        text = re.sub(r'_([^_]+)_', r'\1', text)
-        return text
+        return clean_markdown(text)
 
     def _add_multiline_text(self, text_frame, text_value: str, element: SlideElement, slide_data: Dict):
         """添加多行文本（處理換行符）"""
@@ -616,50 +1023,32 @@ class PPTXTemplate:
             self._apply_text_style(p, element, slide_data)
 
             # 設置行間距
-            if element.style and element.style.get('line_spacing'):
-                p.line_spacing = element.style.get('line_spacing')
+            if element.style and element.style.text.line_spacing:
+                p.line_spacing = element.style.text.line_spacing
 
     def _apply_text_style(self, paragraph, element: SlideElement, slide_data: Dict):
         """應用文本樣式"""
         if not element.style:
             return
+        style = element.style.text
 
         # 對齊方式
-        if element.style.get('alignment') == 'center':
-            paragraph.alignment = PP_ALIGN.CENTER
-        elif element.style.get('alignment') == 'left':
-            paragraph.alignment = PP_ALIGN.LEFT
-        elif element.style.get('alignment') == 'right':
-            paragraph.alignment = PP_ALIGN.RIGHT
+        if style.alignment is not None:
+            paragraph.alignment = style.alignment
 
         # 字體大小（支持 horizontal/vertical 特定大小）
-        layout = slide_data.get('layout', 'horizontal')
-        font_size_key = f'font_size_{layout}' if layout in ['horizontal', 'vertical'] else 'font_size'
-        font_size = element.style.get(font_size_key, element.style.get('font_size'))
-
-        if font_size and paragraph.runs:
-            for run in paragraph.runs:
-                run.font.size = Pt(font_size)
-        elif font_size:
-            paragraph.font.size = Pt(font_size)
-
-        # 粗體
-        if element.style.get('font_bold'):
-            if paragraph.runs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-            else:
-                paragraph.font.bold = True
-
-        # 顏色
-        font_color = element.style.get('font_color')
-        if font_color:
-            color_rgb = element.style.get_color_rgb('font_color')
-            if paragraph.runs:
-                for run in paragraph.runs:
-                    run.font.color.rgb = color_rgb
-            else:
-                paragraph.font.color.rgb = color_rgb
+        font_size = style.font_size_for(slide_data.get('layout', 'horizontal'))
+        fonts = [run.font for run in paragraph.runs] or [paragraph.font]
+
+        for font in fonts:
+            if font_size:
+                font.size = font_size
+            # 粗體
+            if style.bold:
+                font.bold = True
+            # 顏色
+            if style.color is not None:
+                font.color.rgb = style.color
 
     def _add_bullet_content(self, text_frame, slide_data: Dict, style: ElementStyle = None):
         """添加項目符號內容"""
@@ -669,13 +1058,8 @@ class PPTXTemplate:
         if not bullets:
             return
 
-        # 獲取樣式（如果 style 為 None，使用默認值）
-        bullet_symbol_base = style.get('bullet_symbol_base', '▸') if style else '▸'
-        bullet_symbol_indent = style.get('bullet_symbol_indent', '▸') if style else '▸'
-        font_size_base = style.get('font_size_base', 24) if style else 24
-        font_size_indent = style.get('font_size_indent', 22) if style else 22
-        bullet_size_base = style.get('bullet_size_base', 26) if style else 26
-        bullet_size_indent = style.get('bullet_size_indent', 20) if style else 20
+        # 使用編譯好的樣式（如果 style 為 None，使用默認值）
+        bullet_style = style.bullets if style else DEFAULT_BULLET_STYLE
 
         for i, (bullet, level) in enumerate(zip(bullets, indent_levels)):
             is_indent = level > 0
@@ -686,39 +1070,25 @@ class PPTXTemplate:
             if i == 0:
                 p.clear()
 
-            # 添加箭頭符號
             run_bullet = p.add_run()
-            if is_indent:
-                run_bullet.text = f"{bullet_symbol_indent} "
-                run_bullet.font.size = Pt(bullet_size_indent)
-                if style:
-                    run_bullet.font.color.rgb = style.get_color_rgb('bullet_color_indent', '#646464')
-                else:
-                    run_bullet.font.color.rgb = RGBColor(100, 100, 100)
-            else:
-                run_bullet.text = f"{bullet_symbol_base} "
-                run_bullet.font.size = Pt(bullet_size_base)
-                if style:
-                    run_bullet.font.color.rgb = style.get_color_rgb('bullet_color_base', '#4682B4')
-                else:
-                    run_bullet.font.color.rgb = RGBColor(70, 130, 180)
-
-            # 添加文字
             run_text = p.add_run()
             run_text.text = bullet
+
             if is_indent:
-                run_text.font.size = Pt(font_size_indent)
-                if style:
-                    run_text.font.color.rgb = style.get_color_rgb('font_color_indent', '#555555')
-                else:
-                    run_text.font.color.rgb = RGBColor(85, 85, 85)
+                # 添加箭頭符號
+                run_bullet.text = bullet_style.symbol_indent
+                run_bullet.font.size = bullet_style.bullet_size_indent
+                run_bullet.font.color.rgb = bullet_style.bullet_color_indent
+                # 添加文字
+                run_text.font.size = bullet_style.font_size_indent
+                run_text.font.color.rgb = bullet_style.font_color_indent
                 p.level = 1
             else:
-                run_text.font.size = Pt(font_size_base)
-                if style:
-                    run_text.font.color.rgb = style.get_color_rgb('font_color_base', '#34495E')
-                else:
-                    run_text.font.color.rgb = RGBColor(52, 73, 94)
+                run_bullet.text = bullet_style.symbol_base
+                run_bullet.font.size = bullet_style.bullet_size_base
+                run_bullet.font.color.rgb = bullet_style.bullet_color_base
+                run_text.font.size = bullet_style.font_size_base
+                run_text.font.color.rgb = bullet_style.font_color_base
                 p.level = 0
 
     def _add_image(
@@ -726,7 +1096,8 @@ class PPTXTemplate:
         slide: Slide,
         element: SlideElement,
         slide_data: Dict,
-        image_metadata: Dict = None
+        image_metadata: Dict = None,
+        media=None,
     ):
         """添加圖片"""
         image_id = slide_data.get('image_id', '')
@@ -742,49 +1113,21 @@ class PPTXTemplate:
             return
 
         # 根據 layout 選擇位置
-        layout = slide_data.get('layout', 'horizontal')
-        if layout == 'vertical' and element.position_vertical:
-            position = element.position_vertical
-        elif element.position_horizontal:
-            position = element.position_horizontal
-        else:
-            position = element.position
-
+        position = self.image_position(element, slide_data)
         if not position:
             return
 
         # 計算圖片尺寸（保持寬高比）
-        from PIL import Image
         try:
-            with Image.open(image_path) as img:
-                img_width, img_height = img.size
-                aspect_ratio = img_width / img_height
-
-                max_width = position.width
-                max_height = position.height
-
-                # 計算實際尺寸
-                if aspect_ratio >= max_width / max_height:
-                    # 寬度優先
-                    actual_width = max_width
-                    actual_height = max_width / aspect_ratio
-                else:
-                    # 高度優先
-                    actual_height = max_height
-                    actual_width = max_height * aspect_ratio
-
-                # 居中
-                left = position.left + (max_width - actual_width) / 2
-                top = position.top + (max_height - actual_height) / 2
-
-                slide.shapes.add_picture(
-                    image_path,
-                    Inches(left),
-                    Inches(top),
-                    width=Inches(actual_width),
-                    height=Inches(actual_height)
-                )
-                logger.info(f"   ✓ 添加圖片：{os.path.basename(image_path)}")
+            left, top, width, height = self.fit_image(
+                position, *self.image_size(image_metadata[image_id])
+            )
+            if media:
+                image_path = media.image_path(image_path, width, height)
+                media.add_picture(slide, image_path, left, top, width, height)
+            else:
+                slide.shapes.add_picture(image_path, left, top, width=width, height=height)
+            logger.info(f"   ✓ 添加圖片：{os.path.basename(image_path)}")
 
         except Exception as e:
             logger.warning(f"⚠️  添加圖片失敗：{e}")
@@ -802,10 +1145,8 @@ class PPTXTemplate:
             )
             shape.fill.solid()
 
-            if element.style:
-                fill_color = element.style.get('fill_color')
-                if fill_color:
-                    shape.fill.fore_color.rgb = element.style.get_color_rgb('fill_color')
+            if element.style and element.style.text.fill_color is not None:
+                shape.fill.fore_color.rgb = element.style.text.fill_color
 
             shape.line.fill.background()
 
@@ -0,0 +1,78 @@
+"""
+模板包預處理 - 只保留布局、母版與主題的精簡 PPTX
+
+品牌模板通常帶有幾十張示例 slides 及其圖片。以前每份簡報都打開完整的模板包，
+再逐個刪除示例 slides 的關係，示例 slides 和圖片仍然要被讀取和解析。
+
+每個模板只精簡一次：刪除示例 slides 後重新保存（從包關係開始不可達的 slides、
+備註和圖片不會寫入），結果按模板內容哈希緩存在模板旁的 .stripped/ 目錄，
+之後每份簡報都從精簡後的包開始。
+"""
+
+import hashlib
+import io
+import os
+
+from AutoPPT.utils.fileio import atomic_open
+from AutoPPT.utils.logger import get_logger
+
+logger = get_logger()
+
+CACHE_DIRNAME = ".stripped"
+
+# 精簡邏輯改變時遞增，舊的緩存全部失效
+STRIP_VERSION = 1
+
+
+def strip_slides(pptx_bytes: bytes) -> bytes:
+    """刪除所有示例 slides，返回只有布局、母版與主題的 PPTX 字節"""
+    from pptx import Presentation
+
+    prs = Presentation(io.BytesIO(pptx_bytes))
+    sld_id_lst = prs.slides._sldIdLst
+    for sld_id in list(sld_id_lst):
+        prs.part.drop_rel(sld_id.rId)
+        sld_id_lst.remove(sld_id)
+
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def cache_path(pptx_path: str, sha1: str) -> str:
+    """精簡包的緩存路徑"""
+    return os.path.join(
+        os.path.dirname(os.path.abspath(pptx_path)),
+        CACHE_DIRNAME,
+        f"{sha1[:16]}_v{STRIP_VERSION}.pptx",
+    )
+
+
+def load_stripped(pptx_path: str, pptx_bytes: bytes) -> bytes:
+    """
+    獲取模板的精簡包（優先讀取緩存，緩存不可寫時只在內存中使用）
+
+    Args:
+        pptx_path: 模板 PPTX 路徑（決定緩存目錄）
+        pptx_bytes: 模板 PPTX 字節
+
+    Returns:
+        精簡後的 PPTX 字節
+    """
+    path = cache_path(pptx_path, hashlib.sha1(pptx_bytes).hexdigest())
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        pass
+
+    stripped = strip_slides(pptx_bytes)
+    logger.info(
+        f"   ✓ 已生成精簡模板包：{len(pptx_bytes) / 1024:.0f} KB → {len(stripped) / 1024:.0f} KB"
+    )
+    try:
+        with atomic_open(path, "wb") as f:
+            f.write(stripped)
+    except OSError as e:
+        logger.warning(f"⚠️  無法緩存精簡模板包：{e}")
+    return stripped
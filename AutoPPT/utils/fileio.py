@@ -0,0 +1,125 @@
+"""
+文件寫入工具
+"""
+import io
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def _read_umask() -> int:
+    """讀取進程的 umask（Linux 直接讀取 /proc，其他平台臨時設置後恢復）"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# 導入時讀取一次：os.umask 會修改進程狀態，不能在並發寫入時調用
+_UMASK = _read_umask()
+
+
+def _target_mode(filename: str) -> int:
+    """目標文件應有的權限：已存在時沿用，否則為 0o666 & ~umask"""
+    try:
+        return stat.S_IMODE(os.stat(filename).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+@contextmanager
+def atomic_open(filename: str, mode: str = "w", encoding: str = None):
+    """
+    原子寫入：先寫入同目錄的臨時文件，成功後再替換目標文件
+
+    寫入過程中出錯或進程被終止時，目標文件保持原樣，不會留下半個文件。
+    替換後的文件權限與直接寫入一致：沿用已有目標文件的權限，新文件按 umask 設置
+    （mkstemp 創建的臨時文件只有所有者可讀寫）。
+
+    Args:
+        filename: 目標文件路徑
+        mode: 寫入模式（"w" 或 "wb"）
+        encoding: 文本模式的編碼
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(filename)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.chmod(tmp_path, _target_mode(filename))
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    跨進程的排他鎖（POSIX 使用 flock，Windows 使用 msvcrt.locking）
+
+    鎖文件在釋放後保留：刪除鎖文件會讓同時等待的進程鎖住不同的文件。
+
+    Args:
+        path: 鎖文件路徑（不存在時創建）
+    """
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def atomic_write_text(filename: str, text: str, encoding: str = "utf-8") -> str:
+    """原子寫入文本文件"""
+    with atomic_open(filename, "w", encoding=encoding) as f:
+        f.write(text)
+    return filename
+
+
+def atomic_write_bytes(filename: str, data: bytes) -> str:
+    """原子寫入二進制文件"""
+    with atomic_open(filename, "wb") as f:
+        f.write(data)
+    return filename
+
+
+def is_stream(target) -> bool:
+    """target 是可寫的流（而不是文件路徑）"""
+    return hasattr(target, "write")
+
+
+def write_text_to(stream, text: str, encoding: str = "utf-8"):
+    """把文本寫入流（文本流直接寫入，二進制流按 encoding 編碼）"""
+    if isinstance(stream, io.TextIOBase):
+        stream.write(text)
+    else:
+        stream.write(text.encode(encoding))
@@ -0,0 +1,182 @@
+"""
+圖片信息緩存 - 記錄圖片的尺寸、格式、文件大小和內容哈希
+
+圖片進入 image_metadata 時記錄一次，排版計算直接使用，不再為了讀取尺寸而打開圖片。
+每個圖片目錄有一個 sidecar 文件（.image_info.json），以文件名 + 修改時間 + 大小校驗，
+重新渲染或換一個進程時也不需要重新讀取圖片。
+
+每個進程對每個目錄只讀取一次 sidecar，新記錄先保存在內存中，一批圖片處理完後由
+flush_image_info() 一次寫入（進程退出時也會寫入）。寫入時持有文件鎖
+（.image_info.json.lock），重新讀取後合併，並行的渲染進程不會丟失彼此的記錄。
+"""
+
+import atexit
+import hashlib
+import io
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from AutoPPT.utils.fileio import atomic_write_text, file_lock
+
+SIDECAR_FILENAME = ".image_info.json"
+SIDECAR_LOCK_FILENAME = ".image_info.json.lock"
+
+# 記錄到 image_metadata 的字段
+IMAGE_INFO_KEYS = ("width", "height", "format", "bytes", "sha1")
+
+# (絕對路徑, 修改時間, 大小) → 圖片信息
+_memory: Dict[tuple, Dict] = {}
+# 目錄 → 已加載的 sidecar
+_sidecars: Dict[str, "ImageInfoSidecar"] = {}
+_lock = threading.Lock()
+
+
+def _stat_key(path: str) -> tuple:
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def image_info_from_bytes(
+    img_data: bytes, width: int = None, height: int = None, format: str = None
+) -> Dict:
+    """
+    從圖片字節計算圖片信息（已知尺寸時不再解析圖片）
+
+    Returns:
+        {"width", "height", "format", "bytes", "sha1"}
+    """
+    if width is None or height is None or format is None:
+        from PIL import Image
+
+        # 只讀取文件頭，不解碼像素
+        with Image.open(io.BytesIO(img_data)) as img:
+            width, height = img.size
+            format = img.format
+
+    return {
+        "width": width,
+        "height": height,
+        "format": format,
+        "bytes": len(img_data),
+        "sha1": hashlib.sha1(img_data).hexdigest(),
+    }
+
+
+class ImageInfoSidecar:
+    """圖片目錄的 sidecar 緩存（.image_info.json），加載一次，flush 時合併寫入"""
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, SIDECAR_FILENAME)
+        self.lock_path = os.path.join(directory, SIDECAR_LOCK_FILENAME)
+        self.entries = self._load()
+        # 尚未寫入文件的記錄
+        self.pending: Dict[str, Dict] = {}
+
+    @classmethod
+    def for_directory(cls, directory: str) -> "ImageInfoSidecar":
+        """目錄的 sidecar（每個進程只讀取一次）"""
+        with _lock:
+            sidecar = _sidecars.get(directory)
+            if sidecar is None:
+                sidecar = _sidecars[directory] = cls(directory)
+            return sidecar
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def get(self, image_path: str, key: tuple) -> Optional[Dict]:
+        """獲取仍然有效的記錄（文件被修改過則返回 None）"""
+        entry = self.entries.get(os.path.basename(image_path))
+        if entry and entry.get("mtime_ns") == key[1] and entry.get("bytes") == key[2]:
+            return {k: entry[k] for k in IMAGE_INFO_KEYS}
+        return None
+
+    def put(self, image_path: str, key: tuple, info: Dict):
+        """記錄圖片信息（flush 時寫入文件）"""
+        entry = {**info, "mtime_ns": key[1]}
+        with _lock:
+            self.entries[os.path.basename(image_path)] = entry
+            self.pending[os.path.basename(image_path)] = entry
+
+    def flush(self):
+        """在文件鎖內重新讀取 sidecar，合併本進程的新記錄後寫入"""
+        with _lock:
+            if not self.pending:
+                return
+            pending, self.pending = self.pending, {}
+            with file_lock(self.lock_path):
+                entries = self._load()
+                entries.update(pending)
+                atomic_write_text(self.path, json.dumps(entries, ensure_ascii=False, indent=2))
+            self.entries = {**entries, **self.entries}
+
+
+def flush_image_info():
+    """把本進程新記錄的圖片信息寫入各目錄的 sidecar（一批圖片處理完後調用）"""
+    with _lock:
+        sidecars = list(_sidecars.values())
+    for sidecar in sidecars:
+        try:
+            sidecar.flush()
+        except OSError:
+            # 只讀目錄：只保留內存緩存
+            pass
+
+
+atexit.register(flush_image_info)
+
+
+def get_image_info(path: str) -> Dict:
+    """
+    獲取圖片信息（內存緩存 → sidecar → 讀取文件）
+
+    Args:
+        path: 圖片路徑
+
+    Returns:
+        {"width", "height", "format", "bytes", "sha1"}
+    """
+    key = _stat_key(path)
+    info = _memory.get(key)
+    if info is not None:
+        return info
+
+    sidecar = ImageInfoSidecar.for_directory(os.path.dirname(key[0]))
+    info = sidecar.get(path, key)
+    if info is None:
+        with open(path, "rb") as f:
+            info = image_info_from_bytes(f.read())
+        sidecar.put(path, key, info)
+
+    _memory[key] = info
+    return info
+
+
+def try_get_image_info(path: str) -> Dict:
+    """獲取圖片信息，無法讀取時返回空字典（交給後續步驟處理）"""
+    try:
+        return get_image_info(path)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_image_info(path: str, img_data: bytes, **known) -> Dict:
+    """
+    記錄剛保存的圖片信息（下載時已經解析過尺寸，避免之後重複讀取）
+
+    Args:
+        path: 已保存的圖片路徑
+        img_data: 圖片字節
+        **known: 已知的 width / height / format
+    """
+    key = _stat_key(path)
+    info = image_info_from_bytes(img_data, **known)
+    ImageInfoSidecar.for_directory(os.path.dirname(key[0])).put(path, key, info)
+    _memory[key] = info
+    return info
@@ -0,0 +1,171 @@
+"""
+圖片預處理 - 嵌入 PPTX 前按放置尺寸縮小圖片
+
+爬取的圖片和截圖通常遠大於 slide 上的顯示尺寸。按放置框和 DPI 計算目標像素，
+縮小後重新編碼（去掉 EXIF 等元數據），結果按（內容哈希, 目標尺寸, DPI, 質量）緩存，
+同一張圖片在同一尺寸下只處理一次。只縮小、不放大；處理後反而更大時沿用原圖。
+"""
+
+import io
+import math
+import os
+import threading
+from typing import Dict, Optional
+
+from AutoPPT.utils.fileio import atomic_write_bytes
+from AutoPPT.utils.image_info import get_image_info, record_image_info
+from AutoPPT.utils.logger import get_logger
+
+logger = get_logger()
+
+EMU_PER_INCH = 914400
+
+# 緩存目錄（默認位於原圖目錄下，隱藏目錄不影響圖片編號）
+CACHE_DIRNAME = ".optimized"
+
+# EXIF 方向標記（非 1 時圖片需要旋轉，直接沿用原圖）
+_EXIF_ORIENTATION = 0x0112
+
+
+class ImageOptimizer:
+    """圖片預處理器（參數均可 pickle，可傳給 PPTX 工作進程）"""
+
+    def __init__(self, dpi: int = 150, quality: int = 85, cache_dir: str = None):
+        """
+        Args:
+            dpi: 目標分辨率（放置框英寸數 × dpi = 目標像素）
+            quality: JPEG 質量
+            cache_dir: 緩存目錄（默認為原圖目錄下的 .optimized/）
+        """
+        self.dpi = dpi
+        self.quality = quality
+        self.cache_dir = cache_dir
+        self._results: Dict[tuple, str] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"dpi": self.dpi, "quality": self.quality, "cache_dir": self.cache_dir}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def optimize(self, image_path: str, width: int, height: int, cover: bool = False) -> str:
+        """
+        獲取適合放置尺寸的圖片
+
+        Args:
+            image_path: 原圖路徑
+            width: 放置寬度（EMU）
+            height: 放置高度（EMU）
+            cover: 圖片需要鋪滿放置框（佔位符會裁剪圖片）時為 True
+
+        Returns:
+            要嵌入的圖片路徑（無需處理時返回原圖路徑）
+        """
+        return self.optimize_for(image_path, [(width, height, cover)])
+
+    def optimize_for(self, image_path: str, boxes) -> str:
+        """
+        為同一張圖片的多個放置框準備一個共用版本（按要求最高的放置框縮小）
+
+        Args:
+            image_path: 原圖路徑
+            boxes: [(寬度 EMU, 高度 EMU, cover), ...]
+
+        Returns:
+            要嵌入的圖片路徑（任一放置框需要原始分辨率時返回原圖路徑）
+        """
+        try:
+            info = get_image_info(image_path)
+            targets = [self._target_size(info, *box) for box in boxes]
+            if not targets or None in targets:
+                return image_path
+            # 所有目標尺寸都是原圖等比例縮小，取最大的一個
+            target = max(targets)
+
+            key = (info["sha1"], target, self.dpi, self.quality)
+            result = self._results.get(key)
+            if result is None or not os.path.exists(result):
+                with self._lock:
+                    result = self._optimize(image_path, info, target)
+                    self._results[key] = result
+            return result
+
+        except Exception as e:
+            logger.warning(f"⚠️  圖片預處理失敗，使用原圖：{e}")
+            return image_path
+
+    def _target_size(self, info: Dict, width: int, height: int, cover: bool) -> Optional[tuple]:
+        """目標像素尺寸（不需要縮小時返回 None）"""
+        box_width = width / EMU_PER_INCH * self.dpi
+        box_height = height / EMU_PER_INCH * self.dpi
+        scales = (box_width / info["width"], box_height / info["height"])
+        scale = max(scales) if cover else min(scales)
+        if scale >= 1:
+            return None
+        return (
+            max(1, math.ceil(info["width"] * scale)),
+            max(1, math.ceil(info["height"] * scale)),
+        )
+
+    def _cache_path(self, image_path: str, info: Dict, target: tuple, ext: str) -> str:
+        cache_dir = self.cache_dir or os.path.join(
+            os.path.dirname(os.path.abspath(image_path)), CACHE_DIRNAME
+        )
+        return os.path.join(
+            cache_dir,
+            f"{info['sha1'][:16]}_{target[0]}x{target[1]}_{self.dpi}dpi_q{self.quality}{ext}",
+        )
+
+    def _optimize(self, image_path: str, info: Dict, target: tuple) -> str:
+        from PIL import Image
+
+        # 有透明通道的保留 PNG，其他轉為 JPEG
+        keep_png = info.get("format") in ("PNG", "GIF", "WEBP")
+        ext = ".png" if keep_png else ".jpg"
+        cache_path = self._cache_path(image_path, info, target, ext)
+        if os.path.exists(cache_path):
+            return cache_path
+
+        with Image.open(image_path) as img:
+            if img.getexif().get(_EXIF_ORIENTATION, 1) != 1:
+                # 需要旋轉的圖片，縮小後方向信息會丟失
+                return image_path
+
+            if keep_png and img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+            else:
+                keep_png = False
+                cache_path = self._cache_path(image_path, info, target, ".jpg")
+                if os.path.exists(cache_path):
+                    return cache_path
+                # JPEG 解碼時直接按比例縮小，省去大部分解碼開銷
+                img.draft("RGB", target)
+                img = img.convert("RGB")
+
+            resized = img.resize(target, Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        if keep_png:
+            resized.save(buffer, format="PNG", optimize=True)
+        else:
+            resized.save(buffer, format="JPEG", quality=self.quality, optimize=True)
+        data = buffer.getvalue()
+
+        if len(data) >= info["bytes"]:
+            return image_path
+
+        atomic_write_bytes(cache_path, data)
+        record_image_info(
+            cache_path,
+            data,
+            width=target[0],
+            height=target[1],
+            format="PNG" if keep_png else "JPEG",
+        )
+        logger.info(
+            f"   🗜️  圖片預處理：{os.path.basename(image_path)} "
+            f"{info['width']}x{info['height']} → {target[0]}x{target[1]}，"
+            f"{info['bytes'] // 1024}KB → {len(data) // 1024}KB"
+        )
+        return cache_path
@@ -7,11 +7,13 @@ import os
 import sys
 import time
 import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from functools import wraps
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional
 
 
 # ANSI 颜色代码
@@ -95,12 +97,152 @@ class ColoredFormatter(logging.Formatter):
         return formatted
 
 
+def format_seconds(elapsed: float) -> str:
+    """格式化耗时（ms / s / m s）"""
+    if elapsed < 1:
+        return f"{elapsed*1000:.2f}ms"
+    if elapsed < 60:
+        return f"{elapsed:.2f}s"
+    minutes = int(elapsed // 60)
+    seconds = elapsed % 60
+    return f"{minutes}m {seconds:.2f}s"
+
+
+def format_bytes(size: int) -> str:
+    """格式化字节数（可为负数）"""
+    sign = "-" if size < 0 else ""
+    size = abs(size)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{sign}{size:.0f}{unit}" if unit == "B" else f"{sign}{size:.1f}{unit}"
+        size /= 1024
+    return f"{sign}{size:.2f}GB"
+
+
+_process = None
+
+
+def current_rss() -> int:
+    """当前进程的 RSS（字节，psutil 未安装时为 0）"""
+    global _process
+    try:
+        if _process is None:
+            import psutil
+            _process = psutil.Process(os.getpid())
+        return _process.memory_info().rss
+    except ImportError:
+        return 0
+
+
+# 当前所在的区段（每个线程 / asyncio 任务各自独立，见 PerformanceLogger.span）
+_current_span: ContextVar[Optional["Span"]] = ContextVar("autoppt_span", default=None)
+
+
+class Span:
+    """计时区段：耗时、RSS 变化、输入/输出字节与计数，可嵌套"""
+
+    def __init__(self, name: str, label: str = "", parent: Optional["Span"] = None):
+        self.name = name
+        self.label = label
+        self.parent = parent
+        self.children: List["Span"] = []
+        self.seconds = 0.0
+        self.rss_delta = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.counts: Dict[str, int] = {}
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+        self._rss = current_rss()
+
+    @property
+    def path(self) -> str:
+        """从根区段开始的路径（job/scrape/url/navigate）"""
+        return f"{self.parent.path}/{self.name}" if self.parent else self.name
+
+    def add(self, bytes_in: int = 0, bytes_out: int = 0, **counts: int):
+        """累加输入/输出字节与计数"""
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def finish(self):
+        """结束计时并记录 RSS 变化"""
+        self.seconds = time.perf_counter() - self._start
+        self.rss_delta = current_rss() - self._rss
+
+    def walk(self) -> Iterator["Span"]:
+        """深度优先遍历（包括自己）"""
+        yield self
+        for child in list(self.children):
+            yield from child.walk()
+
+    def to_dict(self) -> Dict:
+        """完整的区段树（可序列化为 JSON）"""
+        return {
+            "name": self.name,
+            "label": self.label,
+            "seconds": round(self.seconds, 4),
+            "rss_delta": self.rss_delta,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "counts": dict(self.counts),
+            "error": self.error,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+    def summary(self) -> List[Dict]:
+        """
+        按路径汇总区段（同一路径的多次调用合并，例如每个 URL 的 navigate）
+
+        Returns:
+            按首次出现顺序排列的 [{stage, depth, calls, seconds, max_seconds, slowest,
+            rss_delta, bytes_in, bytes_out, counts, errors}]
+        """
+        rows: Dict[str, Dict] = {}
+        root_depth = self.path.count("/")
+        for span in self.walk():
+            row = rows.get(span.path)
+            if row is None:
+                row = rows[span.path] = {
+                    "stage": span.path,
+                    "depth": span.path.count("/") - root_depth,
+                    "calls": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "slowest": "",
+                    "rss_delta": 0,
+                    "bytes_in": 0,
+                    "bytes_out": 0,
+                    "counts": {},
+                    "errors": 0,
+                }
+            row["calls"] += 1
+            row["seconds"] += span.seconds
+            if span.seconds >= row["max_seconds"]:
+                row["max_seconds"] = span.seconds
+                row["slowest"] = span.label
+            row["rss_delta"] += span.rss_delta
+            row["bytes_in"] += span.bytes_in
+            row["bytes_out"] += span.bytes_out
+            for key, value in span.counts.items():
+                row["counts"][key] = row["counts"].get(key, 0) + value
+            row["errors"] += 1 if span.error else 0
+        for row in rows.values():
+            row["seconds"] = round(row["seconds"], 4)
+            row["max_seconds"] = round(row["max_seconds"], 4)
+        return list(rows.values())
+
+
 class PerformanceLogger:
     """性能监控日志器"""
     
     def __init__(self, logger: logging.Logger):
         self.logger = logger
         self._timers = {}
+        # 最近一个结束的任务（见 job）
+        self.last_job: Optional[Span] = None
     
     def start_timer(self, name: str):
         """开始计时"""
@@ -116,18 +258,8 @@ class PerformanceLogger:
         elapsed = time.time() - self._timers[name]
         del self._timers[name]
         
-        # 格式化时间
-        if elapsed < 1:
-            time_str = f"{elapsed*1000:.2f}ms"
-        elif elapsed < 60:
-            time_str = f"{elapsed:.2f}s"
-        else:
-            minutes = int(elapsed // 60)
-            seconds = elapsed % 60
-            time_str = f"{minutes}m {seconds:.2f}s"
-        
         log_func = getattr(self.logger, log_level.lower())
-        log_func(f"⏱️  {name}: {time_str}")
+        log_func(f"⏱️  {name}: {format_seconds(elapsed)}")
         
         return elapsed
     
@@ -142,6 +274,84 @@ class PerformanceLogger:
         except ImportError:
             self.logger.debug("psutil 未安装，无法记录内存使用")
 
+    @contextmanager
+    def span(self, name: str, label: str = "", **counts: int) -> Iterator[Span]:
+        """
+        计时区段（上下文管理器），嵌套在当前区段之下
+
+        当前区段保存在 contextvars 中：asyncio 任务与 asyncio.to_thread 会继承创建时的区段，
+        并行爬取的每个 URL 各自嵌套在自己的区段下。RSS 是整个进程的，并行区段的 RSS 变化会互相包含。
+
+        Args:
+            name: 阶段名（同一路径的区段在汇总中合并）
+            label: 说明（例如 URL、文件名，汇总中显示最慢一次的说明）
+            **counts: 初始计数
+
+        Yields:
+            Span（可用 span.add(bytes_in=..., bytes_out=..., 计数=...) 记录数据量）
+        """
+        parent = _current_span.get()
+        span = Span(name, label, parent)
+        span.add(**counts)
+        if parent is not None:
+            parent.children.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            self.logger.debug(f"⏱️  {span.path}: {format_seconds(span.seconds)}")
+
+    def record(self, name: str, seconds: float, label: str = "", **counts: int) -> Span:
+        """在当前区段下记录一个已经结束的阶段（耗时由调用方测量）"""
+        parent = _current_span.get()
+        span = Span(name, label, parent)
+        span.add(**counts)
+        span.seconds = seconds
+        if parent is not None:
+            parent.children.append(span)
+        return span
+
+    @contextmanager
+    def job(self, name: str, label: str = "") -> Iterator[Span]:
+        """任务级区段：结束时（包括失败）输出各阶段的耗时汇总（见 log_summary）"""
+        span = None
+        try:
+            with self.span(name, label) as span:
+                yield span
+        finally:
+            if span is not None:
+                self.last_job = span
+                self.log_summary(span)
+
+    def log_summary(self, span: Span, log_level: str = 'INFO'):
+        """输出区段树的耗时汇总（同一路径合并，显示调用次数与最慢一次）"""
+        log_func = getattr(self.logger, log_level.lower())
+        total = span.seconds or 1e-9
+        title = f"{span.name} {span.label}".strip()
+        log_func(f"📊 耗时汇总：{title}（{format_seconds(span.seconds)}）")
+        log_func(
+            # 中文标题每个字占两格，宽度比数据列少对应的字数
+            f"   {'阶段':<28} {'次数':>2} {'耗时':>8} {'占比':>4} {'最慢':>8} "
+            f"{'RSS Δ':>9} {'输入':>7} {'输出':>7}  计数"
+        )
+        for row in span.summary():
+            stage = "  " * row["depth"] + row["stage"].rsplit("/", 1)[-1]
+            counts = ", ".join(f"{k}={v}" for k, v in row["counts"].items())
+            if row["errors"]:
+                counts = f"{counts}, ❌{row['errors']}" if counts else f"❌{row['errors']}"
+            slowest = f"  ← {row['slowest']}" if row["calls"] > 1 and row["slowest"] else ""
+            log_func(
+                f"   {stage:<30} {row['calls']:>4} {format_seconds(row['seconds']):>10} "
+                f"{row['seconds'] / total * 100:>5.1f}% {format_seconds(row['max_seconds']):>10} "
+                f"{format_bytes(row['rss_delta']):>9} {format_bytes(row['bytes_in']):>9} "
+                f"{format_bytes(row['bytes_out']):>9}  {counts}{slowest}"
+            )
+
 
 class AppLogger:
     """应用日志管理器"""
@@ -0,0 +1,14 @@
+"""
+AutoPPT 基準測試
+
+從倉庫根目錄運行：
+    python -m benchmarks.render_bench            # PPTX / HTML 渲染
+    python -m benchmarks.render_bench --quick    # 只運行 10、100 張
+    python -m benchmarks.render_bench --update-baseline
+    python -m benchmarks.scraper_bench           # Playwright 爬蟲分階段耗時（本地離線站點）
+    python -m benchmarks.extractor_bench         # 文字提取吞吐量（合成語料）
+    python -m benchmarks.extractor_bench --against HEAD   # 改動前後對比
+
+每個用例在獨立進程中執行，結果與 baselines/ 中的基準比較，
+超過回歸閾值時退出碼為 1。基準與運行環境相關，換機器後先更新基準。
+"""
@@ -0,0 +1,349 @@
+"""
+基準測試的共用工具：獨立進程執行、峰值內存、合成圖片、基準文件與回歸判斷、結果表格
+
+每個用例在新的子進程中執行（python -m <模塊> --case <JSON>），峰值 RSS
+只包含該用例本身，用例之間的緩存（模板、縮略圖、導入）也不會互相影響。
+子進程把結果作為最後一行 JSON 輸出到 stdout。用例可以運行多次（--runs），
+每個指標取中位數，單次運行的抖動不會被判斷為回歸。
+"""
+
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(REPO_ROOT, "benchmarks", "baselines")
+CACHE_DIR = os.path.join(REPO_ROOT, "benchmarks", ".cache")
+
+# 默認回歸閾值：比基準慢（或大）超過 25% 視為回歸
+DEFAULT_THRESHOLD = 0.25
+
+# 合成圖片：數量與尺寸（不同尺寸覆蓋縮略圖與預處理的不同分支）
+IMAGE_COUNT = 24
+IMAGE_SIZES = ((2400, 1600), (1600, 1200), (1200, 1800), (800, 600))
+IMAGE_DIR = os.path.join(CACHE_DIR, "images")
+
+
+def quiet_logger():
+    """在用例進程中先創建不輸出的全局日誌器（渲染日誌不計入耗時，也不污染 stdout）"""
+    from AutoPPT.utils.logger import get_logger
+
+    return get_logger(level=logging.WARNING, console_output=False, file_output=False)
+
+
+def peak_rss() -> int:
+    """
+    當前進程的峰值 RSS（字節）
+
+    Linux 讀取 /proc/self/status 的 VmHWM（只屬於當前進程的地址空間）。ru_maxrss 在
+    fork + exec 後保留父進程的峰值，父進程內存較大時每個用例都會報告父進程的值。
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        import psutil
+
+        info = psutil.Process(os.getpid()).memory_info()
+        return getattr(info, "peak_wset", info.rss)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 單位為 KB，macOS 為字節
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def machine_info() -> Dict:
+    """記錄在結果與基準中的環境信息（不同機器的基準不可直接比較）"""
+    import pptx
+
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "python_pptx": pptx.__version__,
+    }
+
+
+def run_case(module: str, case: Dict, timeout: float = None) -> Dict:
+    """
+    在新的子進程中執行一個用例
+
+    Args:
+        module: 基準模塊（實現 --case 參數）
+        case: 用例參數（JSON 可序列化）
+        timeout: 超時秒數
+
+    Returns:
+        用例結果；子進程失敗時為 {"error": ...}
+    """
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-m", module, "--case", json.dumps(case, ensure_ascii=False)],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {"error": f"超時（{timeout}s）"}
+
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        stderr = proc.stderr.strip().splitlines()
+        # 取異常那一行（部分庫在異常後還會輸出多行說明）
+        errors = [line for line in stderr if line[:1].isalpha() and ("Error" in line or "Exception" in line)]
+        return {"error": (errors or stderr or [f"退出碼 {proc.returncode}"])[-1]}
+    return json.loads(lines[-1])
+
+
+def median_result(results: List[Dict]) -> Dict:
+    """多次運行的結果：數值指標取中位數，其他字段沿用第一次"""
+    merged = dict(results[0])
+    for key, value in merged.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            median = statistics.median(result[key] for result in results)
+            merged[key] = round(median, 5) if isinstance(median, float) else median
+    return merged
+
+
+def run_case_median(module: str, case: Dict, runs: int = 1, timeout: float = None) -> Dict:
+    """
+    在 runs 個新的子進程中分別執行用例，返回各指標的中位數
+
+    任一次失敗（或用例被跳過）時直接返回該次結果。
+    """
+    results = []
+    for _ in range(max(1, runs)):
+        result = run_case(module, case, timeout=timeout)
+        if "error" in result or "skipped" in result:
+            return result
+        results.append(result)
+    return median_result(results)
+
+
+def print_case_result(result: Dict):
+    """用例進程輸出結果（最後一行）"""
+    print(json.dumps(result, ensure_ascii=False))
+
+
+# ---------- 合成數據 ----------
+def prepare_synthetic_images():
+    """
+    在單獨的子進程中生成合成圖片
+
+    生成圖片需要數百 MB 內存。在主進程中生成時，這個峰值會保留在主進程中，
+    用例子進程的 ru_maxrss 也會繼承它（fork + exec 後不重置）。
+    """
+    subprocess.run(
+        [sys.executable, "-c", "from benchmarks.common import synthetic_images; synthetic_images()"],
+        cwd=REPO_ROOT,
+        check=True,
+    )
+
+
+def synthetic_images(count: int = IMAGE_COUNT, image_dir: str = IMAGE_DIR) -> Dict:
+    """生成（或讀取已生成的）合成圖片，返回 image_metadata"""
+    import numpy as np
+    from PIL import Image
+
+    os.makedirs(image_dir, exist_ok=True)
+    metadata = {}
+    for index in range(count):
+        width, height = IMAGE_SIZES[index % len(IMAGE_SIZES)]
+        ext = "png" if index % 6 == 5 else "jpg"
+        filename = f"bench_{index:02d}_{width}x{height}.{ext}"
+        path = os.path.join(image_dir, filename)
+        if not os.path.exists(path):
+            rng = np.random.default_rng(index)
+            # 漸變 + 低頻色塊 + 噪聲，壓縮率接近照片
+            y, x = np.mgrid[0:height, 0:width]
+            base = np.stack([x * 255 / width, y * 255 / height, (x + y) * 127 / (width + height)], -1)
+            blocks = rng.integers(0, 96, (height // 64 + 1, width // 64 + 1, 3))
+            blocks = np.repeat(np.repeat(blocks, 64, 0), 64, 1)[:height, :width]
+            noise = rng.normal(0, 12, (height, width, 3))
+            pixels = np.clip(base + blocks + noise, 0, 255).astype("uint8")
+            tmp_path = f"{path}.tmp"
+            Image.fromarray(pixels).save(tmp_path, format="PNG" if ext == "png" else "JPEG", quality=90)
+            os.replace(tmp_path, path)
+        metadata[f"img_{index + 1:02d}"] = {
+            "filename": filename,
+            "path": path,
+            "description": f"合成圖片 {index + 1}",
+        }
+    return metadata
+
+
+# ---------- 基準 ----------
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def load_baseline(path: str) -> Optional[Dict]:
+    """讀取基準文件（不存在時返回 None）"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_results(path: str, results: Dict[str, Dict]):
+    """保存結果（也用作基準文件）"""
+    from AutoPPT.utils.fileio import atomic_write_text
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    record = {"machine": machine_info(), "results": results}
+    atomic_write_text(path, json.dumps(record, ensure_ascii=False, indent=2, sort_keys=True) + "\n")
+
+
+def metric_gate(tolerance: Union[float, Tuple[float, float]], threshold: float) -> Tuple[float, float]:
+    """指標實際使用的 (絕對容差, 相對閾值)：相對閾值取 threshold 與指標自己的最低閾值中較大的一個"""
+    tolerance, limit = tolerance if isinstance(tolerance, tuple) else (tolerance, threshold)
+    return tolerance, max(limit, threshold)
+
+
+def describe_gates(metrics: Dict[str, Union[float, Tuple[float, float]]], threshold: float) -> str:
+    """每個指標實際使用的相對閾值（例如 "seconds +50%、peak_rss +25%"）"""
+    return "、".join(
+        f"{metric} +{metric_gate(tolerance, threshold)[1] * 100:.0f}%"
+        for metric, tolerance in metrics.items()
+    )
+
+
+def compare(
+    results: Dict[str, Dict],
+    baseline: Optional[Dict],
+    metrics: Dict[str, Union[float, Tuple[float, float]]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """
+    與基準比較，返回回歸描述
+
+    Args:
+        results: {用例 ID: 指標}
+        baseline: 基準文件內容
+        metrics: 參與比較的指標 → 絕對容差（低於容差的變化視為噪聲），
+                 或 (絕對容差, 最低相對閾值)：波動大的指標（耗時）使用更寬的相對閾值
+        threshold: 相對閾值（0.25 表示超過基準 25%）
+    """
+    if not baseline:
+        return []
+    base_results = baseline.get("results", {})
+    regressions = []
+    for case_id, result in results.items():
+        base = base_results.get(case_id)
+        if not base or "error" in result or "error" in base:
+            continue
+        for metric, tolerance in metrics.items():
+            tolerance, limit = metric_gate(tolerance, threshold)
+            new, old = result.get(metric), base.get(metric)
+            if new is None or old is None:
+                continue
+            if new > old * (1 + limit) and new - old > tolerance:
+                regressions.append(
+                    f"{case_id} {metric}: {old:g} → {new:g}（+{(new / old - 1) * 100:.0f}%）"
+                    if old else f"{case_id} {metric}: {old:g} → {new:g}"
+                )
+    return regressions
+
+
+def ratio(result: Dict, base: Optional[Dict], metric: str) -> str:
+    """相對基準的變化（表格用）"""
+    if not base or not base.get(metric) or metric not in result:
+        return ""
+    return f"{(result[metric] / base[metric] - 1) * 100:+.0f}%"
+
+
+def _display_width(text: str) -> int:
+    """終端顯示寬度（中文等全角字符佔兩格）"""
+    return sum(2 if unicodedata.east_asian_width(char) in "WF" else 1 for char in text)
+
+
+def _pad(text: str, width: int) -> str:
+    return text + " " * (width - _display_width(text))
+
+
+def print_table(headers: Sequence[str], rows: Iterable[Sequence]):
+    """輸出對齊的文本表格"""
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [
+        max([_display_width(h)] + [_display_width(row[i]) for row in rows])
+        for i, h in enumerate(headers)
+    ]
+    print("  ".join(_pad(h, w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(_pad(cell, w) for cell, w in zip(row, widths)))
+
+
+def finish(
+    name: str,
+    results: Dict[str, Dict],
+    metrics: Dict[str, Union[float, Tuple[float, float]]],
+    baseline_file: str = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    update_baseline: bool = False,
+    output: str = None,
+) -> int:
+    """
+    保存結果、更新或比較基準，返回退出碼（有回歸或失敗的用例時為 1）
+
+    Args:
+        name: 基準名稱（默認基準文件 baselines/<name>.json）
+        results: {用例 ID: 指標}
+        metrics: 參與回歸判斷的指標 → 絕對容差或 (絕對容差, 最低相對閾值)，見 compare
+        baseline_file: 基準文件路徑（可選）
+        threshold: 回歸閾值
+        update_baseline: 把本次結果寫入基準（覆蓋同名用例，失敗的用例不寫入）
+        output: 結果文件路徑（可選）
+    """
+    path = baseline_file or baseline_path(name)
+    if output:
+        save_results(output, results)
+        print(f"✓ 結果已保存：{output}")
+
+    failed = [case_id for case_id, result in results.items() if "error" in result]
+    for case_id in failed:
+        print(f"❌ {case_id}: {results[case_id]['error']}")
+
+    if update_baseline:
+        # 只運行了部分用例時保留其他用例的基準（換了環境則整體替換）
+        previous = load_baseline(path) or {}
+        merged = {}
+        if previous.get("machine", {}).get("platform") == machine_info()["platform"]:
+            merged.update(previous.get("results", {}))
+        merged.update({case_id: result for case_id, result in results.items() if case_id not in failed})
+        if not merged:
+            print(f"❌ 沒有成功的用例，基準未更新：{path}")
+            return 1
+        save_results(path, merged)
+        print(f"✓ 基準已更新：{path}")
+        return 1 if failed else 0
+
+    baseline = load_baseline(path)
+    if baseline is None:
+        print(f"⚠️  沒有基準文件：{path}（使用 --update-baseline 生成）")
+        return 1 if failed else 0
+    if baseline.get("machine", {}).get("platform") != machine_info()["platform"]:
+        print("⚠️  基準在不同的環境中生成，比較結果僅供參考")
+
+    regressions = compare(results, baseline, metrics, threshold)
+    for regression in regressions:
+        print(f"🐢 回歸：{regression}")
+    if not regressions:
+        print(f"✓ 沒有回歸（回歸條件：超過基準 {describe_gates(metrics, threshold)}，且變化大於各指標的絕對容差）")
+    return 1 if regressions or failed else 0
@@ -0,0 +1,248 @@
+"""
+文字提取基準 - HTMLTextExtractor.extract_texts 在合成頁面上的吞吐量與內存
+
+語料在 benchmarks/extractor_corpus（gzip 壓縮的 HTML）。頁面是生成的，不是真實網站的存檔：
+按部落格、電商、SPA 頁面的常見結構（標籤嵌套、class、內嵌腳本與樣式、隱藏元素）
+合成，文字是隨機拼接的詞語，資源路徑與哈希也是虛構的：
+
+- blog：小型部落格文章（約 28 KB，側邊欄、留言）
+- ecommerce：大型電商搜索結果頁（約 1.9 MB，數百個商品卡片、內嵌 JSON 狀態、大量樣式）
+- spa：深層嵌套的前端渲染儀表板（約 650 KB，25–70 層嵌套、SVG、__NEXT_DATA__）
+
+只測量文字提取（純 CPU），不包括圖片下載。報告每秒文字數、每秒字節數、
+峰值 RSS 與提取過程的峰值分配（tracemalloc）。耗時取進程內 repeat 次提取的中位數，
+每個用例運行 runs 個進程（默認 5）後再取中位數。
+
+修改提取邏輯時用 --against 比較改動前後（默認比較 HEAD 與工作區）：
+    python -m benchmarks.extractor_bench --against HEAD
+
+用法：
+    python -m benchmarks.extractor_bench
+    python -m benchmarks.extractor_bench --docs ecommerce --repeat 10 --runs 5
+    python -m benchmarks.extractor_bench --update-baseline
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Sequence
+
+from benchmarks.common import (
+    DEFAULT_THRESHOLD,
+    REPO_ROOT,
+    baseline_path,
+    finish,
+    load_baseline,
+    peak_rss,
+    print_case_result,
+    print_table,
+    quiet_logger,
+    ratio,
+    run_case_median,
+)
+
+CORPUS_DIR = os.path.join(REPO_ROOT, "benchmarks", "extractor_corpus")
+DOCS = ("blog", "ecommerce", "spa")
+
+# 回歸判斷的指標 → 絕對容差（秒 / 字節），耗時另有最低相對閾值
+# 同一台機器、同一份代碼重複運行（取中位數後）：ecommerce 相差約 30%，blog 相差約 10 ms；
+# 峰值分配與 RSS 是穩定的
+METRICS = {
+    "seconds": (0.05, 0.5),
+    "peak_alloc": 1024 * 1024,
+    "peak_rss": 16 * 1024 * 1024,
+}
+
+
+def load_document(name: str) -> str:
+    """讀取語料中的一個頁面"""
+    with gzip.open(os.path.join(CORPUS_DIR, f"{name}.html.gz"), "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+# ---------- 用例（子進程） ----------
+def run_single(case: Dict) -> Dict:
+    """
+    執行一個用例：先計時提取 repeat 次（取中位數），再在 tracemalloc 下提取一次測量峰值分配
+
+    case["source"] 指定時從該目錄導入 AutoPPT（--against 導出的舊版本）。
+
+    Returns:
+        seconds、texts_per_second、bytes_per_second、peak_alloc、peak_rss、texts、bytes
+    """
+    if case.get("source"):
+        sys.path.insert(0, case["source"])
+    quiet_logger()
+    from AutoPPT.scrapy.playwright import HTMLTextExtractor
+
+    html_content = load_document(case["doc"])
+    size = len(html_content.encode("utf-8"))
+    extractor = HTMLTextExtractor()
+    extract_texts = getattr(extractor, "extract_texts", None)
+    if extract_texts is None:
+        # 舊版本沒有單獨的文字提取：不傳圖片 URL，extract_content 不會下載圖片
+        def extract_texts(html):
+            return extractor.extract_content(html, "", tempfile.gettempdir(), [])["texts"]
+
+    times = []
+    texts = []
+    for _ in range(case.get("repeat", 1)):
+        start = time.perf_counter()
+        texts = extract_texts(html_content)
+        times.append(time.perf_counter() - start)
+    seconds = statistics.median(times)
+
+    tracemalloc.start()
+    extract_texts(html_content)
+    _, peak_alloc = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": round(seconds, 5),
+        "texts_per_second": round(len(texts) / seconds),
+        "bytes_per_second": round(size / seconds),
+        "peak_alloc": peak_alloc,
+        "peak_rss": peak_rss(),
+        "texts": len(texts),
+        "bytes": size,
+    }
+
+
+# ---------- 改動前的版本 ----------
+def export_revision(ref: str) -> str:
+    """把指定版本的 AutoPPT 導出到臨時目錄（git archive），返回目錄路徑"""
+    target = tempfile.mkdtemp(prefix="autoppt_extractor_bench_")
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", ref, "AutoPPT"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        check=True,
+    )
+    subprocess.run(["tar", "-x", "-C", target], input=archive.stdout, check=True)
+    return target
+
+
+# ---------- 命令行 ----------
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _mb(value: float) -> str:
+    return f"{value / 1024 / 1024:.1f} MB"
+
+
+def _row(label: str, version: str, result: Dict, base: Dict = None) -> List[str]:
+    return [
+        label,
+        version,
+        f"{result['seconds'] * 1000:.1f} ms",
+        ratio(result, base, "seconds"),
+        f"{result['texts_per_second']:,}",
+        f"{result['bytes_per_second'] / 1024 / 1024:.2f} MB/s",
+        _mb(result["peak_alloc"]),
+        _mb(result["peak_rss"]),
+        str(result["texts"]),
+    ]
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.extractor_bench",
+        description="HTMLTextExtractor 文字提取基準（合成語料，每個用例獨立進程）",
+    )
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--docs", default=",".join(DOCS), help="語料頁面（默認：blog,ecommerce,spa）")
+    parser.add_argument("--repeat", type=int, default=5, help="每個進程的提取次數，取中位數（默認：5）")
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="每個用例運行的進程數，各指標取中位數（默認：5）",
+    )
+    parser.add_argument(
+        "--against",
+        metavar="REF",
+        help="同時運行指定 git 版本的提取器並輸出改動前後的對比（例如 HEAD、main）",
+    )
+    parser.add_argument("--timeout", type=float, default=600, help="單個用例超時秒數")
+    parser.add_argument("--baseline", help="基準文件（默認：benchmarks/baselines/extractor.json）")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=(
+            f"回歸閾值（默認：{DEFAULT_THRESHOLD}，即超過基準 25%%）；"
+            "耗時指標使用 METRICS 中更寬的最低閾值（50%%），實際閾值在結果末尾列出"
+        ),
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="把本次結果寫為基準")
+    parser.add_argument("--output", help="結果 JSON 文件（可選）")
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print_case_result(run_single(json.loads(args.case)))
+        return 0
+
+    docs = _split(args.docs)
+    unknown = [doc for doc in docs if doc not in DOCS]
+    if unknown:
+        parser.error(f"未知的語料頁面：{', '.join(unknown)}（可選：{', '.join(DOCS)}）")
+
+    source = export_revision(args.against) if args.against else None
+    try:
+        baseline = load_baseline(args.baseline or baseline_path("extractor")) or {}
+        base_results = baseline.get("results", {})
+        results = {}
+        rows = []
+        speedups = []
+        for doc in docs:
+            case = {"doc": doc, "repeat": args.repeat}
+            print(f"⏱️  {doc} ...", end=" ", flush=True, file=sys.stderr)
+            before = (
+                run_case_median("benchmarks.extractor_bench", {**case, "source": source}, args.runs, args.timeout)
+                if source
+                else None
+            )
+            result = run_case_median("benchmarks.extractor_bench", case, args.runs, timeout=args.timeout)
+            results[doc] = result
+            if "error" in result or (before and "error" in before):
+                print(f"失敗（{(before or {}).get('error') or result.get('error')}）", file=sys.stderr)
+                continue
+            print(f"{result['seconds'] * 1000:.1f} ms", file=sys.stderr)
+            if before:
+                rows.append(_row(doc, args.against, before))
+                rows.append(_row(doc, "工作區", result, before))
+                speedups.append(f"{doc}: {before['seconds'] / result['seconds']:.2f}×")
+            else:
+                rows.append(_row(doc, "工作區", result, base_results.get(doc)))
+    finally:
+        if source:
+            shutil.rmtree(source, ignore_errors=True)
+
+    print_table(
+        ["頁面", "版本", "耗時", "±" + ("改動前" if source else "基準"), "文字/秒", "字節/秒", "峰值分配", "峰值 RSS", "文字數"],
+        rows,
+    )
+    if speedups:
+        print(f"📊 相對 {args.against} 的加速：{'，'.join(speedups)}")
+    return finish(
+        "extractor",
+        results,
+        METRICS,
+        baseline_file=args.baseline,
+        threshold=args.threshold,
+        update_baseline=args.update_baseline,
+        output=args.output,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
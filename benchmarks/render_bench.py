@@ -0,0 +1,326 @@
+"""
+渲染基準 - PPTXGenerator 與 HTMLGenerator 在合成簡報上的耗時、峰值內存與輸出大小
+
+用例 = 模板 × 簡報內容 × slides 數量 × 渲染器：
+
+- 模板：templates/ 中的每個 JSON 模板（或 --templates 指定）
+- 內容：text（只有文字）、bullets（要點多）、images（每張都有圖片）
+- 數量：10、100、1000 張
+- 渲染器：pptx（流式寫入，默認圖片預處理）、html（資源目錄 + 縮略圖）
+
+簡報按模板中每個類型的 json_schema 合成，與 AI 返回的 JSON 格式相同；
+圖片是固定種子生成的合成照片，緩存在 benchmarks/.cache/images。
+
+用法：
+    python -m benchmarks.render_bench
+    python -m benchmarks.render_bench --sizes 10,100 --renderers pptx --repeat 5 --runs 5
+    python -m benchmarks.render_bench --update-baseline
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Sequence
+
+from benchmarks.common import (
+    DEFAULT_THRESHOLD,
+    REPO_ROOT,
+    baseline_path,
+    finish,
+    load_baseline,
+    peak_rss,
+    print_case_result,
+    prepare_synthetic_images,
+    print_table,
+    quiet_logger,
+    ratio,
+    run_case_median,
+    synthetic_images,
+)
+
+KINDS = ("text", "bullets", "images")
+SIZES = (10, 100, 1000)
+RENDERERS = ("pptx", "html")
+
+# 回歸判斷的指標 → 絕對容差（秒 / 字節），耗時另有最低相對閾值
+# 同一台機器、同一份代碼重複運行（3 個進程取中位數）：小用例仍有約 0.1s 的差異，
+# 冷啟動包括導入與模板解析，波動更大；數秒的用例相差可達 20%。內存與輸出大小是穩定的。
+METRICS = {
+    "seconds": (0.15, 0.5),
+    "cold_seconds": (0.3, 0.5),
+    "peak_rss": 16 * 1024 * 1024,
+    "output_bytes": 4096,
+}
+
+_SENTENCE = "第 {i} 張幻燈片的說明：季度營收成長，主要來自新市場與既有客戶的續約。"
+
+
+# ---------- 合成數據 ----------
+def _fill(schema: Dict, i: int, image_ids: List[str], bullets: bool) -> Dict:
+    """按類型的 json_schema 填充一張 slide"""
+    slide = {"slide_type": schema["slide_type"]}
+    for key, sample in schema.items():
+        if key in ("slide_type", "indent_levels"):
+            continue
+        if key == "image_id":
+            slide[key] = image_ids[i % len(image_ids)]
+        elif key == "layout":
+            slide[key] = "vertical" if i % 2 else "horizontal"
+        elif key == "bullets" or isinstance(sample, list):
+            continue
+        elif key in ("title", "section_title", "closing_text"):
+            slide[key] = f"第 {i + 1} 頁：營運重點"
+        else:
+            slide[key] = "\n".join(_SENTENCE.format(i=i + 1) for _ in range(2))
+    if bullets:
+        slide["bullets"] = [f"要點 {n + 1}：{_SENTENCE.format(i=i + 1)}" for n in range(8)]
+        slide["indent_levels"] = [1 if n % 3 == 2 else 0 for n in range(8)]
+    return slide
+
+
+def build_deck(template_json: str, kind: str, size: int, image_metadata: Dict) -> Dict:
+    """
+    按模板合成一份簡報（直接讀取模板 JSON，不預熱模板緩存）
+
+    Args:
+        template_json: 模板 JSON 路徑
+        kind: text / bullets / images
+        size: slides 數量
+        image_metadata: 圖片元數據
+
+    Returns:
+        AI JSON 格式的數據；模板沒有適用的類型時返回 None
+    """
+    with open(template_json, "r", encoding="utf-8") as f:
+        template_data = json.load(f)
+    schemas = [slide_type["json_schema"] for slide_type in template_data.get("slide_types", [])]
+    with_image = [s for s in schemas if "image_id" in s]
+    without_image = [s for s in schemas if "image_id" not in s]
+    if kind == "images":
+        candidates = with_image
+    elif kind == "bullets":
+        candidates = (
+            [s for s in without_image if "bullets" in s]
+            or [s for s in without_image if "content" in s]
+            or without_image
+        )
+    else:
+        candidates = [s for s in without_image if "bullets" not in s] or without_image
+    if not candidates:
+        return None
+
+    image_ids = sorted(image_metadata)
+    return {
+        "title": f"{template_data.get('template_info', {}).get('name', 'bench')} {kind} × {size}",
+        "slides": [
+            _fill(candidates[i % len(candidates)], i, image_ids, kind == "bullets")
+            for i in range(size)
+        ],
+    }
+
+
+# ---------- 用例（子進程） ----------
+def _render(renderer: str, template, data: Dict, image_metadata: Dict, output_dir: str) -> str:
+    from AutoPPT.html_renderer import HTML_ASSET_DIRNAME
+    from AutoPPT.slide_generator import HTMLGenerator, PPTXGenerator
+    from AutoPPT.utils.image_optimizer import ImageOptimizer
+
+    if renderer == "pptx":
+        path = os.path.join(output_dir, "bench.pptx")
+        generator = PPTXGenerator(
+            image_metadata,
+            template=template,
+            image_optimizer=ImageOptimizer(cache_dir=os.path.join(output_dir, ".optimized")),
+        )
+        with open(path, "wb") as f:
+            generator.write_from_data(data, f)
+        return path
+
+    path = os.path.join(output_dir, "bench.html")
+    generator = HTMLGenerator(
+        image_metadata, template, asset_dir=os.path.join(output_dir, HTML_ASSET_DIRNAME)
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        generator.write_to(data, f, record=False)
+    return path
+
+
+def _output_bytes(path: str) -> int:
+    """輸出文件大小（HTML 包括資源目錄中的 CSS / JS 與縮略圖）"""
+    total = os.path.getsize(path)
+    if path.endswith(".html"):
+        for root, _, files in os.walk(os.path.dirname(path)):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files if f != os.path.basename(path))
+    return total
+
+
+def run_single(case: Dict) -> Dict:
+    """
+    執行一個用例（每次重複使用新的輸出目錄：縮略圖、預處理圖片都重新生成）
+
+    Returns:
+        cold_seconds（第一次，包括模板解析與編譯，對應命令行的一次渲染）、
+        seconds（之後最快的一次，模板已在進程內緩存；只重複一次時等於 cold_seconds）、
+        peak_rss、output_bytes、slides
+    """
+    quiet_logger()
+    from AutoPPT.template_engine import PPTXTemplate
+
+    image_metadata = synthetic_images()
+    template_json = os.path.join(REPO_ROOT, case["template"])
+    deck = build_deck(template_json, case["kind"], case["size"], image_metadata)
+    if deck is None:
+        return {"skipped": "模板沒有適用的 slide 類型"}
+
+    times = []
+    output_bytes = 0
+    for _ in range(case.get("repeat", 1)):
+        output_dir = tempfile.mkdtemp(prefix="autoppt_bench_")
+        try:
+            start = time.perf_counter()
+            # 模板在計時內創建：首次包括解析與編譯，之後命中進程內緩存
+            template = PPTXTemplate(json_path=template_json)
+            path = _render(case["renderer"], template, deck, image_metadata, output_dir)
+            times.append(time.perf_counter() - start)
+            output_bytes = _output_bytes(path)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        "seconds": round(min(times[1:] or times), 4),
+        "cold_seconds": round(times[0], 4),
+        "peak_rss": peak_rss(),
+        "output_bytes": output_bytes,
+        "slides": len(deck["slides"]),
+    }
+
+
+# ---------- 命令行 ----------
+def case_id(case: Dict) -> str:
+    template = os.path.splitext(os.path.basename(case["template"]))[0]
+    return f"{template}/{case['kind']}/{case['size']}/{case['renderer']}"
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _mb(value: int) -> str:
+    return f"{value / 1024 / 1024:.1f} MB"
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.render_bench",
+        description="PPTX / HTML 渲染基準（合成簡報，每個用例獨立進程）",
+    )
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--templates",
+        help="模板 JSON 路徑，逗號分隔（默認：templates/*.json）",
+    )
+    parser.add_argument("--kinds", default=",".join(KINDS), help="簡報內容（默認：text,bullets,images）")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="slides 數量（默認：10,100,1000）")
+    parser.add_argument("--renderers", default=",".join(RENDERERS), help="渲染器（默認：pptx,html）")
+    parser.add_argument("--quick", action="store_true", help="只運行 10、100 張")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="每個用例的渲染次數：第一次為冷啟動，其餘取最快一次（默認：3）",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=3,
+        help="每個用例運行的進程數，各指標取中位數（默認：3）",
+    )
+    parser.add_argument("--timeout", type=float, default=1800, help="單個用例超時秒數")
+    parser.add_argument("--baseline", help="基準文件（默認：benchmarks/baselines/render.json）")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=(
+            f"回歸閾值（默認：{DEFAULT_THRESHOLD}，即超過基準 25%%）；"
+            "耗時指標使用 METRICS 中更寬的最低閾值（50%%），實際閾值在結果末尾列出"
+        ),
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="把本次結果寫為基準")
+    parser.add_argument("--output", help="結果 JSON 文件（可選）")
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print_case_result(run_single(json.loads(args.case)))
+        return 0
+
+    if args.templates:
+        templates = [os.path.relpath(os.path.abspath(t), REPO_ROOT) for t in _split(args.templates)]
+    else:
+        templates = sorted(
+            os.path.relpath(t, REPO_ROOT) for t in glob.glob(os.path.join(REPO_ROOT, "templates", "*.json"))
+        )
+    sizes = [int(s) for s in _split(args.sizes)]
+    if args.quick:
+        sizes = [s for s in sizes if s <= 100]
+
+    cases = [
+        {"template": template, "kind": kind, "size": size, "renderer": renderer, "repeat": args.repeat}
+        for template in templates
+        for kind in _split(args.kinds)
+        for size in sizes
+        for renderer in _split(args.renderers)
+    ]
+
+    # 合成圖片在用例之前（單獨的進程中）生成，不計入用例的耗時與內存
+    prepare_synthetic_images()
+    baseline = load_baseline(args.baseline or baseline_path("render")) or {}
+    base_results = baseline.get("results", {})
+    results = {}
+    rows = []
+    for case in cases:
+        cid = case_id(case)
+        print(f"⏱️  {cid} ...", end=" ", flush=True, file=sys.stderr)
+        result = run_case_median("benchmarks.render_bench", case, args.runs, timeout=args.timeout)
+        if "skipped" in result:
+            print(f"跳過（{result['skipped']}）", file=sys.stderr)
+            continue
+        results[cid] = result
+        if "error" in result:
+            print("失敗", file=sys.stderr)
+            continue
+        print(f"{result['seconds']:.2f}s", file=sys.stderr)
+        base = base_results.get(cid)
+        rows.append([
+            cid,
+            f"{result['seconds']:.3f}s",
+            ratio(result, base, "seconds"),
+            f"{result['cold_seconds']:.3f}s",
+            _mb(result["peak_rss"]),
+            ratio(result, base, "peak_rss"),
+            f"{result['output_bytes'] / 1024:.0f} KB",
+            ratio(result, base, "output_bytes"),
+        ])
+
+    print_table(
+        ["用例", "耗時", "±基準", "首次", "峰值 RSS", "±基準", "輸出", "±基準"],
+        rows,
+    )
+    return finish(
+        "render",
+        results,
+        METRICS,
+        baseline_file=args.baseline,
+        threshold=args.threshold,
+        update_baseline=args.update_baseline,
+        output=args.output,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
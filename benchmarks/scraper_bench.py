@@ -0,0 +1,304 @@
+"""
+爬蟲基準 - SyncScrapyPlaywright 與 AsyncScrapyPlaywright 在離線頁面上的分階段耗時
+
+頁面來自 benchmarks/scraper_site 中手寫的離線站點（模擬常見的頁面行為，不是真實網站的錄製），
+由本地 HTTP 服務提供（不依賴網絡）：
+
+- article：靜態文章，圖片少（走整頁截圖分支）
+- lazy：IntersectionObserver 懶加載圖片，滾動後才請求
+- slow：頁面與圖片都延遲返回（?delay=毫秒）
+- spa：內容由腳本請求 JSON 後渲染
+
+圖片路徑 /images/<n>.<擴展名> 對應 benchmarks/.cache/images 中的第 n 張合成圖片。
+
+爬蟲：sync（SyncScrapyPlaywright）、async（AsyncScrapyPlaywright，每次啟動瀏覽器）、
+async-pool（AsyncScrapyPlaywright + AsyncBrowserPool，瀏覽器只啟動一次）。
+報告每個階段（probe、launch、navigate、scroll、extract、download、screenshot、save）的耗時。
+需要已安裝 Playwright 的 Chromium（playwright install chromium；Linux 上還需要
+playwright install-deps chromium 安裝系統庫）。運行用例前先啟動一次瀏覽器，無法啟動時直接退出。
+
+倉庫中還沒有爬蟲基準（benchmarks/baselines/scraper.json）：在安裝了 Chromium 的機器上
+運行 --update-baseline 生成，並確認 lazy、slow 頁面在三種爬蟲下都有文字、圖片和截圖。
+
+用法：
+    python -m benchmarks.scraper_bench
+    python -m benchmarks.scraper_bench --pages lazy,slow --scrapers async-pool --repeat 3
+    python -m benchmarks.scraper_bench --serve          # 只啟動本地站點，手動調試
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.common import (
+    DEFAULT_THRESHOLD,
+    REPO_ROOT,
+    baseline_path,
+    finish,
+    load_baseline,
+    print_case_result,
+    print_table,
+    quiet_logger,
+    ratio,
+    run_case,
+    synthetic_images,
+)
+
+SITE_DIR = os.path.join(REPO_ROOT, "benchmarks", "scraper_site")
+
+# 頁面 → 站點中的路徑（slow 頁面本身也延遲返回）
+PAGES = {
+    "article": "/article.html",
+    "lazy": "/lazy.html",
+    "slow": "/slow.html?delay=1500",
+    "spa": "/spa.html",
+}
+SCRAPERS = ("sync", "async", "async-pool")
+PHASES = ("probe", "launch", "navigate", "scroll", "extract", "download", "screenshot", "save")
+
+# 回歸判斷的指標 → 絕對容差（秒）；頁面中的固定等待佔大部分耗時，容差比渲染基準寬
+METRICS = {"seconds": 1.0, **{phase: 0.5 for phase in PHASES}}
+
+
+# ---------- 本地站點 ----------
+class _SiteHandler(SimpleHTTPRequestHandler):
+    """提供離線頁面與合成圖片，?delay=毫秒 延遲響應"""
+
+    images: List[str] = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=SITE_DIR, **kwargs)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        delay = parse_qs(url.query).get("delay")
+        if delay:
+            time.sleep(int(delay[0]) / 1000)
+
+        if not url.path.startswith("/images/"):
+            return super().do_GET()
+
+        name = os.path.splitext(os.path.basename(url.path))[0]
+        if not name.isdigit() or not 1 <= int(name) <= len(self.images):
+            return self.send_error(404)
+        path = self.images[int(name) - 1]
+        with open(path, "rb") as f:
+            data = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png" if path.endswith(".png") else "image/jpeg")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SiteServer:
+    """在後台線程中運行的本地站點（端口自動分配）"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        _SiteHandler.images = [meta["path"] for _, meta in sorted(synthetic_images().items())]
+        self._server = ThreadingHTTPServer((host, port), _SiteHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "SiteServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def check_browser() -> Optional[str]:
+    """用爬蟲的啟動參數啟動一次 Chromium，無法啟動時返回錯誤（此時每個用例都會失敗）"""
+    from playwright.sync_api import sync_playwright
+
+    quiet_logger()
+    from AutoPPT.scrapy.playwright import BROWSER_LAUNCH_ARGS
+
+    try:
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True, args=BROWSER_LAUNCH_ARGS).close()
+    except Exception as e:
+        return str(e).strip().splitlines()[0]
+    return None
+
+
+# ---------- 用例（子進程） ----------
+def _scrape_all(scraper: str, url: str, work_dir: str, repeat: int) -> List[Dict]:
+    """用指定爬蟲爬取 repeat 次，返回每次的爬取統計"""
+    import asyncio
+
+    from AutoPPT.scrapy.playwright import (
+        AsyncBrowserPool,
+        AsyncScrapyPlaywright,
+        SyncScrapyPlaywright,
+    )
+
+    def paths(run: int):
+        return os.path.join(work_dir, f"content_{run}.txt"), os.path.join(work_dir, f"images_{run}")
+
+    if scraper == "sync":
+        return [SyncScrapyPlaywright().start(url, *paths(run)) for run in range(repeat)]
+
+    async def run_async():
+        if scraper == "async":
+            return [await AsyncScrapyPlaywright().start(url, *paths(run)) for run in range(repeat)]
+        async with AsyncBrowserPool(size=1) as pool:
+            scrapy = AsyncScrapyPlaywright(browser_pool=pool)
+            return [await scrapy.start(url, *paths(run)) for run in range(repeat)]
+
+    return asyncio.run(run_async())
+
+
+def run_single(case: Dict) -> Dict:
+    """
+    執行一個用例（每次爬取使用新的輸出目錄，圖片都重新下載）
+
+    Returns:
+        各階段耗時與 seconds（合計）：只爬一次時為該次的值，多次時為第二次起最快的一次
+        （async-pool 的瀏覽器已啟動）；first_seconds（第一次合計）；texts、images、screenshots
+    """
+    quiet_logger()
+    work_dir = tempfile.mkdtemp(prefix="autoppt_scraper_bench_")
+    try:
+        stats = _scrape_all(case["scraper"], case["url"], work_dir, case.get("repeat", 1))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    totals = [sum(s["timings"].values()) for s in stats]
+    steady = stats[1:] or stats
+    best = min(steady, key=lambda s: sum(s["timings"].values()))
+    result = {phase: round(best["timings"].get(phase, 0.0), 4) for phase in PHASES}
+    result.update(
+        seconds=round(sum(best["timings"].values()), 4),
+        first_seconds=round(totals[0], 4),
+        texts=best["texts"],
+        images=best["images"],
+        screenshots=best["screenshots"],
+    )
+    return result
+
+
+# ---------- 命令行 ----------
+def case_id(case: Dict) -> str:
+    return f"{case['page']}/{case['scraper']}"
+
+
+def _split(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.scraper_bench",
+        description="Playwright 爬蟲分階段耗時基準（本地離線站點，每個用例獨立進程）",
+    )
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--pages", default=",".join(PAGES), help="頁面（默認：article,lazy,slow,spa）")
+    parser.add_argument("--scrapers", default=",".join(SCRAPERS), help="爬蟲（默認：sync,async,async-pool）")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="每個用例的爬取次數：多於一次時取第二次起最快的一次（默認：1）",
+    )
+    parser.add_argument("--timeout", type=float, default=600, help="單個用例超時秒數")
+    parser.add_argument("--serve", action="store_true", help="只啟動本地站點（Ctrl+C 結束）")
+    parser.add_argument("--baseline", help="基準文件（默認：benchmarks/baselines/scraper.json）")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"回歸閾值（默認：{DEFAULT_THRESHOLD}，即超過基準 25%%）",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="把本次結果寫為基準")
+    parser.add_argument("--output", help="結果 JSON 文件（可選）")
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print_case_result(run_single(json.loads(args.case)))
+        return 0
+
+    pages = _split(args.pages)
+    unknown = [page for page in pages if page not in PAGES]
+    if unknown:
+        parser.error(f"未知的頁面：{', '.join(unknown)}（可選：{', '.join(PAGES)}）")
+
+    if not args.serve:
+        error = check_browser()
+        if error:
+            print(f"❌ 無法啟動 Chromium：{error}")
+            print("   先運行 playwright install chromium（Linux 上還需要 playwright install-deps chromium）")
+            return 1
+
+    # 合成圖片與站點在用例之前準備好，用例進程只負責爬取
+    with SiteServer() as server:
+        if args.serve:
+            print(f"🌐 本地站點：{server.url}（{', '.join(server.url + path for path in PAGES.values())}）")
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                return 0
+
+        baseline = load_baseline(args.baseline or baseline_path("scraper")) or {}
+        base_results = baseline.get("results", {})
+        results = {}
+        rows = []
+        for page in pages:
+            for scraper in _split(args.scrapers):
+                case = {
+                    "page": page,
+                    "scraper": scraper,
+                    "url": server.url + PAGES[page],
+                    "repeat": args.repeat,
+                }
+                cid = case_id(case)
+                print(f"⏱️  {cid} ...", end=" ", flush=True, file=sys.stderr)
+                result = run_case("benchmarks.scraper_bench", case, timeout=args.timeout)
+                results[cid] = result
+                if "error" in result:
+                    print("失敗", file=sys.stderr)
+                    continue
+                print(f"{result['seconds']:.2f}s", file=sys.stderr)
+                base = base_results.get(cid)
+                rows.append(
+                    [cid]
+                    + [f"{result[phase]:.2f}" for phase in PHASES]
+                    + [
+                        f"{result['seconds']:.2f}s",
+                        ratio(result, base, "seconds"),
+                        f"{result['texts']}/{result['images']}/{result['screenshots']}",
+                    ]
+                )
+
+    print_table(["用例", *PHASES, "合計", "±基準", "文字/圖片/截圖"], rows)
+    return finish(
+        "scraper",
+        results,
+        METRICS,
+        baseline_file=args.baseline,
+        threshold=args.threshold,
+        update_baseline=args.update_baseline,
+        output=args.output,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())